@@ -0,0 +1,390 @@
+"""
+Local answer-quality pre-filter — 0 API calls
+One classifier decides whether an answer is worth sending to the LLM at all:
+  answer       : a real attempt, grade it
+  gibberish    : keyboard mash, repeated characters, symbol noise
+  no_answer    : "I don't know", "no idea", "not sure, sorry"
+  copy         : the question pasted back as the answer
+  repeat       : the same answer already given earlier in the session
+  boilerplate  : "type your answer here", lorem ipsum, "test test", empty stubs
+features() reads the answer once (character/bigram statistics, keyboard-row
+runs, word repetition, code tokens) and compares its shingles with the
+question and the session's earlier answers. A softmax regression over those
+features, trained offline from answer_filter_seed.jsonl (plus copies, repeats
+and mashes synthesised from it), turns them into a label and a confidence.
+Only a junk label at or above BEE_ANSWER_FILTER_CONFIDENCE skips the LLM;
+bare values ("6", "1/6", "25%") are never filtered, and no_answer/boilerplate
+need their phrase to be present — a short term ("Adam optimizer") is an answer. Phrase features only fire
+on whole words that make up most of the answer, so "a skip list" or "hash
+passwords" is not "skip"/"pass".
+
+  python answer_filter.py train    # refit answer_filter_model.json
+  python answer_filter.py check "question" "answer"
+"""
+
+import os
+import re
+import sys
+import json
+import math
+import random
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+_DIR = os.path.dirname(os.path.abspath(__file__))
+MODEL_FILE = os.path.join(_DIR, "answer_filter_model.json")
+SEED_FILE = os.path.join(_DIR, "answer_filter_seed.jsonl")
+
+LABELS = ["answer", "gibberish", "no_answer", "copy", "repeat", "boilerplate"]
+# Labels that may only skip the LLM when their phrase feature fired
+_PHRASE_LABELS = {"no_answer": "no_answer_phrase", "boilerplate": "boilerplate_phrase"}
+FEATURES = [
+    "log_chars", "log_words", "alpha_ratio", "digit_ratio", "symbol_ratio", "vowel_ratio",
+    "top_char_ratio", "distinct_bigram_ratio", "keyboard_pair_ratio", "vowelless_word_ratio",
+    "top_word_ratio", "distinct_word_ratio", "mean_word_len", "code_ratio",
+    "question_overlap", "question_coverage", "session_duplicate", "no_answer_phrase", "boilerplate_phrase",
+]
+
+_VOWELS = set("aeiouy")
+_ROWS = ["qwertyuiop", "asdfghjkl", "zxcvbnm"]
+_KEY = {ch: (r, c) for r, row in enumerate(_ROWS) for c, ch in enumerate(row)}
+_WORD_RE = re.compile(r"[a-z0-9']+")
+_NUMERIC_RE = re.compile(r"[-+−$₹€£]?\s*[\d.,/:%\s()+\-*=^×÷]+")
+_CODE_RE = re.compile(
+    r"\b(?:def|return|for|while|if|else|elif|import|class|function|const|let|var|lambda|self|print|range|len)\b"
+    r"|[(){}\[\];=<>]|->|=>|\+=|==",
+)
+_NO_ANSWER = [
+    "don't know", "dont know", "do not know", "no idea", "no clue", "not sure", "i give up",
+    "can't answer", "cannot answer", "cant answer", "can't solve", "don't understand", "dont understand",
+    "not familiar", "never heard of it", "haven't studied", "don't remember", "idk",
+]
+_BOILERPLATE = [
+    "your answer here", "answer here", "answer goes here", "type your answer", "your code here",
+    "write your code", "lorem ipsum", "dolor sit amet", "as an ai language model",
+    "sample answer", "insert answer", "test answer", "test test", "some answer", "blah", "asdf",
+]
+# Words that can pad a phrase without making the answer an attempt ("sorry, I really have no idea")
+_FILLER = {
+    "i", "i'm", "im", "really", "honestly", "sorry", "tbh", "man", "um", "hmm", "ok", "okay", "well", "so",
+    "just", "have", "has", "am", "is", "it", "this", "that", "one", "the", "a", "an", "about", "of", "to",
+    "how", "what", "do", "any", "at", "all", "yet", "me", "my", "question", "topic", "answer", "here",
+    "totally", "completely", "but", "please", "and", "for", "with", "on", "in",
+}
+
+
+def _phrase_re(phrases: List[str]) -> "re.Pattern":
+    return re.compile(r"(?<![a-z0-9'])(?:" + "|".join(re.escape(p) for p in phrases) + r")(?![a-z0-9'])")
+
+
+_NO_ANSWER_RE = _phrase_re(_NO_ANSWER)
+_BOILERPLATE_RE = _phrase_re(_BOILERPLATE)
+
+
+@dataclass
+class FilterVerdict:
+    label: str          # one of LABELS
+    confidence: float   # softmax probability of `label`
+
+    @property
+    def junk(self) -> bool:
+        return self.label != "answer"
+
+    def evaluation(self) -> Dict:
+        feedback = {
+            "gibberish": "Invalid answer — gibberish or placeholder detected.",
+            "no_answer": "No answer provided — candidate indicated they do not know.",
+            "copy": "Invalid answer — the question was copied back instead of answered.",
+            "repeat": "Invalid answer — same answer as an earlier question.",
+            "boilerplate": "Invalid answer — placeholder or boilerplate text, not an attempt.",
+        }[self.label]
+        return {"correctness": 0, "depth": 0, "clarity": 0, "feedback": feedback}
+
+
+def _words(text: str) -> List[str]:
+    return _WORD_RE.findall(text.lower())
+
+
+def _shingles(words: List[str]) -> Set[str]:
+    return set(words) | {f"{a} {b}" for a, b in zip(words, words[1:])}
+
+
+def _phrase_score(text: str, pattern: "re.Pattern") -> float:
+    """
+    Share of the answer's words that are the phrase itself or filler around it,
+    once it is most of the answer (>= 0.6); 0.0 when the phrase is just mentioned.
+    """
+    spans = [m.span() for m in pattern.finditer(text)]
+    if not spans:
+        return 0.0
+    tokens = list(_WORD_RE.finditer(text))
+    covered = sum(
+        t.group() in _FILLER or any(start <= t.start() < end for start, end in spans) for t in tokens
+    )
+    share = covered / len(tokens) if tokens else 0.0
+    return share if share >= 0.6 else 0.0
+
+
+def features(question: str, answer: str, previous: Iterable[str] = ()) -> List[float]:
+    """The FEATURES vector for one answer: one pass over its characters, one over its words."""
+    text = answer.strip().lower()
+    letters = vowels = digits = symbols = pairs = keyboard = 0
+    chars: Counter = Counter()
+    bigrams: Set[str] = set()
+    prev = ""
+    for ch in text:
+        if ch.isspace():
+            prev = ""
+            continue
+        chars[ch] += 1
+        if ch.isalpha():
+            letters += 1
+            vowels += ch in _VOWELS
+        elif ch.isdigit():
+            digits += 1
+        else:
+            symbols += 1
+        if prev:
+            bigrams.add(prev + ch)
+            if prev in _KEY and ch in _KEY:
+                pairs += 1
+                (r1, c1), (r2, c2) = _KEY[prev], _KEY[ch]
+                keyboard += r1 == r2 and abs(c1 - c2) <= 1
+        prev = ch
+    visible = max(sum(chars.values()), 1)
+
+    words = _words(text)
+    n_words = len(words)
+    word_counts = Counter(words)
+    alpha_words = [w for w in words if w.isalpha() and len(w) > 2]
+    shingles = _shingles(words)
+    q_shingles = _shingles(_words(question))
+    duplicate = 0.0
+    for earlier in previous:
+        other = _shingles(_words(earlier))
+        if shingles and other:
+            duplicate = max(duplicate, len(shingles & other) / len(shingles | other))
+    # Two aptitude answers of "42" are a coincidence, not a pasted answer
+    duplicate *= min(1.0, n_words / 6)
+
+    return [
+        math.log1p(len(text)),
+        math.log1p(n_words),
+        letters / visible,
+        digits / visible,
+        symbols / visible,
+        vowels / letters if letters else 0.0,
+        max(chars.values()) / visible if chars else 1.0,
+        len(bigrams) / max(visible - 1, 1),
+        keyboard / pairs if pairs else 0.0,
+        sum(not (set(w) & _VOWELS) for w in alpha_words) / len(alpha_words) if alpha_words else 0.0,
+        max(word_counts.values()) / n_words if n_words else 1.0,
+        len(word_counts) / n_words if n_words else 0.0,
+        sum(map(len, words)) / n_words if n_words else 0.0,
+        min(1.0, len(_CODE_RE.findall(text)) / max(n_words, 1)),
+        len(shingles & q_shingles) / len(shingles) if shingles else 0.0,
+        len(shingles & q_shingles) / len(q_shingles) if q_shingles else 0.0,
+        duplicate,
+        _phrase_score(text, _NO_ANSWER_RE),
+        _phrase_score(text, _BOILERPLATE_RE),
+    ]
+
+
+def _bare_value(answer: str) -> bool:
+    """"6", "1/6", "16.67", "25%": purely numeric, or short without a letter — a final answer, never junk."""
+    text = answer.strip()
+    numeric = bool(_NUMERIC_RE.fullmatch(text)) and any(c.isdigit() for c in text)
+    return numeric or (len(text) <= 24 and not any(c.isalpha() for c in text))
+
+
+def _softmax(logits: List[float]) -> List[float]:
+    top = max(logits)
+    exps = [math.exp(z - top) for z in logits]
+    total = sum(exps)
+    return [e / total for e in exps]
+
+
+class AnswerFilter:
+    def __init__(self, model_file: str = None):
+        self.enabled = os.getenv("BEE_ANSWER_FILTER", "1") == "1"
+        self.threshold = float(os.getenv("BEE_ANSWER_FILTER_CONFIDENCE", "0.85"))
+        self.model: Optional[Dict] = None
+        path = model_file or os.getenv("BEE_ANSWER_FILTER_MODEL") or MODEL_FILE
+        try:
+            with open(path, encoding="utf-8") as f:
+                model = json.load(f)
+            if model["features"] != FEATURES or model["labels"] != LABELS:
+                raise ValueError("feature/label set differs from this version — retrain")
+            self.model = model
+        except (OSError, ValueError, KeyError) as e:
+            print(f"⚠️ Answer filter disabled — can't load {path}: {e}")
+            self.enabled = False
+        self.stats: Counter = Counter()
+
+    def predict(self, question: str, answer: str, previous: Iterable[str] = ()) -> FilterVerdict:
+        return self._classify(features(question, answer, previous))
+
+    def _classify(self, x: List[float]) -> FilterVerdict:
+        m = self.model
+        z = [(v - mu) / s for v, mu, s in zip(x, m["mean"], m["scale"])]
+        logits = [b + sum(w * v for w, v in zip(row, z)) for row, b in zip(m["weights"], m["bias"])]
+        probs = _softmax(logits)
+        best = max(range(len(LABELS)), key=probs.__getitem__)
+        return FilterVerdict(LABELS[best], probs[best])
+
+    def check(self, question: str, answer: str, previous: Iterable[str] = ()) -> Optional[FilterVerdict]:
+        """A confident junk verdict (skip the LLM), else None."""
+        if not self.enabled:
+            return None
+        self.stats["checked"] += 1
+        if _bare_value(answer):
+            self.stats["passed"] += 1
+            return None
+        x = features(question, answer, previous)
+        verdict = self._classify(x)
+        phrase = _PHRASE_LABELS.get(verdict.label)
+        if (
+            not verdict.junk or verdict.confidence < self.threshold
+            or (phrase and x[FEATURES.index(phrase)] <= 0)
+        ):
+            self.stats["passed"] += 1
+            return None
+        self.stats[verdict.label] += 1
+        print(f"🚮 Answer filter | {verdict.label} ({verdict.confidence:.2f}) — LLM evaluation skipped")
+        return verdict
+
+    def report(self) -> Dict:
+        return {
+            "enabled": self.enabled,
+            "confidence_threshold": self.threshold,
+            "model_holdout_accuracy": (self.model or {}).get("holdout_accuracy"),
+            "verdicts": dict(self.stats),
+        }
+
+
+# ─────────────────────────── offline training ───────────────────────────
+
+def _mash(rng: random.Random) -> str:
+    """Keyboard mash: runs along one keyboard row, or one short pattern repeated."""
+    if rng.random() < 0.5:
+        row = rng.choice(_ROWS)
+        words = []
+        for _ in range(rng.randint(1, 4)):
+            start = rng.randrange(len(row) - 2)
+            words.append("".join(row[min(len(row) - 1, start + rng.randint(0, 2))] for _ in range(rng.randint(4, 10))))
+        return " ".join(words)
+    unit = "".join(rng.choice("abcdefghijklmnopqrstuvwxyz0123456789#!.?") for _ in range(rng.randint(1, 3)))
+    return unit * rng.randint(4, 12)
+
+
+def _examples(seed_file: str, rng: random.Random) -> List[Tuple[List[float], int]]:
+    rows = [json.loads(line) for line in open(seed_file, encoding="utf-8") if line.strip()]
+    answers = [r["answer"] for r in rows if r["label"] == "answer"]
+    questions = sorted({r["question"] for r in rows})
+    bank = os.path.join(_DIR, "question_bank_seed.json")
+    if os.path.exists(bank):
+        with open(bank, encoding="utf-8") as f:
+            for by_difficulty in json.load(f).values():
+                for items in by_difficulty.values():
+                    questions.extend(q["question"] for q in items)
+
+    samples: List[Tuple[str, str, List[str], str]] = []
+    for r in rows:
+        samples.append((r["question"], r["answer"], r.get("previous", []), r["label"]))
+        if r["label"] == "answer":
+            # Same answer with unrelated earlier answers in the session: still an answer
+            others = [a for a in answers if a != r["answer"]]
+            samples.append((r["question"], r["answer"], rng.sample(others, 3), "answer"))
+            # ...and pasted again under another question: a repeat (a short one may be a coincidence)
+            edit = r["answer"].lower() if rng.random() < 0.5 else r["answer"] + " "
+            repeat = "repeat" if len(_words(r["answer"])) >= 6 else "answer"
+            samples.append((rng.choice(questions), edit, rng.sample(others, 2) + [r["answer"]], repeat))
+    for q in questions:
+        for copy in (q, q.lower().rstrip("?. "), f"Answer: {q}", f"{q} {q}"):
+            samples.append((q, copy, [], "copy"))
+    for _ in range(len(questions) * 2):
+        samples.append((rng.choice(questions), _mash(rng), [], "gibberish"))
+    return [(features(q, a, prev), LABELS.index(label)) for q, a, prev, label in samples]
+
+
+def train(seed_file: str = SEED_FILE, out_file: str = MODEL_FILE, epochs: int = 300, seed: int = 7) -> Dict:
+    """Fit the softmax regression (plain mini-batch gradient descent, L2) and write the model file."""
+    rng = random.Random(seed)
+    data = _examples(seed_file, rng)
+    rng.shuffle(data)
+    split = len(data) // 5
+    holdout, fit_set = data[:split], data[split:]
+
+    n_feat, n_cls = len(FEATURES), len(LABELS)
+    mean = [sum(x[i] for x, _ in fit_set) / len(fit_set) for i in range(n_feat)]
+    scale = [
+        math.sqrt(sum((x[i] - mean[i]) ** 2 for x, _ in fit_set) / len(fit_set)) or 1.0
+        for i in range(n_feat)
+    ]
+
+    def standardise(x):
+        return [(v - mu) / s for v, mu, s in zip(x, mean, scale)]
+
+    fit_z = [(standardise(x), y) for x, y in fit_set]
+    # Classes are unbalanced (copies/mashes are cheap to synthesise): weight by inverse frequency
+    freq = Counter(y for _, y in fit_z)
+    class_weight = [len(fit_z) / (n_cls * freq[c]) if freq[c] else 0.0 for c in range(n_cls)]
+    weights = [[0.0] * n_feat for _ in range(n_cls)]
+    bias = [0.0] * n_cls
+    lr, l2, batch = 0.2, 1e-3, 32
+    for epoch in range(epochs):
+        rng.shuffle(fit_z)
+        step = lr / (1 + epoch / 50)
+        for start in range(0, len(fit_z), batch):
+            gw = [[0.0] * n_feat for _ in range(n_cls)]
+            gb = [0.0] * n_cls
+            chunk = fit_z[start:start + batch]
+            for z, y in chunk:
+                probs = _softmax([b + sum(w * v for w, v in zip(row, z)) for row, b in zip(weights, bias)])
+                for c in range(n_cls):
+                    err = (probs[c] - (c == y)) * class_weight[y]
+                    gb[c] += err
+                    row = gw[c]
+                    for i in range(n_feat):
+                        row[i] += err * z[i]
+            for c in range(n_cls):
+                bias[c] -= step * gb[c] / len(chunk)
+                for i in range(n_feat):
+                    weights[c][i] -= step * (gw[c][i] / len(chunk) + l2 * weights[c][i])
+
+    def accuracy(rows):
+        hits = 0
+        for x, y in rows:
+            logits = [b + sum(w * v for w, v in zip(row, standardise(x))) for row, b in zip(weights, bias)]
+            hits += max(range(n_cls), key=logits.__getitem__) == y
+        return round(hits / len(rows), 4) if rows else None
+
+    model = {
+        "features": FEATURES,
+        "labels": LABELS,
+        "mean": [round(v, 6) for v in mean],
+        "scale": [round(v, 6) for v in scale],
+        "weights": [[round(w, 6) for w in row] for row in weights],
+        "bias": [round(b, 6) for b in bias],
+        "examples": len(data),
+        "train_accuracy": accuracy(fit_set),
+        "holdout_accuracy": accuracy(holdout),
+    }
+    with open(out_file, "w", encoding="utf-8") as f:
+        json.dump(model, f, indent=1)
+    return model
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else ""
+    if command == "train":
+        model = train(*sys.argv[2:4])
+        print(f"✅ Trained on {model['examples']} examples | train {model['train_accuracy']} "
+              f"| holdout {model['holdout_accuracy']}")
+    elif command == "check" and len(sys.argv) >= 4:
+        verdict = AnswerFilter().predict(sys.argv[2], sys.argv[3], sys.argv[4:])
+        print(f"{verdict.label} ({verdict.confidence:.3f})")
+    else:
+        print('Usage: python answer_filter.py train [seed.jsonl] [model.json]\n'
+              '       python answer_filter.py check "question" "answer" ["earlier answer" ...]')
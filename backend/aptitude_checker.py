@@ -0,0 +1,185 @@
+"""
+Deterministic aptitude grading — 0 API calls
+Aptitude questions carry a canonical answer ("16.67 m/s", "6 days", "1440"),
+written by Qwen at generation time or stored in the question bank. The
+candidate's possible final values (the last number after the last "answer"
+and after the last "="/"so"/"therefore", the last number, a leading result,
+both sides of "5 or 6") must all agree before anything is graded locally —
+then they are compared with the expected one; disagreement goes to the LLM:
+  - relative tolerance BEE_APTITUDE_TOLERANCE (default 0.5%), so 50/3 = 16.67
+  - units converted where the dimension matches (60 km/h == 16.67 m/s,
+    90 min == 1.5 hours); a unitless answer is compared on the number alone
+  - fractions (50/3), thousands separators (1,440), currency symbols, percents
+    (13.89% == 5/36, 0.25 == 25%)
+If either side has no usable number, check() returns None and the LLM grades.
+"""
+
+import os
+import re
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+# unit -> (dimension, factor to the dimension's base unit)
+_UNITS = {
+    "m/s": ("speed", 1.0), "km/h": ("speed", 1 / 3.6), "km/hr": ("speed", 1 / 3.6), "kmph": ("speed", 1 / 3.6),
+    "kmh": ("speed", 1 / 3.6), "mph": ("speed", 0.44704),
+    "km": ("length", 1000.0), "m": ("length", 1.0), "cm": ("length", 0.01), "mm": ("length", 0.001),
+    "meter": ("length", 1.0), "meters": ("length", 1.0), "metre": ("length", 1.0), "metres": ("length", 1.0),
+    "kilometer": ("length", 1000.0), "kilometers": ("length", 1000.0), "miles": ("length", 1609.344),
+    "s": ("time", 1.0), "sec": ("time", 1.0), "secs": ("time", 1.0), "second": ("time", 1.0), "seconds": ("time", 1.0),
+    "min": ("time", 60.0), "mins": ("time", 60.0), "minute": ("time", 60.0), "minutes": ("time", 60.0),
+    "h": ("time", 3600.0), "hr": ("time", 3600.0), "hrs": ("time", 3600.0), "hour": ("time", 3600.0),
+    "hours": ("time", 3600.0), "day": ("time", 86400.0), "days": ("time", 86400.0),
+    "week": ("time", 604800.0), "weeks": ("time", 604800.0),
+    "kg": ("mass", 1.0), "g": ("mass", 0.001), "grams": ("mass", 0.001),
+    "l": ("volume", 1.0), "litre": ("volume", 1.0), "litres": ("volume", 1.0), "liters": ("volume", 1.0),
+    "ml": ("volume", 0.001),
+    "%": ("percent", 1.0), "percent": ("percent", 1.0),
+}
+_CURRENCY = r"(?:rs\.?|inr|usd|₹|\$|€|£)"
+_NUM = r"[-−]?(?:\d{1,3}(?:,\d{3})+|\d+)(?:\.\d+)?|[-−]?\.\d+"
+_UNIT = "|".join(re.escape(u) for u in sorted(_UNITS, key=len, reverse=True))
+_QUANTITY_RE = re.compile(
+    rf"(?:{_CURRENCY}\s*)?(?P<num>{_NUM})(?:\s*/\s*(?P<den>{_NUM}))?"
+    rf"(?:\s*(?P<unit>{_UNIT})(?![a-z]))?",
+    re.I,
+)
+# Where the final answer starts, strongest first: the last match of the first pattern found wins
+_MARKERS = [
+    re.compile(r"\b(?:final\s+answer|answer|ans)\b", re.I),
+    re.compile(r"\b(?:therefore|thus|hence|so)\b|[=≈∴]", re.I),
+]
+_WORKING_RE = re.compile(r"\d\s*[-+*/×÷=^]\s*\(?\d")
+# Between two numbers offered as alternatives: "5 or 6", "1, 2, 3", "7 8 9"
+_ALTERNATIVES_RE = re.compile(r"\s*(?:,|;|\bor\b|\band\b|\s)\s*", re.I)
+
+
+@dataclass
+class Quantity:
+    value: float
+    unit: Optional[str] = None   # normalised key of _UNITS, None if absent/unknown
+
+    def __str__(self) -> str:
+        num = f"{self.value:.4f}".rstrip("0").rstrip(".")
+        return f"{num} {self.unit}" if self.unit else num
+
+
+@dataclass
+class AptitudeVerdict:
+    correct: bool
+    expected: Quantity
+    found: Quantity
+    working: bool   # the candidate showed calculation steps
+
+    def evaluation(self) -> Dict:
+        if self.correct:
+            return {
+                "correctness": 5,
+                "depth": 4 if self.working else 2,
+                "clarity": 4 if self.working else 3,
+                "feedback": f"Correct — final answer {self.found} matches the expected {self.expected}.",
+            }
+        return {
+            "correctness": 0,
+            "depth": 1 if self.working else 0,
+            "clarity": 1 if self.working else 0,
+            "feedback": f"Incorrect — final answer {self.found}, expected {self.expected}.",
+        }
+
+
+def _number(text: str) -> float:
+    return float(text.replace(",", "").replace("−", "-"))
+
+
+def _quantity(match: "re.Match") -> Optional[Quantity]:
+    try:
+        value = _number(match.group("num"))
+        if match.group("den"):
+            den = _number(match.group("den"))
+            if not den:
+                return None
+            value /= den
+    except ValueError:
+        return None
+    unit = match.group("unit")
+    return Quantity(value, unit.lower().replace(" ", "") if unit else None)
+
+
+def parse_quantity(text: Optional[str]) -> Optional[Quantity]:
+    """The first number (+ unit) in a canonical answer such as "16.67 m/s" or "Rs. 1,200"."""
+    for match in _QUANTITY_RE.finditer(text or ""):
+        q = _quantity(match)
+        if q is not None:
+            return q
+    return None
+
+
+def _quantities(text: str) -> List[Tuple[int, int, Quantity]]:
+    """(start, end, quantity) for every number in `text`."""
+    found = []
+    for match in _QUANTITY_RE.finditer(text):
+        q = _quantity(match)
+        if q is not None:
+            found.append((match.start(), match.end(), q))
+    return found
+
+
+def final_answers(answer: str) -> List[Quantity]:
+    """
+    Every value the candidate may have meant as final: the last number after
+    the last match of each marker, the last number, a leading number that isn't
+    part of a calculation ("6 days (since 1/10 + 1/15 = 1/6)"), and every number
+    offered as an alternative ("5 or 6", "1 2 3 ... 42").
+    """
+    found = _quantities(answer)
+    if not found:
+        return []
+    candidates = []
+    for marker in _MARKERS:
+        hits = list(marker.finditer(answer))
+        after = [q for start, _, q in found if start >= hits[-1].end()] if hits else []
+        if after:
+            candidates.append(after[-1])
+    candidates.append(found[-1][2])
+    for (_, end, q), (start, _, nxt) in zip(found, found[1:]):
+        if _ALTERNATIVES_RE.fullmatch(answer[end:start]):
+            candidates += [q, nxt]
+    start, end, first = found[0]
+    after = answer[end:].lstrip()[:1]
+    if not any(c.isdigit() for c in answer[:start]) and not (after and after in "-+*/×÷=^!0123456789"):
+        candidates.append(first)
+    return candidates
+
+
+def _matches(expected: Quantity, found: Quantity, tolerance: float) -> bool:
+    value = found.value
+    if expected.unit and found.unit and expected.unit != found.unit:
+        exp_dim, exp_factor = _UNITS[expected.unit]
+        dim, factor = _UNITS[found.unit]
+        if dim != exp_dim:
+            return False
+        value = value * factor / exp_factor
+    candidates = [value]
+    if expected.unit in ("%", "percent") and not found.unit and abs(value) <= 1:
+        candidates.append(value * 100)  # 0.25 for 25%
+    if found.unit in ("%", "percent") and not expected.unit:
+        candidates.append(value / 100)  # 13.89% for 5/36
+    return any(abs(v - expected.value) <= max(tolerance * abs(expected.value), 1e-9) for v in candidates)
+
+
+def check(expected_answer: Optional[str], answer: str) -> Optional[AptitudeVerdict]:
+    """
+    Exact verdict for `answer` against the canonical `expected_answer`, given
+    only when every candidate final value agrees — listing several numbers
+    can't earn the marks. None when either side has no number or they disagree.
+    """
+    expected = parse_quantity(expected_answer)
+    candidates = final_answers(answer or "")
+    if expected is None or not candidates:
+        return None
+    tolerance = float(os.getenv("BEE_APTITUDE_TOLERANCE", "0.005"))
+    working = len(_WORKING_RE.findall(answer)) >= 1 or len(answer.strip().splitlines()) >= 3
+    found = candidates[-1]
+    if any(not (_matches(found, other, tolerance) or _matches(other, found, tolerance)) for other in candidates):
+        return None
+    return AptitudeVerdict(_matches(expected, found, tolerance), expected, found, working)
@@ -0,0 +1,184 @@
+"""
+LLM call budget — accounting + enforcement
+Every call QwenClient sends is charged to its session (if any) and to the
+process-wide budget, tagged by call type (generate, eval, eval_retry,
+eval_batch, rephrase, resume). Token usage comes from the API's `usage`
+block, or a chars/4 estimate when the backend doesn't report it.
+
+Caps (0 = unlimited):
+  BEE_SESSION_CALL_CAP / BEE_SESSION_TOKEN_CAP   per interview session
+  BEE_GLOBAL_CALL_CAP  / BEE_GLOBAL_TOKEN_CAP    per BEE_GLOBAL_CAP_WINDOW_HOURS
+  BEE_CLIENT_CALL_CAP                            sessionless calls (resume) per client IP per hour
+A batched call (several sessions' answers scored at once) is split evenly
+across the sessions it serves, so session totals can be fractional.
+Rolling windows are kept as per-minute counters, so memory is bounded by the
+window length rather than by traffic.
+Over a cap, generate() returns None without calling the API, so callers
+degrade exactly as they do on an API failure: local scoring, bank questions.
+"""
+
+import os
+import time
+from collections import Counter, deque
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+# One session, or every session a batched call serves
+SessionIds = Union[str, Sequence[str], None]
+
+
+def _shares(session_id: SessionIds) -> List[Tuple[str, float]]:
+    if not session_id:
+        return []
+    if isinstance(session_id, str):
+        return [(session_id, 1.0)]
+    ids = list(dict.fromkeys(s for s in session_id if s))
+    return [(s, 1 / len(ids)) for s in ids]
+
+
+class _Usage:
+    def __init__(self):
+        self.calls: Counter = Counter()
+        self.tokens: Counter = Counter()
+        self.rejected = 0
+
+    @property
+    def total_calls(self) -> float:
+        return sum(self.calls.values())
+
+    @property
+    def total_tokens(self) -> int:
+        return sum(self.tokens.values())
+
+    def report(self, call_cap: int, token_cap: int) -> Dict:
+        return {
+            "calls": round(self.total_calls, 2),
+            "tokens": self.total_tokens,
+            "call_cap": call_cap or None,
+            "token_cap": token_cap or None,
+            "rejected_calls": self.rejected,
+            "by_type": {t: {"calls": round(self.calls[t], 2), "tokens": self.tokens[t]} for t in sorted(self.calls)},
+        }
+
+
+class _Window:
+    """Rolling (calls, tokens) over the last `seconds`, bucketed per minute."""
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self._minutes: deque = deque()  # [minute, calls, tokens]
+
+    def add(self, calls: int = 0, tokens: int = 0):
+        minute = int(time.time() // 60)
+        if self._minutes and self._minutes[-1][0] == minute:
+            self._minutes[-1][1] += calls
+            self._minutes[-1][2] += tokens
+        else:
+            self._minutes.append([minute, calls, tokens])
+
+    def usage(self) -> tuple:
+        cutoff = (time.time() - self.seconds) // 60
+        while self._minutes and self._minutes[0][0] < cutoff:
+            self._minutes.popleft()
+        return sum(m[1] for m in self._minutes), sum(m[2] for m in self._minutes)
+
+
+class CallBudget:
+    def __init__(self):
+        self.session_call_cap = int(os.getenv("BEE_SESSION_CALL_CAP", "40"))
+        self.session_token_cap = int(os.getenv("BEE_SESSION_TOKEN_CAP", "0"))
+        self.global_call_cap = int(os.getenv("BEE_GLOBAL_CALL_CAP", "0"))
+        self.global_token_cap = int(os.getenv("BEE_GLOBAL_TOKEN_CAP", "0"))
+        self.window = float(os.getenv("BEE_GLOBAL_CAP_WINDOW_HOURS", "24")) * 3600
+        self.client_call_cap = int(os.getenv("BEE_CLIENT_CALL_CAP", "20"))
+
+        self.sessions: Dict[str, _Usage] = {}
+        self.totals = _Usage()  # since startup
+        # Rolling window for the global caps
+        self._recent = _Window(self.window)
+        # Sessionless calls (resume parsing) per client IP, over the last hour
+        self._clients: Dict[str, _Window] = {}
+
+    # ─────────────────────────── ENFORCEMENT ───────────────────────────
+
+    def global_exhausted(self) -> bool:
+        calls, tokens = self._recent.usage()
+        return (
+            (self.global_call_cap and calls >= self.global_call_cap)
+            or (self.global_token_cap and tokens >= self.global_token_cap)
+        )
+
+    def session_exhausted(self, session_id: SessionIds) -> bool:
+        """For a batch: only when every session it serves is out of budget."""
+        if session_id and not isinstance(session_id, str):
+            shares = _shares(session_id)
+            return bool(shares) and all(self.session_exhausted(s) for s, _ in shares)
+        usage = self.sessions.get(session_id) if session_id else None
+        if usage is None:
+            return False
+        return bool(
+            (self.session_call_cap and usage.total_calls >= self.session_call_cap)
+            or (self.session_token_cap and usage.total_tokens >= self.session_token_cap)
+        )
+
+    def allow(self, session_id: SessionIds) -> bool:
+        return not self.global_exhausted() and not self.session_exhausted(session_id)
+
+    def allow_client(self, client: Optional[str]) -> bool:
+        """Sessionless calls have no session cap — they count against the caller's IP instead."""
+        window = self._clients.get(client or "unknown")
+        return not (self.client_call_cap and window and window.usage()[0] >= self.client_call_cap)
+
+    def charge_client(self, client: Optional[str]):
+        for key in [k for k, w in self._clients.items() if not w.usage()[0]]:
+            del self._clients[key]
+        self._clients.setdefault(client or "unknown", _Window(3600)).add(calls=1)
+
+    def reject(self, session_id: SessionIds):
+        self.totals.rejected += 1
+        for sid, _ in _shares(session_id):
+            self.sessions.setdefault(sid, _Usage()).rejected += 1
+
+    # ─────────────────────────── ACCOUNTING ───────────────────────────
+
+    def charge(self, session_id: SessionIds, call_type: str):
+        """One call about to be sent — charged up front so concurrent calls can't overshoot a cap."""
+        self.totals.calls[call_type] += 1
+        self._recent.add(calls=1)
+        for sid, share in _shares(session_id):
+            self.sessions.setdefault(sid, _Usage()).calls[call_type] += share
+
+    def add_tokens(self, session_id: SessionIds, call_type: str, tokens: int):
+        self.totals.tokens[call_type] += tokens
+        self._recent.add(tokens=tokens)
+        for sid, share in _shares(session_id):
+            if sid in self.sessions:
+                self.sessions[sid].tokens[call_type] += round(tokens * share)
+
+    def forget(self, session_id: str):
+        self.sessions.pop(session_id, None)
+
+    # ─────────────────────────── REPORTING ───────────────────────────
+
+    def session_report(self, session_id: str) -> Dict:
+        usage = self.sessions.get(session_id) or _Usage()
+        return {
+            **usage.report(self.session_call_cap, self.session_token_cap),
+            "exhausted": self.session_exhausted(session_id),
+        }
+
+    def stats(self) -> Dict:
+        calls, tokens = self._recent.usage()
+        return {
+            "since_startup": self.totals.report(0, 0),
+            "window_hours": self.window / 3600,
+            "window_calls": calls,
+            "window_tokens": tokens,
+            "global_call_cap": self.global_call_cap or None,
+            "global_token_cap": self.global_token_cap or None,
+            "exhausted": bool(self.global_exhausted()),
+            "session_call_cap": self.session_call_cap or None,
+            "session_token_cap": self.session_token_cap or None,
+            "active_sessions": len(self.sessions),
+            "client_call_cap": self.client_call_cap or None,
+            "active_clients": len(self._clients),
+        }
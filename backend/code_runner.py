@@ -0,0 +1,336 @@
+"""
+Sandboxed local test runner for coding answers — 0 API calls
+Coding questions carry hidden test cases:
+    {"function": "normalize", "cases": [{"args": [[1, 2, 3]], "expected": [0.0, 0.5, 1.0]}, ...]}
+Each Python submission runs in a fresh `python -I` child process (never
+reused, so one candidate's code can't see another's), at most
+BEE_CODE_RUNNER_WORKERS at once across all sessions:
+  - CPU seconds, address space and file size capped with setrlimit, applied
+    by the harness itself before the submission runs (no preexec_fn: the
+    server forks from a threaded process)
+  - wall-clock timeout, then the whole process group is killed
+  - no network: a fresh network namespace (`unshare -rn`) where the host
+    allows it, plus an audit hook in the child that refuses sockets,
+    subprocesses, fork/exec and file writes
+  - empty temp dir as cwd, minimal environment, stdout/stderr discarded
+  - the child only reports raw return values, on a dedicated pipe read up
+    to BEE_CODE_MAX_OUTPUT_KB; expected values stay in this process
+The function is looked up by name, else the last top-level function defined.
+Results are compared here, structurally (floats to 1e-6, tuples == lists,
+numpy arrays/scalars via tolist()/item()). Code that doesn't parse as
+Python returns None — the caller falls back to LLM grading.
+"""
+
+import os
+import ast
+import sys
+import json
+import math
+import time
+import shutil
+import signal
+import asyncio
+import tempfile
+import subprocess
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+try:
+    import resource
+except ImportError:  # Windows: no rlimits, wall-clock timeout only
+    resource = None
+
+# Runs inside the child. Reads the payload from stdin and writes one JSON line of raw
+# return values to the result pipe. Expected values never reach the child: the parent
+# compares, so nothing the submission does to the harness can fake a pass. Everything
+# lives in _main()'s locals, out of reach through sys.modules["__main__"].
+_HARNESS = r'''
+def _main():
+    import os, sys, json, io, copy, ast
+
+    payload = json.loads(sys.stdin.read())
+    if payload["limits"]:
+        import resource
+        for name, limit in payload["limits"].items():
+            resource.setrlimit(getattr(resource, name), (limit, limit))
+    result = os.fdopen(payload["result_fd"], "w")
+    os.set_inheritable(payload["result_fd"], False)
+    blocked = ("socket.", "subprocess.", "os.system", "os.exec", "os.spawn", "os.posix_spawn", "os.fork",
+               "os.forkpty", "os.kill", "os.killpg", "pty.", "ctypes.dlopen", "shutil.rmtree", "os.remove",
+               "os.unlink", "os.rmdir", "os.rename", "os.chmod", "os.chown", "os.mkdir", "os.symlink", "os.link",
+               "resource.setrlimit", "resource.prlimit")
+
+    def audit(event, args):
+        if event.startswith(blocked):
+            raise PermissionError(f"{event} is not allowed in the sandbox")
+        if event == "open":
+            mode, flags = (list(args[1:3]) + [None, None])[:2]
+            writes = isinstance(mode, str) and any(m in mode for m in "wax+")
+            writes = writes or isinstance(flags, int) and flags & (os.O_WRONLY | os.O_RDWR | os.O_CREAT | os.O_APPEND)
+            if writes:
+                raise PermissionError("writing files is not allowed in the sandbox")
+
+    def plain(value):
+        if hasattr(value, "tolist"):
+            return value.tolist()
+        if hasattr(value, "item") and not isinstance(value, (list, dict, str, bytes)):
+            try:
+                return value.item()
+            except Exception:
+                return value
+        if isinstance(value, (tuple, set, frozenset)):
+            return [plain(v) for v in (sorted(value, key=repr) if isinstance(value, (set, frozenset)) else value)]
+        if isinstance(value, list):
+            return [plain(v) for v in value]
+        if isinstance(value, dict):
+            return {str(k): plain(v) for k, v in value.items()}
+        return value
+
+    def report(**fields):
+        result.write(json.dumps(fields) + "\n")
+        result.flush()
+
+    code = payload["code"]
+    names = [n.name for n in ast.parse(code).body if isinstance(n, (ast.FunctionDef, ast.AsyncFunctionDef))]
+    sys.addaudithook(audit)
+    sys.stdout = sys.stderr = io.StringIO()
+    ns = {"__name__": "__submission__"}
+    try:
+        exec(compile(code, "<submission>", "exec"), ns)
+    except BaseException as e:
+        report(status="error", error=f"{type(e).__name__}: {e}"[:200], outputs=[])
+        return
+
+    fn = ns.get(payload.get("function") or "")
+    if not callable(fn):
+        fn = next((ns[n] for n in reversed(names) if callable(ns.get(n))), None)
+    if fn is None:
+        report(status="no_function", error="no function found to test", outputs=[])
+        return
+
+    outputs = []
+    for call in payload["calls"]:
+        try:
+            got = plain(fn(*copy.deepcopy(call["args"]), **copy.deepcopy(call["kwargs"])))
+            json.dumps(got)
+            outputs.append({"value": got, "error": None})
+        except BaseException as e:
+            outputs.append({"value": None, "error": f"{type(e).__name__}: {e}"[:200]})
+    report(status="ok", error=None, outputs=outputs)
+
+_main()
+'''
+
+
+def _equal(got, expected) -> bool:
+    if isinstance(expected, bool) or isinstance(got, bool):
+        return got == expected
+    if isinstance(expected, (int, float)) and isinstance(got, (int, float)):
+        return math.isclose(got, expected, rel_tol=1e-6, abs_tol=1e-6)
+    if isinstance(expected, list) and isinstance(got, list):
+        return len(got) == len(expected) and all(_equal(g, e) for g, e in zip(got, expected))
+    if isinstance(expected, dict) and isinstance(got, dict):
+        return got.keys() == expected.keys() and all(_equal(got[k], expected[k]) for k in expected)
+    return got == expected
+
+
+@dataclass
+class TestRun:
+    status: str                  # ok | error | no_function | timeout | output_limit | crashed
+    passed: int = 0
+    total: int = 0
+    errors: List[str] = field(default_factory=list)
+    seconds: float = 0.0
+    outcomes: List[bool] = field(default_factory=list)   # per case, in order
+
+    @property
+    def pass_rate(self) -> float:
+        return self.passed / self.total if self.total else 0.0
+
+    def summary(self) -> str:
+        if self.status == "timeout":
+            return f"Timed out — passed 0/{self.total} hidden tests."
+        if self.status == "output_limit":
+            return f"Wrote too much output — passed 0/{self.total} hidden tests."
+        if self.status == "no_function":
+            return f"No function found to test — passed 0/{self.total} hidden tests."
+        if self.status in ("error", "crashed"):
+            detail = f" ({self.errors[0]})" if self.errors else ""
+            return f"Code failed to run{detail} — passed 0/{self.total} hidden tests."
+        detail = f" First error: {self.errors[0]}." if self.errors else ""
+        return f"Passed {self.passed}/{self.total} hidden tests.{detail}"
+
+
+def is_python(code: str) -> bool:
+    try:
+        ast.parse(code)
+        return True
+    except (SyntaxError, ValueError):
+        return False
+
+
+def valid_tests(tests) -> bool:
+    """Shape check for hidden tests coming from the model or the bank."""
+    return (
+        isinstance(tests, dict)
+        and isinstance(tests.get("cases"), list)
+        and bool(tests["cases"])
+        and all(isinstance(c, dict) and isinstance(c.get("args", []), list) and "expected" in c for c in tests["cases"])
+    )
+
+
+class CodeRunner:
+    def __init__(self):
+        self.enabled = os.getenv("BEE_CODE_TESTS", "1") == "1"
+        self.timeout = float(os.getenv("BEE_CODE_TIMEOUT", "5"))
+        self.cpu_seconds = int(os.getenv("BEE_CODE_CPU_SECONDS", "3"))
+        self.memory_mb = int(os.getenv("BEE_CODE_MEMORY_MB", "512"))
+        self.max_output = int(os.getenv("BEE_CODE_MAX_OUTPUT_KB", "1024")) * 1024
+        self.workers = int(os.getenv("BEE_CODE_RUNNER_WORKERS", str(os.cpu_count() or 2)))
+        self._slots = asyncio.Semaphore(self.workers)
+        self._unshare = self._probe_unshare()
+        self.stats: Counter = Counter()
+
+    def _probe_unshare(self) -> Optional[str]:
+        """`unshare -rn` = the child gets an empty network namespace (Linux, user namespaces allowed)."""
+        mode = os.getenv("BEE_CODE_NET_NAMESPACE", "auto")
+        path = shutil.which("unshare")
+        if mode == "0" or not path:
+            return None
+        try:
+            probe = subprocess.run([path, "-rn", "true"], capture_output=True, timeout=5)
+        except (OSError, subprocess.SubprocessError):
+            return None
+        return path if probe.returncode == 0 else None
+
+    def _limits(self) -> Optional[Dict[str, int]]:
+        """rlimits the harness sets on itself before running the submission."""
+        if resource is None:
+            return None
+        memory = self.memory_mb * 1024 * 1024
+        return {"RLIMIT_CPU": self.cpu_seconds, "RLIMIT_AS": memory, "RLIMIT_FSIZE": 1 << 20, "RLIMIT_CORE": 0}
+
+    async def run(self, code: str, tests: Dict) -> Optional[TestRun]:
+        """Run `code` against hidden `tests`. None = not runnable here (disabled, not Python, bad tests)."""
+        if not self.enabled or not valid_tests(tests) or not is_python(code):
+            return None
+        async with self._slots:
+            run = await self._run(code, tests)
+        self.stats[run.status] += 1
+        self.stats["runs"] += 1
+        print(f"🧪 Code tests | {run.status} | {run.passed}/{run.total} in {run.seconds:.2f}s")
+        return run
+
+    async def _run(self, code: str, tests: Dict) -> TestRun:
+        cases = tests["cases"]
+        read_fd, write_fd = os.pipe()
+        payload = json.dumps({
+            "code": code, "function": tests.get("function"), "result_fd": write_fd, "limits": self._limits(),
+            "calls": [{"args": c.get("args", []), "kwargs": c.get("kwargs", {})} for c in cases],
+        })
+        argv = [sys.executable, "-I", "-B", "-c", _HARNESS]
+        if self._unshare:
+            argv = [self._unshare, "-rn"] + argv
+        started = time.monotonic()
+        pipe = open(read_fd, "rb", buffering=0)
+        with tempfile.TemporaryDirectory(prefix="bee-run-") as workdir:
+            try:
+                # stdout/stderr go nowhere: printing in a loop can't make us buffer anything
+                proc = await asyncio.create_subprocess_exec(
+                    *argv,
+                    stdin=asyncio.subprocess.PIPE, stdout=asyncio.subprocess.DEVNULL,
+                    stderr=asyncio.subprocess.DEVNULL, pass_fds=(write_fd,),
+                    cwd=workdir, env={"PATH": "/usr/bin:/bin", "PYTHONHASHSEED": "0"},
+                    start_new_session=os.name == "posix",
+                )
+            except BaseException:
+                pipe.close()
+                raise
+            finally:
+                os.close(write_fd)   # the child holds its own copy; EOF once it exits
+            try:
+                output = await asyncio.wait_for(self._collect(proc, payload.encode(), pipe), self.timeout)
+            except asyncio.TimeoutError:
+                self._kill(proc)
+                await proc.wait()
+                return TestRun("timeout", 0, len(cases), seconds=time.monotonic() - started)
+            except asyncio.CancelledError:
+                self._kill(proc)
+                raise
+            finally:
+                pipe.close()
+        seconds = time.monotonic() - started
+        if output is None:
+            return TestRun("output_limit", 0, len(cases), [f"more than {self.max_output} bytes"], seconds)
+
+        for line in reversed(output.decode(errors="replace").splitlines()):
+            try:
+                result = json.loads(line)
+                outputs = result["outputs"]
+                status, error = result["status"], result["error"]
+            except (ValueError, TypeError, KeyError):
+                continue
+            outcomes = [
+                isinstance(out, dict) and not out.get("error") and _equal(out.get("value"), case.get("expected"))
+                for case, out in zip(cases, outputs)
+            ]
+            outcomes += [False] * (len(cases) - len(outcomes))
+            errors = [out["error"] for out in outputs if isinstance(out, dict) and out.get("error")]
+            if error:
+                errors.insert(0, error)
+            return TestRun(status, sum(outcomes), len(cases), [str(e)[:200] for e in errors], seconds, outcomes)
+        # Killed by an rlimit (SIGXCPU / SIGKILL / MemoryError before reporting)
+        killed = {-getattr(signal, "SIGXCPU", 0), -getattr(signal, "SIGKILL", 0)} - {0}
+        status = "timeout" if proc.returncode in killed else "crashed"
+        return TestRun(status, 0, len(cases), [f"exit code {proc.returncode}"], seconds)
+
+    async def _collect(self, proc, payload: bytes, pipe) -> Optional[bytes]:
+        """Feed the payload, then read the result pipe in chunks; None (child killed) past max_output."""
+        try:
+            proc.stdin.write(payload)
+            await proc.stdin.drain()
+            proc.stdin.close()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        reader = asyncio.StreamReader()
+        transport, _ = await asyncio.get_running_loop().connect_read_pipe(
+            lambda: asyncio.StreamReaderProtocol(reader), pipe,
+        )
+        try:
+            data = bytearray()
+            while True:
+                chunk = await reader.read(65536)
+                if not chunk:
+                    break
+                data += chunk
+                if len(data) > self.max_output:
+                    self._kill(proc)
+                    await proc.wait()
+                    return None
+            await proc.wait()
+            return bytes(data)
+        finally:
+            transport.close()
+
+    @staticmethod
+    def _kill(proc):
+        try:
+            os.killpg(proc.pid, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError, AttributeError):
+            try:
+                proc.kill()
+            except ProcessLookupError:
+                pass
+
+    def report(self) -> Dict:
+        return {
+            "enabled": self.enabled,
+            "workers": self.workers,
+            "network_namespace": bool(self._unshare),
+            "limits": {
+                "timeout_s": self.timeout, "cpu_s": self.cpu_seconds, "memory_mb": self.memory_mb,
+                "output_kb": self.max_output // 1024,
+            },
+            "runs": dict(self.stats),
+        }
@@ -0,0 +1,108 @@
+"""
+Near-duplicate question index — MinHash signatures + LSH banding
+Lookup cost is ~constant per question (hash the shingles, probe BANDS buckets),
+instead of scanning every existing text. Catches rewordings such as
+"What is overfitting?" vs "Explain what overfitting means."
+"""
+
+import re
+import zlib
+import random
+from typing import Dict, Iterable, List, Set, Tuple
+
+NUM_PERM = 64
+BANDS = 16                 # 16 bands x 4 rows → candidates from ~0.5 Jaccard up
+ROWS = NUM_PERM // BANDS
+_PRIME = (1 << 61) - 1
+_MASK = (1 << 32) - 1
+
+_rng = random.Random(1337)  # fixed seed: signatures comparable across the process
+_PERMS = [(_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(NUM_PERM)]
+
+_STOPWORDS = {
+    "a", "an", "the", "is", "are", "was", "were", "be", "of", "to", "in", "on", "for",
+    "and", "or", "with", "what", "how", "why", "when", "which", "does", "do", "can",
+    "you", "your", "it", "its", "this", "that", "explain", "describe", "define",
+    "between", "by", "as", "at", "from", "would", "could", "should", "about", "mean", "means",
+}
+
+
+def _tokens(text: str) -> List[str]:
+    words = re.findall(r"[a-z0-9+#]+", text.lower())
+    # Crude stemming keeps "networks"/"network" in the same shingle
+    return [w[:-1] if len(w) > 4 and w.endswith("s") else w for w in words if w not in _STOPWORDS]
+
+
+def _shingles(text: str) -> Set[int]:
+    toks = _tokens(text)
+    grams = set(toks) | {f"{a} {b}" for a, b in zip(toks, toks[1:])}
+    return {zlib.crc32(g.encode()) for g in grams}
+
+
+def signature(text: str) -> Tuple[int, ...]:
+    shingles = _shingles(text) or {0}
+    return tuple(
+        min(((a * s + b) % _PRIME) & _MASK for s in shingles)
+        for a, b in _PERMS
+    )
+
+
+def similarity(sig_a: Tuple[int, ...], sig_b: Tuple[int, ...]) -> float:
+    """Estimated Jaccard similarity of the two shingle sets."""
+    return sum(x == y for x, y in zip(sig_a, sig_b)) / NUM_PERM
+
+
+class NearDuplicateIndex:
+    def __init__(self, threshold: float = 0.6):
+        self.threshold = threshold
+        self._sigs: Dict[str, Tuple[int, ...]] = {}
+        self._bands: List[Dict[Tuple[int, ...], Set[str]]] = [{} for _ in range(BANDS)]
+
+    @classmethod
+    def from_texts(cls, texts: Iterable[str], threshold: float = 0.6) -> "NearDuplicateIndex":
+        index = cls(threshold)
+        for t in texts:
+            index.add(t)
+        return index
+
+    def __len__(self) -> int:
+        return len(self._sigs)
+
+    def _band_keys(self, sig: Tuple[int, ...]):
+        for b in range(BANDS):
+            yield b, sig[b * ROWS:(b + 1) * ROWS]
+
+    def find(self, text: str) -> List[str]:
+        """Indexed texts that look like rewordings of `text`."""
+        key = text.strip().lower()
+        if key in self._sigs:
+            return [key]
+        sig = signature(text)
+        candidates: Set[str] = set()
+        for b, band in self._band_keys(sig):
+            candidates |= self._bands[b].get(band, set())
+        return [c for c in candidates if similarity(sig, self._sigs[c]) >= self.threshold]
+
+    def is_duplicate(self, text: str) -> bool:
+        return bool(self.find(text))
+
+    def add(self, text: str):
+        key = text.strip().lower()
+        if key in self._sigs:
+            return
+        sig = signature(text)
+        self._sigs[key] = sig
+        for b, band in self._band_keys(sig):
+            self._bands[b].setdefault(band, set()).add(key)
+
+    def remove(self, text: str):
+        key = text.strip().lower()
+        sig = self._sigs.pop(key, None)
+        if sig is None:
+            return
+        for b, band in self._band_keys(sig):
+            bucket = self._bands[b].get(band)
+            if bucket:
+                bucket.discard(key)
+                if not bucket:
+                    del self._bands[b][band]
@@ -0,0 +1,90 @@
+"""
+Micro-batched answer evaluation
+Answers that miss the eval cache queue here for up to BEE_EVAL_BATCH_WAIT_MS
+(or until BEE_EVAL_BATCH_SIZE are pending, from any session) and are scored
+together in ONE call. Items the batch response doesn't cover fall back to the
+normal single evaluation, so a bad batch never costs more than before + 1.
+Disabled (size 1) by default — pairs best with background evaluation.
+"""
+
+import os
+import asyncio
+from typing import Dict, List, Optional, Set
+
+
+class EvalBatcher:
+    def __init__(self, qwen_client):
+        self.qwen_client = qwen_client
+        self.size = max(1, int(os.getenv("BEE_EVAL_BATCH_SIZE", "1")))
+        self.max_wait = float(os.getenv("BEE_EVAL_BATCH_WAIT_MS", "400")) / 1000
+        self.enabled = self.size > 1
+
+        self._pending: List[tuple] = []   # (item, future)
+        self._timer: Optional[asyncio.Task] = None
+        self._running: Set[asyncio.Task] = set()
+        self.batches = 0
+        self.items = 0
+        self.fallbacks = 0
+
+    async def submit(self, item: Dict) -> Dict:
+        """item = evaluate_answer() arguments + cache key. Resolves to the evaluation dict."""
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((item, future))
+        if len(self._pending) >= self.size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = asyncio.create_task(self._flush_later())
+        return await future
+
+    async def _flush_later(self):
+        await asyncio.sleep(self.max_wait)
+        self._timer = None
+        self._flush()
+
+    def _flush(self):
+        if self._timer is not None and self._timer is not asyncio.current_task():
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        task = asyncio.create_task(self._run(batch))
+        self._running.add(task)
+        task.add_done_callback(self._running.discard)
+
+    async def _run(self, batch: List[tuple]):
+        items = [item for item, _ in batch]
+        try:
+            if len(items) == 1:
+                results: List[Optional[Dict]] = [None]
+            else:
+                self.batches += 1
+                self.items += len(items)
+                results = await self.qwen_client.evaluate_batch(items)
+
+            # Per-item fallback for anything the batch didn't score
+            missing = [i for i, r in enumerate(results) if r is None]
+            self.fallbacks += len(missing) if len(items) > 1 else 0
+            singles = await asyncio.gather(*[self.qwen_client.evaluate_single(**items[i]) for i in missing])
+            for i, result in zip(missing, singles):
+                results[i] = result
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    def stats(self) -> Dict:
+        return {
+            "enabled": self.enabled,
+            "batch_size": self.size,
+            "max_wait_ms": int(self.max_wait * 1000),
+            "batches": self.batches,
+            "batched_answers": self.items,
+            "single_fallbacks": self.fallbacks,
+            "pending": len(self._pending),
+        }
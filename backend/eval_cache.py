@@ -0,0 +1,115 @@
+"""
+Content-addressed cache for answer evaluations
+Key = sha256(prompt version, q_type, normalized question, normalized answer).
+In-memory LRU with optional write-through SQLite persistence, so repeated
+(question, answer) pairs — bank questions, restarts, re-submits — cost 0 calls.
+"""
+
+import os
+import re
+import json
+import time
+import sqlite3
+import asyncio
+import hashlib
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+
+def _normalize(text: str, keep_case: bool) -> str:
+    text = re.sub(r"\s+", " ", text.strip())
+    return text if keep_case else text.lower()
+
+
+def eval_key(question: str, answer: str, q_type: str, prompt_version: str) -> str:
+    # Code is case-sensitive; prose answers are not
+    keep_case = q_type == "coding"
+    raw = "\x1f".join([
+        prompt_version, q_type, _normalize(question, False), _normalize(answer, keep_case),
+    ])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class EvalCache:
+    def __init__(self):
+        self.max_entries = int(os.getenv("BEE_EVAL_CACHE_SIZE", "5000"))
+        # Empty = memory only
+        self.path = os.getenv("BEE_EVAL_CACHE_FILE", "")
+        self._entries: "OrderedDict[str, Dict]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self._writes = 0
+        if self.path:
+            self._load()
+
+    @contextmanager
+    def _db(self):
+        db = sqlite3.connect(self.path, timeout=10)
+        try:
+            with db:
+                yield db
+        finally:
+            db.close()
+
+    def _load(self):
+        try:
+            with self._db() as db:
+                db.execute(
+                    "CREATE TABLE IF NOT EXISTS evals (key TEXT PRIMARY KEY, result TEXT NOT NULL, used_at REAL NOT NULL)"
+                )
+                rows = db.execute(
+                    "SELECT key, result FROM evals ORDER BY used_at DESC LIMIT ?", (self.max_entries,)
+                ).fetchall()
+            for key, result in reversed(rows):
+                self._entries[key] = json.loads(result)
+            print(f"🗃 Eval cache loaded | {len(self._entries)} entries")
+        except Exception as e:
+            print(f"⚠️ Eval cache disabled persistence: {e}")
+            self.path = ""
+
+    def _persist(self, key: str, result: Dict):
+        try:
+            with self._db() as db:
+                db.execute(
+                    "INSERT OR REPLACE INTO evals (key, result, used_at) VALUES (?, ?, ?)",
+                    (key, json.dumps(result), time.time()),
+                )
+                self._writes += 1
+                if self._writes % 500 == 0:
+                    # Keep the file bounded to what the LRU could ever load back
+                    db.execute(
+                        "DELETE FROM evals WHERE key NOT IN "
+                        "(SELECT key FROM evals ORDER BY used_at DESC LIMIT ?)",
+                        (self.max_entries,),
+                    )
+        except Exception as e:
+            print(f"⚠️ Eval cache write failed: {e}")
+
+    def get(self, key: str) -> Optional[Dict]:
+        result = self._entries.get(key)
+        if result is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return dict(result)
+
+    async def put(self, key: str, result: Dict):
+        self._entries[key] = dict(result)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        if self.path:
+            await asyncio.to_thread(self._persist, key, result)
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "persistent": bool(self.path),
+        }
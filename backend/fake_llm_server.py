@@ -0,0 +1,197 @@
+"""
+Fake OpenAI-compatible inference server — offline tests and load benchmarks
+Recognises every prompt QwenClient sends and answers with schema-valid JSON
+(questions, evaluations, batch evaluations, rephrasings, skills), after a
+configurable latency and with configurable failure rates.
+
+In-process:  BEE_LLM_BACKEND=fake
+Standalone:  python fake_llm_server.py 8001
+             BEE_LLM_BACKEND=openai BEE_LLM_BASE_URL=http://localhost:8001/v1
+
+  BEE_FAKE_LATENCY=lognormal:800:0.5   fixed:MS | uniform:MIN_MS:MAX_MS | lognormal:MEDIAN_MS:SIGMA
+  BEE_FAKE_ERROR_RATE=0      share of calls answered 503
+  BEE_FAKE_429_RATE=0        share of calls answered 429 (Retry-After: BEE_FAKE_RETRY_AFTER)
+  BEE_FAKE_TIMEOUT_RATE=0    share of calls that hang for BEE_FAKE_HANG_SECONDS
+  BEE_FAKE_GARBAGE_RATE=0    share of calls answered with unparseable text
+  BEE_FAKE_SEED=             fixed seed for reproducible runs
+"""
+
+import os
+import re
+import sys
+import json
+import math
+import time
+import random
+import asyncio
+from typing import Dict
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+app = FastAPI(title="BEE fake LLM")
+
+_seed = os.getenv("BEE_FAKE_SEED")
+_rng = random.Random(int(_seed) if _seed else None)
+
+_TOPICS = {
+    "theory": ["Gradient Descent", "Regularization", "Overfitting", "Attention", "Embeddings",
+               "Batch Normalization", "Decision Trees", "Cross Validation", "Transformers", "Dropout"],
+    "aptitude": ["Percentages", "Time and Work", "Ratios", "Probability", "Speed and Distance",
+                 "Series", "Profit and Loss", "Permutations"],
+    "coding": ["Arrays", "Strings", "Hash Maps", "Two Pointers", "Binary Search", "Recursion",
+               "Stacks", "Sliding Window"],
+    "hr": ["Teamwork", "Conflict", "Ownership", "Learning", "Deadlines"],
+}
+_OPENERS = {
+    "theory": ["Explain how {t} affects {w} in a {x} model.", "What trade-offs does {t} introduce when training on {w} with {x}?",
+               "Compare {t} with an alternative approach for {w} under {x} constraints."],
+    "aptitude": ["A {x} team finishes {n} tasks in {m} hours; how long for {k} tasks ({t}, {w})?",
+                 "If {n}% of {m} {w} items fail a {x} check, how many pass ({t})?"],
+    "coding": ["Write a function that uses {t} to find the {w} element in a {x} list of {n} items.",
+               "Implement {t} to return the {w} subarray of a {x} array."],
+    "hr": ["Tell me about a time {t} mattered while working on a {x} {w} project.",
+           "How did you handle {t} during a {x} {w} deadline?"],
+}
+_WORDS = ["largest", "sparse", "noisy", "streaming", "balanced", "skewed", "longest", "shortest",
+          "distributed", "imbalanced", "sorted", "rotated", "batched", "cached", "nested", "shared"]
+
+
+# ─────────────────────────── BEHAVIOUR ───────────────────────────
+
+def _latency() -> float:
+    spec = os.getenv("BEE_FAKE_LATENCY", "lognormal:800:0.5").split(":")
+    kind, args = spec[0], [float(a) for a in spec[1:]]
+    if kind == "fixed":
+        ms = args[0]
+    elif kind == "uniform":
+        ms = _rng.uniform(args[0], args[1])
+    else:
+        ms = args[0] * math.exp(_rng.gauss(0, args[1] if len(args) > 1 else 0.5))
+    return max(ms, 0) / 1000
+
+
+def _rate(name: str) -> float:
+    return float(os.getenv(name, "0"))
+
+
+def _question(q_type: str, difficulty: str) -> Dict:
+    topic = _rng.choice(_TOPICS.get(q_type, _TOPICS["theory"]))
+    text = _rng.choice(_OPENERS.get(q_type, _OPENERS["theory"])).format(
+        t=topic.lower(), w=_rng.choice(_WORDS), x=_rng.choice(_WORDS),
+        n=_rng.randint(3, 40), m=_rng.randint(2, 90), k=_rng.randint(2, 20),
+    )
+    q = {"question": text, "difficulty": difficulty, "topic": topic}
+    if q_type == "aptitude":
+        q["answer"] = str(_rng.randint(2, 400))
+    elif q_type == "coding":
+        nums = [[_rng.randint(-9, 9) for _ in range(_rng.randint(1, 5))] for _ in range(3)]
+        q["question"] += " Write it as `solve(nums)` returning the sum of the list."
+        q["function"] = "solve"
+        q["tests"] = [{"args": [n], "expected": sum(n)} for n in nums]
+        q["reference"] = "def solve(nums):\n    return sum(nums)\n"
+    return q
+
+
+def _score(answer: str) -> Dict:
+    words = len(answer.split())
+    base = 1 if words < 8 else 2 if words < 25 else 3 if words < 60 else 4
+    return {
+        "correctness": min(5, base + _rng.randint(0, 1)),
+        "depth": base,
+        "clarity": min(5, base + _rng.randint(-1, 1)),
+        "feedback": "Fake evaluation — score based on answer length.",
+    }
+
+
+def _reply(prompt: str) -> str:
+    """Content for one prompt, shaped like what QwenClient expects back."""
+    m = re.search(r"Generate exactly (\d+) unique (\w+) interview questions", prompt)
+    if m:
+        q_type = m.group(2)
+        out = []
+        for count, diff in re.findall(r'- (\d+) "(\w+)" question\(s\)', prompt):
+            out.extend(_question(q_type, diff) for _ in range(int(count)))
+        return json.dumps(out)
+
+    m = re.search(r"scoring (\d+) independent interview answers", prompt)
+    if m:
+        answers = re.findall(r"^Answer: (.*)$", prompt, re.M)
+        return json.dumps([
+            {"id": i + 1, **_score(answers[i] if i < len(answers) else "")}
+            for i in range(int(m.group(1)))
+        ])
+
+    m = re.search(r"interview question (\d+) different ways", prompt)
+    original = re.search(r"^Original: (.*)$", prompt, re.M)
+    if m:
+        q = original.group(1) if original else "the question"
+        return json.dumps([f"In other words ({i + 1}): {q}" for i in range(int(m.group(1)))])
+    if prompt.startswith("Rephrase"):
+        return f"Put simply: {original.group(1) if original else 'the question'}"
+
+    if prompt.startswith("Extract ONLY AI/ML technical skills"):
+        section = prompt.split("Skills Section:", 1)[-1].split("Return ONLY", 1)[0]
+        skills = [s.strip() for s in re.split(r"[,\n|•]", section) if 1 < len(s.strip()) < 30]
+        return json.dumps(skills[:8] or ["Python", "Machine Learning"])
+
+    if "STYLE of a coding" in prompt:
+        score = _score(prompt.split("Submitted Code:", 1)[-1])
+        return json.dumps({"depth": score["depth"], "clarity": score["clarity"], "feedback": "Fake style review."})
+
+    if "correctness" in prompt:
+        m = re.search(r"(?:^Answer: |Submitted Code:\n)(.*?)(?:\n\n|\Z)", prompt, re.M | re.S)
+        return json.dumps(_score(m.group(1) if m else ""))
+
+    return "OK"
+
+
+# ─────────────────────────── ROUTES ───────────────────────────
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    body = await request.json()
+    prompt = body["messages"][-1]["content"]
+
+    roll = _rng.random()
+    if roll < _rate("BEE_FAKE_TIMEOUT_RATE"):
+        await asyncio.sleep(float(os.getenv("BEE_FAKE_HANG_SECONDS", "120")))
+    await asyncio.sleep(_latency())
+    roll = _rng.random()
+    if roll < _rate("BEE_FAKE_ERROR_RATE"):
+        return JSONResponse({"error": "fake upstream unavailable"}, status_code=503)
+    roll -= _rate("BEE_FAKE_ERROR_RATE")
+    if roll < _rate("BEE_FAKE_429_RATE"):
+        return JSONResponse(
+            {"error": "fake rate limit"}, status_code=429,
+            headers={"Retry-After": os.getenv("BEE_FAKE_RETRY_AFTER", "1")},
+        )
+    roll -= _rate("BEE_FAKE_429_RATE")
+    content = "Sorry, I can't help with that." if roll < _rate("BEE_FAKE_GARBAGE_RATE") else _reply(prompt)
+
+    if body.get("stream"):
+        async def events():
+            for i in range(0, len(content), 12):
+                chunk = {"choices": [{"index": 0, "delta": {"content": content[i:i + 12]}}]}
+                yield f"data: {json.dumps(chunk)}\n\n"
+            yield "data: [DONE]\n\n"
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    return {
+        "id": f"fake-{time.time_ns()}",
+        "object": "chat.completion",
+        "model": body.get("model", "fake-qwen"),
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+        "usage": {"prompt_tokens": len(prompt) // 4, "completion_tokens": len(content) // 4},
+    }
+
+
+@app.get("/v1/models")
+async def models():
+    return {"object": "list", "data": [{"id": "fake-qwen", "object": "model"}]}
+
+
+if __name__ == "__main__":
+    import uvicorn
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 8001
+    uvicorn.run(app, host="127.0.0.1", port=port)
@@ -2,15 +2,22 @@
 Interview flow controller — uses QwenClient
 Offline scoring: OFF_TOPIC detection and scoring is 100% local (no API)
 LLM scoring: Valid answers call qwen_client.evaluate_answer()
+             (inline, or as background tasks with BEE_BACKGROUND_EVAL=1)
 Final results: All scores summed locally via ScoringEngine
 """
 
+import os
 import uuid
+import random
 import asyncio
-from typing import Dict, List, Optional
+from typing import AsyncIterator, Dict, List, Optional, Set, Tuple
 from datetime import datetime, timedelta
-from qwen_client import QwenClient, _FALLBACKS
+from qwen_client import QwenClient
 from scoring import ScoringEngine
+from question_pool import QuestionPool
+from question_bank import QuestionBank
+from dedup_index import NearDuplicateIndex
+from rephrase_cache import RephraseCache
 from local_utils import classify_response_local
 
 
@@ -28,12 +35,31 @@ class InterviewSession:
         self.status = "initializing"
         self.created_at = datetime.now()
         self.rephrase_counts: Dict[int, int] = {}
+        self.bank_ids: Set[int] = set()  # QuestionBank rows already served — no repeats
+        self.dedup = NearDuplicateIndex()  # shared by all sections of this session
+        # (q_type, difficulty) -> unused questions, rotated in on restart
+        self.spares: Dict[tuple, List[Dict]] = {}
+        # Question text -> aptitude canonical answer / coding hidden tests;
+        # kept out of `questions`, which the client sees
+        self.answer_keys: Dict[str, str] = {}
+        self.hidden_tests: Dict[str, Dict] = {}
+
+        # Lazy generation: later sections land in `questions` while the candidate answers
+        self.total_questions = 0
+        self.generating = False
+        self.generation_tasks: List[asyncio.Task] = []
+        self.questions_ready = asyncio.Condition()
+
+        # Background evaluation: answer index -> task filling evaluations[index]
+        self.pending_evals: Dict[int, asyncio.Task] = {}
 
 
 class InterviewController:
     def __init__(self):
         self.qwen_client = QwenClient()
         self.scoring_engine = ScoringEngine()
+        self.question_pool = QuestionPool(self.qwen_client)
+        self.question_bank = QuestionBank()
         self.sessions: Dict[str, InterviewSession] = {}
 
         self.question_distribution = [
@@ -43,70 +69,281 @@ class InterviewController:
             ("hr",       [("medium", 1)]),
         ]
         self.max_rephrases_per_question = 2
+        # One variant per allowed rephrase, generated in the background on serve
+        self.rephrase_cache = RephraseCache(self.qwen_client, self.max_rephrases_per_question)
+        self.prefetch_rephrases = os.getenv("BEE_REPHRASE_PREFETCH", "1") == "1"
+        # Lazy mode returns as soon as the theory section exists
+        self.lazy_sessions = os.getenv("BEE_LAZY_SESSIONS", "1") == "1"
+        # Offline: pool + question bank only, 0 generation calls
+        self.offline_questions = os.getenv("BEE_OFFLINE_QUESTIONS", "0") == "1"
+        # Extra questions asked for per difficulty in the same call, kept as restart spares
+        self.spares_per_difficulty = int(os.getenv("BEE_SPARES_PER_DIFFICULTY", "1"))
+        # Share of each difficulty tier swapped out on an instant restart
+        self.restart_swap_ratio = float(os.getenv("BEE_RESTART_SWAP_RATIO", "0.34"))
+        # Return the next question immediately; scores are only needed for final results
+        self.background_eval = os.getenv("BEE_BACKGROUND_EVAL", "0") == "1"
+        self._background: Set[asyncio.Task] = set()
 
     def _cleanup_old_sessions(self):
         cutoff = datetime.now() - timedelta(hours=2)
         expired = [sid for sid, s in self.sessions.items() if s.created_at < cutoff]
         for sid in expired:
-            del self.sessions[sid]
+            self.delete_session(sid)
 
-    async def create_session(self, skills: List[str], experience: str = None, role: str = None) -> str:
+    async def create_session(
+        self, skills: List[str], experience: str = None, role: str = None, lazy: bool = None,
+    ) -> str:
         self._cleanup_old_sessions()
         session_id = str(uuid.uuid4())
         session = InterviewSession(session_id, skills, experience, role)
         self.sessions[session_id] = session
-        await self._generate_questions(session)
+        self.question_pool.record_demand(skills)
+        await self._generate_questions(session, self.lazy_sessions if lazy is None else lazy)
         session.status = "in_progress"
         return session_id
 
-    async def _generate_questions(self, session: InterviewSession):
+    async def restart_session(self, session_id: str, fresh_sections: List[str] = None) -> Optional[str]:
         """
-        4 sequential calls with 1.5s delay between each to avoid rate limits.
-        Gaps filled from local fallbacks.
+        New session from the old one's questions — shuffled, with some swapped
+        for spares. 0 calls unless the candidate asked for fresh sections.
         """
-        async def generate_for_type(q_type, difficulty_counts):
-            generated = await self.qwen_client.generate_questions_batch(
-                session.skills, q_type, difficulty_counts, [],
-            )
+        self._cleanup_old_sessions()
+        old = self.sessions.get(session_id)
+        if not old:
+            return None
+        new_id = str(uuid.uuid4())
+        session = InterviewSession(new_id, old.skills, old.experience, old.role)
+        # Bank questions already seen stay excluded, so the next restart doesn't bring them back
+        session.bank_ids |= old.bank_ids
+        self.sessions[new_id] = session
+        self.question_pool.record_demand(old.skills)
+        await self._generate_questions(
+            session, self.lazy_sessions, reuse_from=old, fresh_sections=fresh_sections or [],
+        )
+        session.status = "in_progress"
+        return new_id
 
-            diff_order = []
-            for diff, count in difficulty_counts:
-                diff_order.extend([diff] * count)
+    async def _generate_questions(
+        self, session: InterviewSession, lazy: bool = False,
+        reuse_from: InterviewSession = None, fresh_sections: List[str] = (),
+    ):
+        """
+        All 4 sections start at once (pool first, LLM for the rest).
+        Eager: wait for every section. Lazy: wait for section 1 only —
+        the rest are appended in order by a background task.
+        reuse_from: rebuild sections from that session instead (except fresh_sections).
+        """
+        session.total_questions = sum(
+            count for _, difficulty_counts in self.question_distribution for _, count in difficulty_counts
+        )
+        session.generating = True
+        session.generation_tasks = [
+            asyncio.create_task(
+                self._reuse_section(session, reuse_from, q_type, difficulty_counts)
+                if reuse_from and q_type not in fresh_sections
+                else self._generate_section(session, q_type, difficulty_counts)
+            )
+            for q_type, difficulty_counts in self.question_distribution
+        ]
+        collector = asyncio.create_task(self._collect_sections(session))
+        session.generation_tasks.append(collector)
 
-            api_by_diff: Dict[str, list] = {}
-            for q in generated:
-                d = q.get("difficulty", "medium")
-                api_by_diff.setdefault(d, []).append(q)
+        if lazy:
+            await self._wait_for_question(session, 0)
+        else:
+            await collector
 
-            results = []
-            for diff in diff_order:
-                if api_by_diff.get(diff):
-                    q_data = api_by_diff[diff].pop(0)
-                else:
-                    q_data = next(
-                        (v.pop(0) for v in api_by_diff.values() if v), None
-                    ) or self._get_fallback_question(q_type, diff)
+    async def _collect_sections(self, session: InterviewSession):
+        """
+        Append sections in interview order as each finishes, waking any waiters.
+        A section whose task failed is filled from the question bank instead.
+        """
+        sections = session.generation_tasks[:len(self.question_distribution)]
+        try:
+            for task, (q_type, difficulty_counts) in zip(sections, self.question_distribution):
+                try:
+                    type_questions = await task
+                except Exception as e:
+                    print(f":( {q_type} section generation failed: {type(e).__name__}: {e} — using question bank")
+                    type_questions = await self._fallback_section(session, q_type, difficulty_counts)
+                async with session.questions_ready:
+                    for q in type_questions:
+                        session.questions.append({"id": len(session.questions), **q})
+                    session.questions_ready.notify_all()
+        finally:
+            # Collected early (cancelled): still retrieve the other sections' exceptions
+            for task in sections:
+                if task.done() and not task.cancelled():
+                    task.exception()
+            async with session.questions_ready:
+                session.generating = False
+                session.total_questions = len(session.questions)
+                session.questions_ready.notify_all()
+
+    async def _fallback_section(
+        self, session: InterviewSession, q_type: str, difficulty_counts: List[tuple],
+    ) -> List[Dict]:
+        results = []
+        for diff, count in difficulty_counts:
+            for _ in range(count):
+                q = await self._get_fallback_question(session, q_type, diff)
+                results.append({
+                    "type": q_type,
+                    "difficulty": diff,
+                    "question": q["question"],
+                    "topic": q.get("topic", q_type.capitalize()),
+                })
+                if q.get("answer"):
+                    session.answer_keys[q["question"]] = q["answer"]
+                if q.get("tests"):
+                    session.hidden_tests[q["question"]] = q["tests"]
+        return results
+
+    async def _wait_for_question(self, session: InterviewSession, idx: int) -> bool:
+        """Block only if the candidate has outrun generation. False = no such question."""
+        if idx < len(session.questions):
+            return True
+        async with session.questions_ready:
+            await session.questions_ready.wait_for(
+                lambda: idx < len(session.questions) or not session.generating
+            )
+        return idx < len(session.questions)
 
+    async def _generate_section(self, session: InterviewSession, q_type: str, difficulty_counts: List[tuple]) -> List[Dict]:
+        """
+        Pool first, then 1 call for whatever the pool lacks,
+        paced by QwenClient's shared rate limiter. Gaps filled from the QuestionBank.
+        Offline mode skips the call and the refill entirely.
+        """
+        pooled, missing = await self.question_pool.draw(
+            session.skills, q_type, difficulty_counts,
+        )
+        generated = list(pooled)
+        for q in pooled:
+            session.dedup.add(q["question"])
+        if missing and not self.offline_questions:
+            # Same call, a few extra questions — leftovers become restart spares
+            ask = [(diff, count + self.spares_per_difficulty) for diff, count in missing]
+            fresh = await self.qwen_client.generate_questions_batch(
+                session.skills, q_type, ask, pooled, dedup=session.dedup, session_id=session.session_id,
+            )
+            generated += fresh
+            if fresh:
+                self._run_in_background(self.question_bank.add_many_async(
+                    q_type, fresh, skills=None if q_type == "aptitude" else session.skills,
+                ))
+        if not self.offline_questions:
+            self.question_pool.schedule_refill(session.skills, q_type, difficulty_counts)
+
+        diff_order = []
+        for diff, count in difficulty_counts:
+            diff_order.extend([diff] * count)
+
+        api_by_diff: Dict[str, list] = {}
+        for q in generated:
+            d = q.get("difficulty", "medium")
+            api_by_diff.setdefault(d, []).append(q)
+
+        results = []
+        for diff in diff_order:
+            if api_by_diff.get(diff):
+                q_data = api_by_diff[diff].pop(0)
+            else:
+                q_data = next(
+                    (v.pop(0) for v in api_by_diff.values() if v), None
+                ) or await self._get_fallback_question(session, q_type, diff)
+
+            results.append({
+                "type": q_type,
+                "difficulty": diff,
+                "question": q_data["question"],
+                "topic": q_data.get("topic", q_type.capitalize()),
+            })
+            if q_data.get("answer"):
+                session.answer_keys[q_data["question"]] = q_data["answer"]
+            if q_data.get("tests"):
+                session.hidden_tests[q_data["question"]] = q_data["tests"]
+
+        for diff, leftovers in api_by_diff.items():
+            session.spares.setdefault((q_type, diff), []).extend(leftovers)
+        return results
+
+    async def _reuse_section(
+        self, session: InterviewSession, old: InterviewSession, q_type: str, difficulty_counts: List[tuple],
+    ) -> List[Dict]:
+        """
+        Rebuild a section from `old`: shuffle within each difficulty tier and
+        swap restart_swap_ratio of it for the old session's spares, then pool,
+        then bank questions. Old questions that were swapped out become spares.
+        If the old session never finished this section, generate it normally.
+        """
+        if old.generating:
+            await asyncio.gather(*old.generation_tasks, return_exceptions=True)
+        old_section = [q for q in old.questions if q["type"] == q_type]
+        if len(old_section) < sum(c for _, c in difficulty_counts):
+            return await self._generate_section(session, q_type, difficulty_counts)
+
+        results = []
+        for diff, count in difficulty_counts:
+            tier = [q for q in old_section if q["difficulty"] == diff][:count]
+            random.shuffle(tier)
+            spares = list(old.spares.get((q_type, diff), []))
+
+            swap = min(round(count * self.restart_swap_ratio), len(tier))
+            subs = []
+            while spares and len(subs) < swap:
+                subs.append(spares.pop(0))
+            if len(subs) < swap:
+                subs += self.question_pool.take(session.skills, q_type, diff, swap - len(subs))
+            if len(subs) < swap:
+                banked = await self.question_bank.sample_async(
+                    q_type, diff, swap - len(subs),
+                    skills=None if q_type == "aptitude" else session.skills,
+                    exclude=session.bank_ids,
+                )
+                session.bank_ids.update(q["id"] for q in banked)
+                subs += banked
+            subs = [q for q in subs if not session.dedup.is_duplicate(q["question"])]
+
+            kept = tier[:count - len(subs)]
+            session.spares[(q_type, diff)] = spares + tier[len(kept):]
+            for q in kept + subs:
+                session.dedup.add(q["question"])
+                answer = q.get("answer") or old.answer_keys.get(q["question"])
+                if answer:
+                    session.answer_keys[q["question"]] = answer
+                tests = q.get("tests") or old.hidden_tests.get(q["question"])
+                if tests:
+                    session.hidden_tests[q["question"]] = tests
                 results.append({
                     "type": q_type,
                     "difficulty": diff,
-                    "question": q_data["question"],
-                    "topic": q_data.get("topic", q_type.capitalize()),
+                    "question": q["question"],
+                    "topic": q.get("topic", q_type.capitalize()),
                 })
-            return results
-
-        # Sequential with delay to stay under rate limits
-        for i, (q_type, difficulty_counts) in enumerate(self.question_distribution):
-            if i > 0:
-                await asyncio.sleep(1.5)
-            type_questions = await generate_for_type(q_type, difficulty_counts)
-            for q in type_questions:
-                session.questions.append({"id": len(session.questions), **q})
-
-    def _get_fallback_question(self, q_type: str, difficulty: str) -> Dict:
-        bank = _FALLBACKS.get(q_type, {}).get(difficulty, [])
-        if bank:
-            return bank[0]
+        return results
+
+    def _on_question_served(self, session: InterviewSession, question: Dict):
+        # Speculative: have rephrasings ready before the candidate asks
+        if self.prefetch_rephrases:
+            self.rephrase_cache.prefetch(question["question"], question["type"], session_id=session.session_id)
+
+    def _run_in_background(self, coro):
+        task = asyncio.create_task(coro)
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    async def _get_fallback_question(self, session: InterviewSession, q_type: str, difficulty: str) -> Dict:
+        picked = await self.question_bank.sample_async(
+            q_type, difficulty, 3,
+            skills=None if q_type == "aptitude" else session.skills,
+            exclude=session.bank_ids,
+        )
+        for q in picked:
+            session.bank_ids.add(q["id"])
+            if not session.dedup.is_duplicate(q["question"]):
+                session.dedup.add(q["question"])
+                return q
         return {
             "question": f"Explain your experience with {q_type} concepts.",
             "topic": q_type.capitalize(),
@@ -114,11 +351,52 @@ class InterviewController:
         }
 
     async def submit_answer(self, session_id: str, answer: str) -> Dict:
+        session, early, eval_kwargs = await self._begin_submission(session_id, answer)
+        if early is not None:
+            return early
+
+        if self.background_eval:
+            return await self._record_answer_deferred(session, answer, eval_kwargs)
+
+        # LLM SCORING: Call API only for valid answers
+        evaluation = await self.qwen_client.evaluate_answer(**eval_kwargs)
+        return await self._record_answer(session, answer, evaluation)
+
+    async def submit_answer_stream(self, session_id: str, answer: str) -> AsyncIterator[Tuple[str, Dict]]:
+        """
+        submit_answer() as events: ("token", {"text"}) while the model writes feedback,
+        ("evaluation", scores) once its JSON closes, then ("done", next-question response).
+        """
+        session, early, eval_kwargs = await self._begin_submission(session_id, answer)
+        if early is not None:
+            yield "done", early
+            return
+        if self.background_eval:
+            # Nothing to stream — the score arrives after the candidate has moved on
+            yield "done", await self._record_answer_deferred(session, answer, eval_kwargs)
+            return
+
+        evaluation = None
+        async for kind, payload in self.qwen_client.evaluate_answer_stream(**eval_kwargs):
+            if kind == "token":
+                yield "token", {"text": payload}
+            else:
+                evaluation = payload
+                yield "evaluation", evaluation
+        yield "done", await self._record_answer(session, answer, evaluation)
+
+    async def _begin_submission(
+        self, session_id: str, answer: str,
+    ) -> Tuple[Optional[InterviewSession], Optional[Dict], Optional[Dict]]:
+        """
+        Everything before the LLM call. Returns (session, early_response, eval_kwargs) —
+        early_response is set when no evaluation call is needed.
+        """
         session = self.sessions.get(session_id)
         if not session:
-            return {"error": "Session not found"}
-        if session.current_question_index >= len(session.questions):
-            return {"error": "No more questions"}
+            return None, {"error": "Session not found"}, None
+        if not await self._wait_for_question(session, session.current_question_index):
+            return session, {"error": "No more questions"}, None
 
         current_question = session.questions[session.current_question_index]
         classification = classify_response_local(current_question["question"], answer)
@@ -128,10 +406,10 @@ class InterviewController:
             session.off_topic_warnings += 1
             if session.off_topic_warnings == 1:
                 # First off-topic: just warn, don't store anything yet
-                return {
+                return session, {
                     "warning": "WARNING: Stay on topic. Answer the question asked or you will fail this question.",
                     "continue": True,
-                }
+                }, None
             else:
                 # Second off-topic: store answer + evaluation OFFLINE (no API call)
                 session.answers.append(answer)
@@ -143,7 +421,7 @@ class InterviewController:
                 })
                 session.off_topic_warnings = 0
                 session.current_question_index += 1
-                return await self._get_next_question_response(session)
+                return session, await self._get_next_question_response(session), None
 
         # Valid answer: reset warning counter and proceed to LLM scoring
         session.off_topic_warnings = 0
@@ -154,46 +432,84 @@ class InterviewController:
             for i in range(len(session.answers))
         ]
 
-        # LLM SCORING: Call API only for valid answers
-        evaluation = await self.qwen_client.evaluate_answer(
-            current_question["question"],
-            answer,
-            current_question["topic"],
-            q_type=current_question["type"],
-            previous_qa=previous_qa,
-        )
+        return session, None, {
+            "question": current_question["question"],
+            "answer": answer,
+            "topic": current_question["topic"],
+            "q_type": current_question["type"],
+            "difficulty": current_question.get("difficulty"),
+            "expected_answer": session.answer_keys.get(current_question["question"]),
+            "hidden_tests": session.hidden_tests.get(current_question["question"]),
+            "previous_qa": previous_qa,
+            "session_id": session.session_id,
+        }
 
-        if not evaluation:
-            evaluation = {
-                "correctness": 1,
-                "depth": 1,
-                "clarity": 1,
-                "feedback": "Unable to evaluate. Default low score assigned.",
-            }
+    def _default_evaluation(self) -> Dict:
+        return {
+            "correctness": 1,
+            "depth": 1,
+            "clarity": 1,
+            "feedback": "Unable to evaluate. Default low score assigned.",
+        }
 
+    async def _record_answer(self, session: InterviewSession, answer: str, evaluation: Optional[Dict]) -> Dict:
         # Store answer + evaluation (always in sync)
         session.answers.append(answer)
-        session.evaluations.append(evaluation)
+        session.evaluations.append(evaluation or self._default_evaluation())
         session.current_question_index += 1
         return await self._get_next_question_response(session)
 
+    async def _record_answer_deferred(self, session: InterviewSession, answer: str, eval_kwargs: Dict) -> Dict:
+        """Store the answer with a None placeholder and score it in the background."""
+        idx = len(session.answers)
+        session.answers.append(answer)
+        session.evaluations.append(None)
+        task = asyncio.create_task(self._evaluate_in_background(session, idx, eval_kwargs))
+        session.pending_evals[idx] = task
+        task.add_done_callback(lambda _: session.pending_evals.pop(idx, None))
+        session.current_question_index += 1
+        return await self._get_next_question_response(session)
+
+    async def _evaluate_in_background(self, session: InterviewSession, idx: int, eval_kwargs: Dict):
+        try:
+            evaluation = await self.qwen_client.evaluate_answer(**eval_kwargs)
+        except Exception as e:
+            print(f"⚠️ Background evaluation failed (Q{idx + 1}): {type(e).__name__}: {e}")
+            evaluation = None
+        session.evaluations[idx] = evaluation or self._default_evaluation()
+
+    def evaluation_status(self, session_id: str) -> Optional[Dict]:
+        session = self.sessions.get(session_id)
+        if not session:
+            return None
+        pending = len(session.pending_evals)
+        return {
+            "answered": len(session.answers),
+            "evaluated": len(session.answers) - pending,
+            "pending": pending,
+            "completed": session.status == "completed",
+        }
+
     async def rephrase_current_question(self, session_id: str) -> Dict:
         session = self.sessions.get(session_id)
         if not session:
             return {"error": "Session not found"}
         idx = session.current_question_index
-        if idx >= len(session.questions):
+        if not await self._wait_for_question(session, idx):
             return {"error": "No current question"}
         used = session.rephrase_counts.get(idx, 0)
         if used >= self.max_rephrases_per_question:
             return {"error": "No rephrase attempts remaining"}
 
         current_q = session.questions[idx]
-        rephrased = await self.qwen_client.rephrase_question(
-            current_q["question"], current_q["type"],
-        )
+        rephrased = await self.rephrase_cache.variant(current_q["question"], current_q["type"], used)
         if not rephrased:
-            return {"error": "Could not rephrase question"}
+            rephrased = await self.qwen_client.rephrase_question(
+                current_q["question"], current_q["type"], session_id=session.session_id,
+            )
+            if not rephrased:
+                return {"error": "Could not rephrase question"}
+            self.rephrase_cache.add(current_q["question"], current_q["type"], [rephrased])
 
         session.rephrase_counts[idx] = used + 1
         remaining = self.max_rephrases_per_question - session.rephrase_counts[idx]
@@ -207,7 +523,10 @@ class InterviewController:
         # Always reset warning counter when moving to a new question
         session.off_topic_warnings = 0
 
-        if session.current_question_index >= len(session.questions):
+        if not await self._wait_for_question(session, session.current_question_index):
+            if session.pending_evals:
+                # Last answer submitted — final results need every background score
+                await asyncio.gather(*list(session.pending_evals.values()), return_exceptions=True)
             session.status = "completed"
             # FINAL SCORING: All calculation is LOCAL (no API calls)
             results = self.scoring_engine.calculate_final_results(
@@ -232,21 +551,23 @@ class InterviewController:
 
         next_question = session.questions[session.current_question_index]
         idx = session.current_question_index
+        self._on_question_served(session, next_question)
         return {
             "completed": False,
             "question": next_question,
-            "progress": {"current": idx + 1, "total": len(session.questions)},
+            "progress": {"current": idx + 1, "total": session.total_questions},
             "rephrases_remaining": self.max_rephrases_per_question - session.rephrase_counts.get(idx, 0),
         }
 
-    def get_current_question(self, session_id: str) -> Optional[Dict]:
+    async def get_current_question(self, session_id: str) -> Optional[Dict]:
         session = self.sessions.get(session_id)
-        if not session or session.current_question_index >= len(session.questions):
+        if not session or not await self._wait_for_question(session, session.current_question_index):
             return None
         idx = session.current_question_index
+        self._on_question_served(session, session.questions[idx])
         return {
             "question": session.questions[idx],
-            "progress": {"current": idx + 1, "total": len(session.questions)},
+            "progress": {"current": idx + 1, "total": session.total_questions},
             "rephrases_remaining": self.max_rephrases_per_question - session.rephrase_counts.get(idx, 0),
         }
 
@@ -254,5 +575,8 @@ class InterviewController:
         return self.sessions.get(session_id)
 
     def delete_session(self, session_id: str):
-        if session_id in self.sessions:
-            del self.sessions[session_id]
+        session = self.sessions.pop(session_id, None)
+        if session:
+            for task in session.generation_tasks + list(session.pending_evals.values()):
+                task.cancel()
+            self.qwen_client.budget.forget(session_id)
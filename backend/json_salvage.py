@@ -0,0 +1,205 @@
+"""
+Tolerant JSON parsing for model output
+Handles what Qwen actually sends back: ```json fences, prose around the JSON,
+trailing commas, missing commas between objects, bare objects with no
+enclosing array, and output cut off at max_tokens. Arrays keep every element
+that was complete; a cut-off object is closed (open string, dangling key,
+brackets) so a score with a truncated feedback sentence still parses.
+Every result says what was repaired, so callers can decide how far to trust it.
+"""
+
+import re
+import json
+from dataclasses import dataclass, field
+from typing import Any, List, Optional, Tuple
+
+_FENCE_RE = re.compile(r"```(?:json)?\s*(.*?)(?:```|$)", re.S | re.I)
+_TRAILING_COMMA_RE = re.compile(r",\s*([}\]])")
+_MISSING_COMMA_RE = re.compile(r"([}\]])\s*(?=[{\[])")
+_DANGLING_KEY_RE = re.compile(r'([,{])\s*"[^"\\]*"\s*:?\s*$')
+_STRING_RE = re.compile(r'"(?:[^"\\]|\\.)*"', re.S)
+_OPEN_RE = re.compile(r"[\[{]")
+
+
+@dataclass
+class Salvaged:
+    value: Any = None
+    complete: bool = True          # parsed as-is, nothing dropped or closed
+    repairs: List[str] = field(default_factory=list)
+    dropped: int = 0               # array elements that could not be recovered
+
+
+def _clean(text: str, repairs: List[str]) -> str:
+    text = text.replace("\u2019", "'").replace("\u2018", "'")
+    fenced = _FENCE_RE.search(text)
+    if fenced and fenced.group(1).strip():
+        repairs.append("code_fence")
+        text = fenced.group(1)
+    return text
+
+
+def _repair_syntax(text: str) -> str:
+    """Trailing/missing commas, fixed only outside string literals."""
+    out, last = [], 0
+    for m in _STRING_RE.finditer(text):
+        out.append(_MISSING_COMMA_RE.sub(r"\1,", _TRAILING_COMMA_RE.sub(r"\1", text[last:m.start()])))
+        out.append(m.group(0))
+        last = m.end()
+    out.append(_MISSING_COMMA_RE.sub(r"\1,", _TRAILING_COMMA_RE.sub(r"\1", text[last:])))
+    return "".join(out)
+
+
+def _loads(text: str, repairs: List[str]) -> Any:
+    try:
+        return json.loads(text, strict=False)
+    except ValueError:
+        pass
+    value = json.loads(_repair_syntax(text), strict=False)  # raises if still broken
+    repairs.append("syntax")
+    return value
+
+
+def _scan(text: str) -> Tuple[List[str], Optional[int], bool, List[str]]:
+    """
+    Walk text[0] = '[' or '{'. Returns (complete depth-1 element spans,
+    index of the matching close or None, cut inside a string?, open-bracket stack).
+    """
+    spans: List[str] = []
+    stack: List[str] = []
+    in_str = escaped = False
+    elem_start = None
+    for i, ch in enumerate(text):
+        if in_str:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_str = False
+                if len(stack) == 1 and elem_start is not None and text[elem_start] == '"':
+                    spans.append(text[elem_start:i + 1])
+                    elem_start = None
+            continue
+        if ch == '"':
+            in_str = True
+            if len(stack) == 1 and elem_start is None:
+                elem_start = i
+        elif ch in "[{":
+            stack.append(ch)
+            if len(stack) == 2 and elem_start is None:
+                elem_start = i
+        elif ch in "]}":
+            if not stack:
+                break
+            stack.pop()
+            if not stack:
+                return spans, i, False, stack
+            if len(stack) == 1 and elem_start is not None:
+                spans.append(text[elem_start:i + 1])
+                elem_start = None
+    return spans, None, in_str, stack
+
+
+def _items(value: Any) -> bool:
+    """A list of what callers ask the model for — objects or strings, not `[1]` from the prose."""
+    return isinstance(value, list) and all(isinstance(v, (dict, str)) for v in value)
+
+
+def _salvage_spans(spans: List[str], result: Salvaged) -> Salvaged:
+    # Element by element — keep whatever is whole
+    result.complete = False
+    for span in spans:
+        try:
+            value = _loads(span, result.repairs)
+        except ValueError:
+            value = None
+        if isinstance(value, (dict, str)):
+            result.value.append(value)
+        else:
+            result.dropped += 1
+    return result
+
+
+def parse_array(text: Optional[str]) -> Salvaged:
+    """Every complete element of the first JSON array of objects/strings in `text` (value = [] if none)."""
+    result = Salvaged(value=[])
+    if not text:
+        result.complete = False
+        return result
+    text = _clean(text, result.repairs)
+    empty = False
+    pos = 0
+    while True:
+        match = _OPEN_RE.search(text, pos)
+        if not match:
+            result.complete = empty
+            return result
+        start = match.start()
+        body = text[start:]
+        spans, close, _, _ = _scan(body)
+
+        bare = body[0] == "{"
+        if bare:
+            if close is not None:
+                try:
+                    is_object = isinstance(_loads(body[:close + 1], []), dict)
+                except ValueError:
+                    is_object = False
+                if not is_object:
+                    # Braces in the prose
+                    pos = start + close + 1
+                    continue
+            # Objects with no enclosing array — brackets inside them are theirs
+            result.repairs.append("missing_array")
+            body = "[" + body.rstrip() + "]"
+            spans, close, _, _ = _scan(body)
+
+        if close is None:
+            result.repairs.append("truncated")
+            return _salvage_spans(spans, result)
+        try:
+            value = _loads(body[:close + 1], result.repairs)
+        except ValueError:
+            value = None
+        if _items(value) and (value or bare):
+            result.value = value
+            return result
+        if bare:
+            return _salvage_spans(spans, result)
+        # `[1]`, `[]` or a broken array in the prose — keep looking
+        empty = empty or value == []
+        pos = start + close + 1
+
+
+def parse_object(text: Optional[str]) -> Salvaged:
+    """The first JSON object in `text`, closed off if the output was cut (value = None if unusable)."""
+    result = Salvaged()
+    if not text:
+        result.complete = False
+        return result
+    text = _clean(text, result.repairs)
+    start = text.find("{")
+    if start == -1:
+        result.complete = False
+        return result
+
+    body = text[start:]
+    _, close, in_str, stack = _scan(body)
+    if close is not None:
+        candidate = body[:close + 1]
+    else:
+        result.complete = False
+        result.repairs.append("truncated")
+        candidate = body.rstrip() + ('"' if in_str else "")
+        candidate = _DANGLING_KEY_RE.sub(r"\1", candidate).rstrip().rstrip(",")
+        candidate += "".join("}" if c == "{" else "]" for c in reversed(stack))
+    try:
+        value = _loads(candidate, result.repairs)
+    except ValueError:
+        result.complete = False
+        return result
+    if not isinstance(value, dict):
+        result.complete = False
+        return result
+    result.value = value
+    return result
@@ -0,0 +1,165 @@
+"""
+LLM backends behind QwenClient.generate
+Every backend speaks the OpenAI chat-completions protocol over one pooled
+httpx client, so the limiter, circuit breaker and streaming code are shared.
+Selected with BEE_LLM_BACKEND:
+  hf     : HuggingFace router (default) — needs HF_API_KEY
+  openai : any OpenAI-compatible server (vLLM, TGI, Ollama, OpenAI) — BEE_LLM_BASE_URL
+  fake   : bundled fake_llm_server.py, in-process — no key, no network
+"""
+
+import os
+import asyncio
+from contextlib import AsyncExitStack, asynccontextmanager
+from typing import AsyncIterator, Dict, Optional
+
+import httpx
+
+# Fail fast on an unreachable host; the per-call timeout covers the generation itself
+_CONNECT_TIMEOUT = 10.0
+
+
+class LLMBackend:
+    name = "base"
+
+    def __init__(
+        self, base_url: str, model: str, api_key: Optional[str], pool_size: int, timeout: float,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.model = model
+        self.http = httpx.AsyncClient(
+            base_url=base_url,
+            headers={"Authorization": f"Bearer {api_key}"} if api_key else {},
+            limits=httpx.Limits(
+                max_connections=pool_size,
+                max_keepalive_connections=pool_size,
+                keepalive_expiry=120,
+            ),
+            timeout=httpx.Timeout(timeout, connect=_CONNECT_TIMEOUT),
+            transport=transport,
+        )
+
+    def _body(
+        self, prompt: str, max_tokens: int, temperature: float, stream: bool = False, model: Optional[str] = None,
+    ) -> Dict:
+        body = {
+            "model": model or self.model,
+            "messages": [{"role": "user", "content": prompt}],
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+            "top_p": 0.9,
+        }
+        if stream:
+            body["stream"] = True
+        return body
+
+    async def complete(
+        self, prompt: str, max_tokens: int, temperature: float, timeout: float, model: Optional[str] = None,
+    ) -> httpx.Response:
+        """POST one completion. Raises httpx errors (including non-2xx) for the caller to classify."""
+        response = await self.http.post(
+            "/chat/completions", json=self._body(prompt, max_tokens, temperature, model=model),
+            timeout=httpx.Timeout(timeout, connect=min(timeout, _CONNECT_TIMEOUT)),
+        )
+        response.raise_for_status()
+        return response
+
+    @asynccontextmanager
+    async def stream(
+        self, prompt: str, max_tokens: int, temperature: float, model: Optional[str] = None,
+    ) -> AsyncIterator[httpx.Response]:
+        async with self.http.stream(
+            "POST", "/chat/completions", json=self._body(prompt, max_tokens, temperature, stream=True, model=model),
+        ) as response:
+            response.raise_for_status()
+            yield response
+
+    @staticmethod
+    def text(response: httpx.Response) -> str:
+        return response.json()["choices"][0]["message"]["content"].strip()
+
+    async def aclose(self):
+        await self.http.aclose()
+
+
+class HFBackend(LLMBackend):
+    name = "hf"
+
+    def __init__(self, pool_size: int, timeout: float):
+        api_key = os.getenv("HF_API_KEY")
+        if not api_key:
+            raise ValueError("HF_API_KEY environment variable not set")
+        super().__init__(
+            base_url=os.getenv("BEE_HF_BASE_URL", "https://router.huggingface.co/v1"),
+            model=os.getenv("BEE_LLM_MODEL", "Qwen/Qwen2.5-7B-Instruct"),
+            api_key=api_key,
+            pool_size=pool_size,
+            timeout=timeout,
+        )
+
+
+class OpenAICompatibleBackend(LLMBackend):
+    name = "openai"
+
+    def __init__(self, pool_size: int, timeout: float):
+        base_url = os.getenv("BEE_LLM_BASE_URL")
+        if not base_url:
+            raise ValueError("BEE_LLM_BASE_URL environment variable not set")
+        super().__init__(
+            base_url=base_url,
+            model=os.getenv("BEE_LLM_MODEL", "Qwen/Qwen2.5-7B-Instruct"),
+            api_key=os.getenv("BEE_LLM_API_KEY"),
+            pool_size=pool_size,
+            timeout=timeout,
+        )
+
+
+class FakeBackend(LLMBackend):
+    name = "fake"
+
+    def __init__(self, pool_size: int, timeout: float):
+        from fake_llm_server import app
+        super().__init__(
+            base_url="http://fake-llm/v1",
+            model="fake-qwen",
+            api_key=None,
+            pool_size=pool_size,
+            timeout=timeout,
+            transport=httpx.ASGITransport(app=app),
+        )
+
+    # ASGITransport ignores httpx timeouts, so a hung fake call (BEE_FAKE_TIMEOUT_RATE)
+    # is cut off here and surfaces as the same ReadTimeout a real server would give
+    async def complete(
+        self, prompt: str, max_tokens: int, temperature: float, timeout: float, model: Optional[str] = None,
+    ) -> httpx.Response:
+        try:
+            return await asyncio.wait_for(super().complete(prompt, max_tokens, temperature, timeout, model), timeout)
+        except asyncio.TimeoutError:
+            raise httpx.ReadTimeout(f"fake LLM gave no response within {timeout}s") from None
+
+    @asynccontextmanager
+    async def stream(
+        self, prompt: str, max_tokens: int, temperature: float, model: Optional[str] = None,
+    ) -> AsyncIterator[httpx.Response]:
+        # The transport buffers the whole body, so only the wait for the response can hang
+        timeout = self.http.timeout.read
+        async with AsyncExitStack() as stack:
+            try:
+                response = await asyncio.wait_for(
+                    stack.enter_async_context(super().stream(prompt, max_tokens, temperature, model)), timeout,
+                )
+            except asyncio.TimeoutError:
+                raise httpx.ReadTimeout(f"fake LLM gave no response within {timeout}s") from None
+            yield response
+
+
+_BACKENDS = {b.name: b for b in (HFBackend, OpenAICompatibleBackend, FakeBackend)}
+
+
+def create_backend(pool_size: int, timeout: float, name: Optional[str] = None) -> LLMBackend:
+    """The BEE_LLM_BACKEND backend, or `name` (hf|openai|fake) for model routes on another server."""
+    name = (name or os.getenv("BEE_LLM_BACKEND", "hf")).strip().lower()
+    if name not in _BACKENDS:
+        raise ValueError(f"Unknown BEE_LLM_BACKEND '{name}' (expected one of: {', '.join(_BACKENDS)})")
+    return _BACKENDS[name](pool_size, timeout)
@@ -2,6 +2,8 @@
 Local utilities - zero API calls needed
 """
 
+from skill_index import SkillIndex, normalize
+
 KNOWN_TECH_SKILLS = {
     # Languages
     "python", "java", "javascript", "c++", "c", "r", "scala", "julia", "matlab",
@@ -48,6 +50,57 @@ KNOWN_TECH_SKILLS = {
     "microservices", "distributed systems",
 }
 
+# Canonical skill -> other names for it. Unlisted skills are their own canonical ID.
+SKILL_ALIASES = {
+    "machine learning": ["ml"],
+    "deep learning": ["dl"],
+    "natural language processing": ["nlp"],
+    "computer vision": ["cv"],
+    "reinforcement learning": ["rl"],
+    "neural networks": ["neural network", "neural nets"],
+    "large language models": ["llm", "llms", "large language model"],
+    "generative ai": ["gen ai", "genai"],
+    "gans": ["gan", "generative adversarial networks"],
+    "autoencoders": ["autoencoder"],
+    "vision transformer": ["vit"],
+    "attention mechanism": ["attention"],
+    "scikit-learn": ["sklearn", "scikit learn"],
+    "huggingface": ["hugging face"],
+    "llamaindex": ["llama index"],
+    "pytorch": ["torch"],
+    "javascript": ["js"],
+    "typescript": ["ts"],
+    "golang": ["go"],
+    "postgresql": ["postgres"],
+    # Compounds the word-boundary contains step can't split
+    "spark": ["pyspark", "sparksql"],
+    "mongodb": ["mongo", "pymongo"],
+    "google cloud": ["gcp"],
+    "kubernetes": ["k8s"],
+    "ci/cd": ["cicd", "ci cd"],
+    "retrieval augmented generation": ["rag"],
+    "support vector machine": ["svm"],
+    "named entity recognition": ["ner"],
+    "decision tree": ["decision trees"],
+    "data structures": ["dsa"],
+    "artificial intelligence": ["ai"],
+}
+
+# Exact hash + Aho-Corasick + trigram/edit-distance index, compiled once at import
+_SKILL_INDEX = SkillIndex(KNOWN_TECH_SKILLS, SKILL_ALIASES)
+
+
+def canonical_skill(skill: str) -> str:
+    """
+    Canonical skill ID ("ML" -> "machine learning", "pytroch" -> "pytorch").
+    Only exact aliases and typos are folded: "graph neural networks" merely
+    contains a known skill and keeps its own (normalised) ID.
+    """
+    match = _SKILL_INDEX.match(skill)
+    if match and match.kind in ("exact", "fuzzy"):
+        return match.canonical
+    return normalize(skill)
+
 
 def _is_gibberish_skill(text: str) -> bool:
     """
@@ -91,10 +144,13 @@ def _is_gibberish_skill(text: str) -> bool:
 def validate_skills_local(skills: list) -> tuple:
     """
     Returns (valid_skills, invalid_skills).
-    Checks against known tech/AI/ML skills locally.
+    Checks against known tech/AI/ML skills locally via the compiled skill index.
+    Typos are corrected to the canonical name ("pytroch" -> "pytorch");
+    two names for one skill ("ML", "Machine Learning") keep only the first.
     """
     valid = []
     invalid = []
+    seen = set()
     for skill in skills:
         skill_clean = skill.lower().strip()
         if not skill_clean:
@@ -105,23 +161,14 @@ def validate_skills_local(skills: list) -> tuple:
             invalid.append(skill.strip())
             continue
 
-        matched = False
-        for known in KNOWN_TECH_SKILLS:
-            if len(known) <= 2:
-                # Short skills (r, c, go) must be exact match only
-                if skill_clean == known:
-                    matched = True
-                    break
-            else:
-                # Normal substring matching for longer skills
-                if skill_clean == known or skill_clean in known or known in skill_clean:
-                    matched = True
-                    break
-
-        if matched:
-            valid.append(skill.strip())
-        else:
+        match = _SKILL_INDEX.match(skill_clean)
+        if match is None:
             invalid.append(skill.strip())
+            continue
+        canonical = canonical_skill(skill_clean)
+        if canonical not in seen:
+            seen.add(canonical)
+            valid.append(match.canonical if match.kind == "fuzzy" else skill.strip())
     return valid, invalid
 
 
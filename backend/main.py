@@ -3,10 +3,12 @@ FastAPI main application
 """
 
 import os
-from fastapi import FastAPI, UploadFile, File, HTTPException
+import json
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, UploadFile, File, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, StreamingResponse
 from pydantic import BaseModel
 from typing import List, Optional
 import PyPDF2
@@ -16,10 +18,21 @@ from pathlib import Path
 
 from interview_controller import InterviewController
 from local_utils import validate_skills_local
+from warmup import WarmupRunner
 
 load_dotenv()
 
-app = FastAPI(title="  BEE — beeeee freee!")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Warm-up runs in the background — requests are served from the first second
+    warmup.start()
+    yield
+    await warmup.stop()
+    await controller.qwen_client.aclose()
+
+
+app = FastAPI(title="  BEE — beeeee freee!", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -30,6 +43,7 @@ app.add_middleware(
 )
 
 controller = InterviewController()
+warmup = WarmupRunner(controller)
 
 # For HF Spaces: use absolute path from root
 if os.path.exists("/app/frontend"):
@@ -53,6 +67,10 @@ class AnswerSubmission(BaseModel):
     session_id: str
     answer: str
 
+class RestartInput(BaseModel):
+    # Sections to regenerate; everything else reuses the previous questions
+    fresh_sections: List[str] = []
+
 class ManualIntakeInput(BaseModel):
     skills: List[str]
     experience_level: Optional[str] = None
@@ -111,6 +129,37 @@ async def api_root():
     return {"message": "BEE API", "status": "running"}
 
 
+@app.get("/api/ready")
+async def readiness():
+    """Always accepting traffic; `warm` flips once the startup warm-up has finished."""
+    progress = warmup.progress()
+    return {
+        "ready": True,
+        "warm": progress["status"] in ("done", "disabled"),
+        "warmup": progress,
+        "pool": controller.question_pool.stats(),
+    }
+
+
+@app.get("/api/metrics")
+async def metrics():
+    return {
+        "llm_health": controller.qwen_client.health(),
+        "llm_calls": controller.qwen_client.call_stats(),
+        "hedging": controller.qwen_client.hedging(),
+        "model_routes": controller.qwen_client.router.report(),
+        "aptitude_checker": controller.qwen_client.aptitude_check_stats(),
+        "code_runner": controller.qwen_client.code_runner.report(),
+        "answer_filter": controller.qwen_client.answer_filter.report(),
+        "max_tokens": controller.qwen_client.output_lengths.stats(),
+        "json_salvage": controller.qwen_client.salvage_stats,
+        "eval_cache": controller.qwen_client.eval_cache.stats(),
+        "eval_batches": controller.qwen_client.eval_batcher.stats(),
+        "question_pool": controller.question_pool.stats(),
+        "rephrase_cache": controller.rephrase_cache.stats(),
+    }
+
+
 @app.post("/api/start-with-skills")
 async def start_with_skills(data: SkillsInput):
     if not data.skills:
@@ -125,7 +174,7 @@ async def start_with_skills(data: SkillsInput):
 
     try:
         session_id = await controller.create_session(valid_skills)
-        first_question = controller.get_current_question(session_id)
+        first_question = await controller.get_current_question(session_id)
         return {
             "session_id": session_id,
             "skills": valid_skills,
@@ -153,7 +202,7 @@ async def start_manual(data: ManualIntakeInput):
         session_id = await controller.create_session(
             valid_skills, experience=data.experience_level, role=data.target_role,
         )
-        first_question = controller.get_current_question(session_id)
+        first_question = await controller.get_current_question(session_id)
         return {
             "session_id": session_id,
             "skills": valid_skills,
@@ -167,7 +216,7 @@ async def start_manual(data: ManualIntakeInput):
 
 
 @app.post("/api/start-with-resume")
-async def start_with_resume(file: UploadFile = File(...)):
+async def start_with_resume(request: Request, file: UploadFile = File(...)):
     if not file.filename.endswith((".pdf", ".txt")):
         raise HTTPException(400, "Only PDF and TXT files supported")
 
@@ -183,7 +232,8 @@ async def start_with_resume(file: UploadFile = File(...)):
             raise HTTPException(400, "Resume content too short or invalid")
 
         # Reuse shared controller client — no extra instance
-        skills = await controller.qwen_client.extract_skills(text)
+        client = request.client.host if request.client else None
+        skills = await controller.qwen_client.extract_skills(text, client=client)
 
         if not skills:
             raise HTTPException(400, "Could not extract AI/ML skills from resume")
@@ -194,7 +244,7 @@ async def start_with_resume(file: UploadFile = File(...)):
             raise HTTPException(400, "No valid AI/ML/tech skills found in resume")
 
         session_id = await controller.create_session(valid_skills)
-        first_question = controller.get_current_question(session_id)
+        first_question = await controller.get_current_question(session_id)
         return {"session_id": session_id, "skills": valid_skills, "question": first_question}
     except HTTPException:
         raise
@@ -217,6 +267,55 @@ async def submit_answer(data: AnswerSubmission):
         raise HTTPException(500, f"Failed to submit answer: {e}")
 
 
+@app.post("/api/submit-answer/stream")
+async def submit_answer_stream(data: AnswerSubmission):
+    """
+    Server-sent events: `token` (raw model text), `evaluation` (parsed scores),
+    then `done` (same body as /api/submit-answer) or `error`.
+    """
+    if not data.answer or len(data.answer.strip()) < 5:
+        raise HTTPException(400, "Answer too short")
+    if not controller.get_session(data.session_id):
+        raise HTTPException(404, "Session not found")
+
+    async def events():
+        try:
+            async for event, payload in controller.submit_answer_stream(data.session_id, data.answer):
+                if event == "done" and "error" in payload:
+                    event, payload = "error", {"detail": payload["error"]}
+                yield f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+        except Exception as e:
+            yield f"event: error\ndata: {json.dumps({'detail': f'Failed to submit answer: {e}'})}\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.get("/api/budget")
+async def budget():
+    """Process-wide LLM call/token usage against the configured caps."""
+    return controller.qwen_client.budget.stats()
+
+
+@app.get("/api/budget/{session_id}")
+async def session_budget(session_id: str):
+    if not controller.get_session(session_id):
+        raise HTTPException(404, "Session not found")
+    return controller.qwen_client.budget.session_report(session_id)
+
+
+@app.get("/api/evaluation-status/{session_id}")
+async def evaluation_status(session_id: str):
+    """How many submitted answers are still being scored in the background."""
+    status = controller.evaluation_status(session_id)
+    if status is None:
+        raise HTTPException(404, "Session not found")
+    return status
+
+
 @app.post("/api/rephrase/{session_id}")
 async def rephrase_question(session_id: str):
     try:
@@ -232,23 +331,23 @@ async def rephrase_question(session_id: str):
 
 @app.get("/api/current-question/{session_id}")
 async def get_current_question(session_id: str):
-    q = controller.get_current_question(session_id)
+    q = await controller.get_current_question(session_id)
     if not q:
         raise HTTPException(404, "Session not found or completed")
     return q
 
 
 @app.post("/api/restart/{session_id}")
-async def restart_interview(session_id: str):
+async def restart_interview(session_id: str, data: Optional[RestartInput] = None):
     session = controller.get_session(session_id)
     if not session:
         raise HTTPException(404, "Session not found")
     try:
-        new_id = await controller.create_session(
-            session.skills, experience=session.experience, role=session.role,
+        new_id = await controller.restart_session(
+            session_id, fresh_sections=data.fresh_sections if data else [],
         )
         # Only delete old session after new one is confirmed ready
-        first_question = controller.get_current_question(new_id)
+        first_question = await controller.get_current_question(new_id)
         if not first_question:
             raise Exception("New session failed to initialise questions")
         controller.delete_session(session_id)
@@ -279,7 +378,7 @@ async def get_session_info(session_id: str):
         "status": session.status,
         "progress": {
             "current": session.current_question_index + 1,
-            "total": len(session.questions),
+            "total": session.total_questions,
         },
         "created_at": session.created_at.isoformat(),
     }
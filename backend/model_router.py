@@ -0,0 +1,166 @@
+"""
+Model routing — which model answers which call
+Rules map (call type, q_type, difficulty) to a ranked list of targets; the
+first rule that matches wins, fnmatch patterns allowed, unmatched calls go to
+the default model. A target is:
+  default        : BEE_LLM_BACKEND / BEE_LLM_MODEL (Qwen2.5-7B)
+  <name>         : a model declared in BEE_MODELS as name=backend:model_id
+  local          : no API call — the caller's local fallback answers
+                   (heuristic score, original question wording, bank questions)
+
+  BEE_MODELS="small=hf:Qwen/Qwen2.5-1.5B-Instruct"
+  BEE_MODEL_ROUTES="rephrase:*:*=small,default; eval*:hr:easy=small,local"
+  BEE_ROUTE_LATENCY_BUDGET="rephrase=3,eval=12"    seconds per call type
+
+A target whose recent p90 latency exceeds the call type's budget is skipped
+while a later target remains, and each non-final attempt is cut off at the
+budget, so a slow route falls through to the next one. Every (route, target)
+pair records latency and quality: the share of answers that parsed into the
+shape the caller expects.
+"""
+
+import os
+import math
+from collections import Counter, deque
+from dataclasses import dataclass
+from fnmatch import fnmatchcase
+from typing import Dict, List, Optional, Tuple
+
+from json_salvage import parse_array, parse_object
+from llm_backends import LLMBackend, create_backend
+
+# What a usable answer looks like, per call type (anything else: non-empty text)
+_SHAPES = {"resume": "array", "generate": "array", "eval_batch": "array", "eval": "object", "eval_retry": "object"}
+_MIN_LATENCY_SAMPLES = 5
+
+
+@dataclass
+class RouteTarget:
+    name: str
+    backend: Optional[LLMBackend] = None   # None = local
+    model: Optional[str] = None
+
+    @property
+    def local(self) -> bool:
+        return self.backend is None
+
+
+class _RouteStats:
+    def __init__(self):
+        self.counts: Counter = Counter()
+        self.latencies: deque = deque(maxlen=100)
+
+    def p(self, pct: float) -> Optional[float]:
+        if len(self.latencies) < _MIN_LATENCY_SAMPLES:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+    def quality(self) -> Optional[float]:
+        answered = self.counts["answered"]
+        return round(self.counts["usable"] / answered, 3) if answered else None
+
+
+class ModelRouter:
+    def __init__(self, default: LLMBackend, pool_size: int, timeout: float):
+        self.targets: Dict[str, RouteTarget] = {
+            "default": RouteTarget("default", default, default.model),
+            "local": RouteTarget("local"),
+        }
+        backends = {default.name: default}
+        for spec in _split(os.getenv("BEE_MODELS", ""), ","):
+            name, _, ref = spec.partition("=")
+            kind, _, model = ref.strip().partition(":")
+            if not (name.strip() and kind and model):
+                raise ValueError(f"Bad BEE_MODELS entry '{spec}' (expected name=backend:model)")
+            if kind not in backends:
+                backends[kind] = create_backend(pool_size, timeout, kind)
+            self.targets[name.strip()] = RouteTarget(name.strip(), backends[kind], model.strip())
+        self.backends = list(backends.values())
+
+        # (call_type, q_type, difficulty) patterns -> ranked target names
+        self.rules: List[Tuple[Tuple[str, str, str], List[str]]] = []
+        for spec in _split(os.getenv("BEE_MODEL_ROUTES", ""), ";"):
+            match, _, ranked = spec.partition("=")
+            parts = (match.strip().split(":") + ["*", "*"])[:3]
+            names = _split(ranked, ",")
+            unknown = [n for n in names if n not in self.targets]
+            if not names or unknown:
+                raise ValueError(f"Bad BEE_MODEL_ROUTES rule '{spec}' (unknown targets: {unknown})")
+            self.rules.append((tuple(parts), names))
+
+        self.latency_budget: Dict[str, float] = {}
+        for spec in _split(os.getenv("BEE_ROUTE_LATENCY_BUDGET", ""), ","):
+            call_type, _, seconds = spec.partition("=")
+            self.latency_budget[call_type.strip()] = float(seconds)
+        self._stats: Dict[Tuple[str, str], _RouteStats] = {}
+
+    def route(
+        self, call_type: str, q_type: Optional[str] = None, difficulty: Optional[str] = None,
+    ) -> Tuple[str, List[RouteTarget]]:
+        """(route label, targets to try in order) for one call."""
+        key = (call_type, q_type or "", difficulty or "")
+        for patterns, names in self.rules:
+            if all(fnmatchcase(value, pattern) for value, pattern in zip(key, patterns)):
+                label = ":".join(patterns)
+                break
+        else:
+            return "default", [self.targets["default"]]
+
+        targets = [self.targets[n] for n in names]
+        budget = self.latency_budget.get(call_type)
+        if budget is None:
+            return label, targets
+        # Skip targets that have been slower than the budget lately, as long as one remains
+        viable = [t for t in targets if t.local or (self.stats_for(label, t).p(90) or 0) <= budget]
+        return label, viable or targets[-1:]
+
+    def stats_for(self, label: str, target: RouteTarget) -> _RouteStats:
+        return self._stats.setdefault((label, target.name), _RouteStats())
+
+    def attempt_timeout(self, call_type: str, timeout: float, last: bool) -> float:
+        """A non-final target only gets the latency budget; the last one gets the full timeout."""
+        budget = self.latency_budget.get(call_type)
+        return timeout if last or budget is None else min(timeout, budget)
+
+    def record(self, label: str, target: RouteTarget, call_type: str, text: Optional[str], latency: float):
+        stats = self.stats_for(label, target)
+        stats.counts["calls"] += 1
+        if target.local:
+            return
+        if text is None:
+            stats.counts["failed"] += 1
+            return
+        stats.latencies.append(latency)
+        stats.counts["answered"] += 1
+        stats.counts["usable"] += _usable(call_type, text)
+
+    def report(self) -> Dict:
+        return {
+            "models": {n: t.model for n, t in self.targets.items() if not t.local},
+            "rules": [f"{':'.join(p)}={','.join(n)}" for p, n in self.rules],
+            "latency_budget_s": self.latency_budget,
+            "routes": {
+                f"{label} -> {name}": {
+                    "calls": s.counts["calls"],
+                    "failed": s.counts["failed"],
+                    "quality": s.quality(),
+                    "p50_s": round(s.p(50), 2) if s.p(50) is not None else None,
+                    "p90_s": round(s.p(90), 2) if s.p(90) is not None else None,
+                }
+                for (label, name), s in sorted(self._stats.items())
+            },
+        }
+
+
+def _split(value: str, sep: str) -> List[str]:
+    return [part.strip() for part in value.split(sep) if part.strip()]
+
+
+def _usable(call_type: str, text: str) -> bool:
+    shape = _SHAPES.get(call_type)
+    if shape == "array":
+        return bool(parse_array(text).value)
+    if shape == "object":
+        return parse_object(text).value is not None
+    return bool(text.strip())
@@ -0,0 +1,100 @@
+"""
+Token-aware prompt budgeting + adaptive max_tokens
+Token counts are a local estimate (no tokenizer download): each word or
+symbol run costs ~1 token per 4 characters, which tracks Qwen's BPE closely
+enough for budgeting. Oversized answers/context are compacted (code: blank
+lines and comment-only lines dropped) and then cut to head + tail around an
+"omitted" marker, so the grader still sees the start and the conclusion.
+
+OutputLengths learns how many completion tokens each call type really uses
+(per unit — per question, per batched answer) and sets max_tokens to a high
+percentile of that, instead of the fixed 1800/400/150 guesses.
+"""
+
+import os
+import re
+import math
+from collections import deque
+from typing import Deque, Dict
+
+_TOKEN_RE = re.compile(r"\w+|[^\w\s]+")
+_COMMENT_LINE_RE = re.compile(r"^\s*(#|//|/\*|\*|--)")
+
+
+def count_tokens(text: str) -> int:
+    return sum(max(1, math.ceil(len(t) / 4)) for t in _TOKEN_RE.findall(text or ""))
+
+
+def _compact_code(text: str) -> str:
+    lines = [l.rstrip() for l in text.splitlines()]
+    kept = [l for l in lines if l.strip() and not _COMMENT_LINE_RE.match(l)]
+    # All comments = the "placeholder only" case the grader must still see
+    return "\n".join(kept) if kept else text
+
+
+def fit(text: str, budget: int, code: bool = False) -> str:
+    """`text` unchanged if within `budget` tokens, else compacted then cut to head + tail."""
+    if not text or count_tokens(text) <= budget:
+        return text
+    text = _compact_code(text) if code else re.sub(r"[ \t]+", " ", text).strip()
+    total = count_tokens(text)
+    if total <= budget:
+        return text
+
+    chars_per_token = len(text) / total
+    head = text[:int(budget * 0.7 * chars_per_token)]
+    tail = text[len(text) - int(budget * 0.3 * chars_per_token):]
+    # Snap to line (code) or word (prose) boundaries
+    sep = "\n" if code else " "
+    if sep in head:
+        head = head[:head.rfind(sep)]
+    if sep in tail:
+        tail = tail[tail.find(sep) + 1:]
+    omitted = max(0, total - count_tokens(head) - count_tokens(tail))
+    return f"{head}\n... [~{omitted} tokens omitted] ...\n{tail}"
+
+
+class OutputLengths:
+    def __init__(self):
+        self.enabled = os.getenv("BEE_ADAPTIVE_MAX_TOKENS", "1") == "1"
+        self.percentile = float(os.getenv("BEE_MAX_TOKENS_PERCENTILE", "95"))
+        self.min_samples = int(os.getenv("BEE_MAX_TOKENS_MIN_SAMPLES", "20"))
+        self.floor = 64
+        self._samples: Dict[str, Deque[float]] = {}
+        self.truncations: Dict[str, int] = {}
+
+    def _learned(self, call_type: str) -> float:
+        samples = sorted(self._samples.get(call_type, ()))
+        if len(samples) < self.min_samples:
+            return 0.0
+        idx = min(len(samples) - 1, math.ceil(self.percentile / 100 * len(samples)) - 1)
+        return samples[idx]
+
+    def max_tokens(self, call_type: str, default: int, units: int = 1) -> int:
+        """High percentile of observed per-unit usage x units, +20% headroom; `default` until learned, and as a ceiling."""
+        per_unit = self._learned(call_type) if self.enabled else 0.0
+        if not per_unit:
+            return default
+        return max(self.floor, min(default, math.ceil(per_unit * units * 1.2) + 16))
+
+    def observe(self, call_type: str, tokens: int, units: int = 1, truncated: bool = False):
+        per_unit = tokens / max(units, 1)
+        if truncated:
+            # Hit the cap: the true length is unknown, so record it well above the cap
+            self.truncations[call_type] = self.truncations.get(call_type, 0) + 1
+            per_unit *= 1.5
+        self._samples.setdefault(call_type, deque(maxlen=200)).append(per_unit)
+
+    def stats(self) -> Dict:
+        return {
+            "enabled": self.enabled,
+            "percentile": self.percentile,
+            "by_type": {
+                t: {
+                    "samples": len(s),
+                    "per_unit_tokens": round(self._learned(t), 1) or None,
+                    "truncated": self.truncations.get(t, 0),
+                }
+                for t, s in sorted(self._samples.items())
+            },
+        }
@@ -0,0 +1,243 @@
+"""
+On-disk question bank — single SQLite file, zero API calls
+Indexed by (q_type, difficulty, topic) plus a skill tag table, so it can hold
+tens of thousands of vetted or previously generated questions.
+Sampling is random without repeats inside a session (caller passes used ids).
+
+Seeded from question_bank_seed.json; every question Qwen generates is imported
+in the background. Bulk import from the CLI:
+    python question_bank.py import questions.json
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import sqlite3
+import asyncio
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set
+
+from local_utils import canonical_skill
+
+_HERE = Path(__file__).parent
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS questions (
+    id          INTEGER PRIMARY KEY,
+    q_type      TEXT NOT NULL,
+    difficulty  TEXT NOT NULL,
+    topic       TEXT NOT NULL,
+    question    TEXT NOT NULL UNIQUE,
+    source      TEXT NOT NULL,
+    created_at  REAL NOT NULL,
+    answer      TEXT,
+    tests       TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_questions_bucket ON questions (q_type, difficulty, topic);
+CREATE TABLE IF NOT EXISTS question_skills (
+    question_id INTEGER NOT NULL REFERENCES questions (id) ON DELETE CASCADE,
+    skill       TEXT NOT NULL,
+    PRIMARY KEY (skill, question_id)
+);
+"""
+
+
+class QuestionBank:
+    def __init__(self, path: str = None):
+        self.path = Path(path or os.getenv("BEE_QUESTION_BANK", _HERE / "question_bank.db"))
+        # (q_type, difficulty[, skill]) -> [ids]; cleared on every write. Read and
+        # written from to_thread workers, so guarded; a bucket read from before a
+        # write (older generation) is returned but not cached.
+        self._ids: Dict[tuple, List[int]] = {}
+        self._ids_lock = threading.Lock()
+        self._generation = 0
+        with self._db() as db:
+            db.executescript(_SCHEMA)
+            # Banks created before questions carried an answer key / hidden tests
+            columns = {row[1] for row in db.execute("PRAGMA table_info(questions)")}
+            for column in ("answer", "tests"):
+                if column not in columns:
+                    db.execute(f"ALTER TABLE questions ADD COLUMN {column} TEXT")
+        self.import_file(_HERE / "question_bank_seed.json", source="vetted")
+
+    @contextmanager
+    def _db(self):
+        # One short-lived connection per operation — safe from worker threads
+        db = sqlite3.connect(self.path, timeout=10)
+        try:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA foreign_keys=ON")
+            with db:
+                yield db
+        finally:
+            db.close()
+
+    # ─────────────────────────── IMPORT ───────────────────────────
+
+    def add_many(
+        self, q_type: str, questions: Iterable[Dict], source: str = "generated", skills: List[str] = None,
+    ) -> int:
+        """
+        Bulk insert; duplicates (same question text) are ignored, except that a
+        missing canonical answer or hidden tests are filled in. Returns rows added.
+        """
+        now = time.time()
+        tags = sorted({canonical_skill(s) for s in skills or [] if s.strip()})
+        added = 0
+        with self._db() as db:
+            for q in questions:
+                text = (q.get("question") or "").strip()
+                if not text:
+                    continue
+                answer = (q.get("answer") or "").strip() or None
+                tests = json.dumps(q["tests"]) if q.get("tests") else None
+                cur = db.execute(
+                    "INSERT OR IGNORE INTO questions "
+                    "(q_type, difficulty, topic, question, source, created_at, answer, tests) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (q_type, q.get("difficulty", "medium"), q.get("topic") or q_type.capitalize(), text, source, now,
+                     answer, tests),
+                )
+                if not cur.rowcount and (answer or tests):
+                    db.execute(
+                        "UPDATE questions SET answer = COALESCE(answer, ?), tests = COALESCE(tests, ?) "
+                        "WHERE question = ?",
+                        (answer, tests, text),
+                    )
+                if cur.rowcount:
+                    added += 1
+                    db.executemany(
+                        "INSERT OR IGNORE INTO question_skills (question_id, skill) VALUES (?, ?)",
+                        [(cur.lastrowid, s) for s in q.get("skills", tags)],
+                    )
+        if added:
+            with self._ids_lock:
+                self._ids.clear()
+                self._generation += 1
+        return added
+
+    async def add_many_async(self, q_type: str, questions: List[Dict], skills: List[str] = None) -> int:
+        return await asyncio.to_thread(self.add_many, q_type, questions, "generated", skills)
+
+    def import_file(self, path: Path, source: str = "vetted") -> int:
+        """
+        JSON shaped like the seed file: {q_type: {difficulty: [{question, topic, answer?, tests?, skills?}]}}
+        or a flat list of {question, type, difficulty, topic, answer?, tests?, skills?}.
+        """
+        path = Path(path)
+        if not path.exists():
+            return 0
+        data = json.loads(path.read_text(encoding="utf-8"))
+        grouped: Dict[str, List[Dict]] = {}
+        if isinstance(data, dict):
+            for q_type, by_diff in data.items():
+                for diff, items in by_diff.items():
+                    grouped.setdefault(q_type, []).extend({**q, "difficulty": diff} for q in items)
+        else:
+            for q in data:
+                grouped.setdefault(q.get("type", "theory"), []).append(q)
+        return sum(self.add_many(q_type, items, source) for q_type, items in grouped.items())
+
+    # ─────────────────────────── SAMPLING ───────────────────────────
+
+    def _bucket_ids(self, q_type: str, difficulty: str, skill: str = None) -> List[int]:
+        key = (q_type, difficulty, skill)
+        with self._ids_lock:
+            ids = self._ids.get(key)
+            generation = self._generation
+        if ids is None:
+            with self._db() as db:
+                if skill:
+                    rows = db.execute(
+                        "SELECT q.id FROM question_skills s JOIN questions q ON q.id = s.question_id "
+                        "WHERE s.skill = ? AND q.q_type = ? AND q.difficulty = ?",
+                        (skill, q_type, difficulty),
+                    )
+                else:
+                    rows = db.execute(
+                        "SELECT id FROM questions WHERE q_type = ? AND difficulty = ?",
+                        (q_type, difficulty),
+                    )
+                ids = [r[0] for r in rows]
+            with self._ids_lock:
+                if generation == self._generation:
+                    self._ids[key] = ids
+        return ids
+
+    def _draw(self, ids: List[int], need: int, taken: Set[int]) -> List[int]:
+        """Rejection sampling — O(need) on a big bucket; full scan only when it is nearly used up."""
+        out: List[int] = []
+        if not ids or need <= 0:
+            return out
+        for _ in range(need * 8):
+            i = random.choice(ids)
+            if i not in taken and i not in out:
+                out.append(i)
+                if len(out) == need:
+                    return out
+        free = [i for i in ids if i not in taken and i not in out]
+        return out + random.sample(free, min(need - len(out), len(free)))
+
+    def sample(
+        self, q_type: str, difficulty: str, count: int,
+        skills: List[str] = None, exclude: Optional[Set[int]] = None,
+    ) -> List[Dict]:
+        """
+        Random questions not in `exclude`. Skill-tagged matches first,
+        then anything in the (q_type, difficulty) bucket.
+        """
+        exclude = set(exclude or ())
+        picked: List[int] = []
+        pools = [self._bucket_ids(q_type, difficulty, canonical_skill(s)) for s in skills or [] if s.strip()]
+        pools.append(self._bucket_ids(q_type, difficulty))
+        for ids in pools:
+            for i in self._draw(ids, count - len(picked), exclude):
+                picked.append(i)
+                exclude.add(i)
+            if len(picked) >= count:
+                break
+        if not picked:
+            return []
+
+        with self._db() as db:
+            rows = db.execute(
+                f"SELECT id, difficulty, topic, question, answer, tests FROM questions "
+                f"WHERE id IN ({','.join('?' * len(picked))})",
+                picked,
+            ).fetchall()
+        by_id = {}
+        for r in rows:
+            by_id[r[0]] = {"id": r[0], "difficulty": r[1], "topic": r[2], "question": r[3]}
+            if r[4]:
+                by_id[r[0]]["answer"] = r[4]
+            if r[5]:
+                by_id[r[0]]["tests"] = json.loads(r[5])
+        return [by_id[i] for i in picked if i in by_id]
+
+    async def sample_async(
+        self, q_type: str, difficulty: str, count: int,
+        skills: List[str] = None, exclude: Optional[Set[int]] = None,
+    ) -> List[Dict]:
+        # SQLite reads stay off the event loop
+        return await asyncio.to_thread(self.sample, q_type, difficulty, count, skills, set(exclude or ()))
+
+    def has(self, q_type: str, difficulty: str, count: int) -> bool:
+        return len(self._bucket_ids(q_type, difficulty)) >= count
+
+    def stats(self) -> Dict:
+        with self._db() as db:
+            rows = db.execute(
+                "SELECT q_type, difficulty, COUNT(*) FROM questions GROUP BY q_type, difficulty"
+            ).fetchall()
+        return {f"{t}/{d}": n for t, d, n in rows}
+
+
+if __name__ == "__main__":
+    bank = QuestionBank()
+    if len(sys.argv) == 3 and sys.argv[1] == "import":
+        print(f"Imported {bank.import_file(Path(sys.argv[2]))} new questions")
+    print(json.dumps(bank.stats(), indent=2))
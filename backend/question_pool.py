@@ -0,0 +1,158 @@
+"""
+Pre-generated question pool — shared by every session in the process
+Keyed by (canonical skills, q_type, difficulty), TTL + LRU eviction.
+Sessions draw instantly; buckets below the low-water mark are refilled
+by a background generate_questions_batch call (1 call per q_type). A live
+session that waits on a low-priority (warm-up) refill promotes its call.
+"""
+
+import os
+import time
+import asyncio
+from collections import Counter, OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from dedup_index import NearDuplicateIndex
+from local_utils import canonical_skill
+from qwen_client import Lane
+
+
+def canonical_skills(skills: List[str]) -> Tuple[str, ...]:
+    """Order/case/alias-insensitive skill set — "Python, ML" and "machine learning,python" share a key."""
+    return tuple(sorted({canonical_skill(s) for s in skills if s.strip()}))
+
+
+class QuestionPool:
+    def __init__(self, qwen_client):
+        self.qwen_client = qwen_client
+        self.ttl = float(os.getenv("BEE_POOL_TTL_HOURS", "6")) * 3600
+        self.max_buckets = int(os.getenv("BEE_POOL_MAX_BUCKETS", "512"))
+        # A refill generates this many sessions' worth of questions per difficulty
+        self.refill_sessions = int(os.getenv("BEE_POOL_REFILL_SESSIONS", "2"))
+
+        # key -> [(question dict, created_at), ...]; order = LRU (oldest first)
+        self._buckets: "OrderedDict[tuple, List[tuple]]" = OrderedDict()
+        self._refills: Dict[tuple, Tuple[asyncio.Task, Lane]] = {}
+        # Everything currently pooled — refills reject rewordings of it
+        self.dedup = NearDuplicateIndex()
+        # Canonical skill set -> sessions started; feeds the next startup warm-up
+        self.demand: Counter = Counter()
+        self.hits = 0
+        self.misses = 0
+
+    # ─────────────────────────── BUCKETS ───────────────────────────
+
+    def _bucket(self, key: tuple) -> List[tuple]:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            return []
+        cutoff = time.time() - self.ttl
+        for q, ts in bucket:
+            if ts < cutoff:
+                self.dedup.remove(q["question"])
+        bucket[:] = [(q, ts) for q, ts in bucket if ts >= cutoff]
+        if not bucket:
+            del self._buckets[key]
+            return []
+        self._buckets.move_to_end(key)
+        return bucket
+
+    def size(self, skills: List[str], q_type: str, difficulty: str) -> int:
+        return len(self._bucket((canonical_skills(skills), q_type, difficulty)))
+
+    def put(self, skills: List[str], q_type: str, questions: List[Dict]):
+        now = time.time()
+        canon = canonical_skills(skills)
+        for q in questions:
+            key = (canon, q_type, q.get("difficulty", "medium"))
+            self._buckets.setdefault(key, []).append((q, now))
+            self._buckets.move_to_end(key)
+            self.dedup.add(q["question"])
+        while len(self._buckets) > self.max_buckets:
+            _, evicted = self._buckets.popitem(last=False)
+            for q, _ in evicted:
+                self.dedup.remove(q["question"])
+
+    def take(self, skills: List[str], q_type: str, difficulty: str, count: int) -> List[Dict]:
+        """Pop up to `count` questions — drawn questions leave the pool so sessions differ."""
+        bucket = self._bucket((canonical_skills(skills), q_type, difficulty))
+        taken = [q for q, _ in bucket[:count]]
+        del bucket[:count]
+        for q in taken:
+            self.dedup.remove(q["question"])
+        self.hits += len(taken)
+        self.misses += count - len(taken)
+        return taken
+
+    async def draw(self, skills: List[str], q_type: str, difficulty_counts: List[tuple]) -> Tuple[List[Dict], List[tuple]]:
+        """
+        Take one section's worth. If the pool is short but a refill for this
+        section is already in flight, wait for it rather than paying a second call.
+        Returns (pooled questions, [(difficulty, still_missing), ...]).
+        """
+        short = any(self.size(skills, q_type, d) < c for d, c in difficulty_counts)
+        refill = self._refills.get((canonical_skills(skills), q_type))
+        if short and refill:
+            task, lane = refill
+            # A live session is waiting now — a warm-up refill stops yielding the limiter
+            await lane.promote()
+            await asyncio.shield(task)
+
+        pooled, missing = [], []
+        for diff, count in difficulty_counts:
+            got = self.take(skills, q_type, diff, count)
+            pooled.extend(got)
+            if len(got) < count:
+                missing.append((diff, count - len(got)))
+        return pooled, missing
+
+    # ─────────────────────────── REFILL ───────────────────────────
+
+    def record_demand(self, skills: List[str]):
+        self.demand[canonical_skills(skills)] += 1
+
+    def schedule_refill(
+        self, skills: List[str], q_type: str, difficulty_counts: List[tuple], low_priority: bool = False,
+    ) -> Optional[asyncio.Task]:
+        """
+        Top up in the background if any difficulty is below one session's worth.
+        At most one refill per (skills, q_type) in flight — returns it, or None if full.
+        """
+        key = (canonical_skills(skills), q_type)
+        if key in self._refills:
+            return self._refills[key][0]
+        wanted = []
+        for diff, count in difficulty_counts:
+            have = self.size(skills, q_type, diff)
+            if have < count:  # low-water mark = one session's worth
+                wanted.append((diff, count * self.refill_sessions - have))
+        if not wanted:
+            return None
+        lane = Lane(low_priority)
+        task = asyncio.create_task(self._refill(skills, q_type, wanted, lane))
+        self._refills[key] = (task, lane)
+        task.add_done_callback(lambda _: self._refills.pop(key, None))
+        return task
+
+    async def _refill(self, skills: List[str], q_type: str, wanted: List[tuple], lane: Lane) -> int:
+        canon = canonical_skills(skills)
+        try:
+            generated = await self.qwen_client.generate_questions_batch(
+                list(canon), q_type, wanted, [], low_priority=lane, dedup=self.dedup,
+            )
+        except Exception as e:
+            print(f"⚠️ Pool refill failed ({q_type}): {type(e).__name__}: {e}")
+            return 0
+        if generated:
+            self.put(skills, q_type, generated)
+            print(f"🗃 Pool refilled | {q_type} +{len(generated)} | skills={', '.join(canon)}")
+        return len(generated)
+
+    def stats(self) -> Dict:
+        return {
+            "buckets": len(self._buckets),
+            "questions": sum(len(b) for b in self._buckets.values()),
+            "refills_in_flight": len(self._refills),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
@@ -1,78 +1,333 @@
 """
-Qwen client via HuggingFace Inference API
+Qwen client via HuggingFace Inference API (OpenAI-compatible router)
+Native async: one keep-alive httpx connection pool shared by every session,
+so concurrency is bounded by the limiter and pool size, not by thread count.
+The transport is pluggable (BEE_LLM_BACKEND, see llm_backends.py).
 
 CALL BUDGET PER SESSION:
-  Session start : 4 calls  (sequential, 1.5s apart)
+  Session start : 4 calls  (concurrent, paced by the shared rate limiter)
   Per answer    : 1-2 calls (eval + fallback if parse fails)
+                  or ~1/BEE_EVAL_BATCH_SIZE when answers are micro-batched
   Rephrase      : 1 call
   Resume parse  : 1 call
   WORST CASE    : 4 + 30 = 34 calls per full session
+Measured and capped per session and globally by CallBudget (call_budget.py).
 """
 
 import os
+import time
 import asyncio
 import json
-from typing import Dict, Optional, List
-from huggingface_hub import InferenceClient
-
-
-# ── Local fallback question bank ──
-_FALLBACKS = {
-    "theory": {
-        "easy": [
-            {"question": "What is the difference between supervised and unsupervised learning?", "topic": "ML Basics"},
-            {"question": "Define overfitting and explain how to detect it.", "topic": "Model Evaluation"},
-        ],
-        "medium": [
-            {"question": "Explain gradient descent and how learning rate affects convergence.", "topic": "Optimization"},
-            {"question": "What is the bias-variance tradeoff and why does it matter?", "topic": "Model Theory"},
-        ],
-        "hard": [
-            {"question": "Explain the vanishing gradient problem and three techniques to mitigate it.", "topic": "Deep Learning"},
-            {"question": "Compare batch normalization and layer normalization — when would you choose each?", "topic": "Neural Networks"},
-        ],
-    },
-    "aptitude": {
-        "easy": [
-            {"question": "A train travels 120 km in 2 hours. What is its speed in m/s?", "topic": "Speed Distance"},
-            {"question": "Find the next term: 2, 6, 12, 20, 30, ?", "topic": "Number Series"},
-        ],
-        "medium": [
-            {"question": "A can finish a task in 10 days, B in 15 days. How many days to finish together?", "topic": "Work Problems"},
-            {"question": "In a class of 40, average score is 72. If 5 students with avg 60 leave, what is the new average?", "topic": "Averages"},
-        ],
-        "hard": [
-            {"question": "In how many ways can 4 boys and 3 girls sit in a row so no two girls are adjacent?", "topic": "Permutations"},
-        ],
-    },
-    "coding": {
-        "easy": [
-            {"question": "Write a function to normalize an array to the range [0, 1].", "topic": "Data Processing"},
-        ],
-        "medium": [
-            {"question": "Implement k-fold cross-validation from scratch without using ML libraries.", "topic": "Model Evaluation"},
-        ],
-        "hard": [
-            {"question": "Implement a fully-connected neural network layer with forward and backward pass from scratch.", "topic": "Neural Networks"},
-        ],
-    },
-    "hr": {
-        "medium": [
-            {"question": "Describe a challenging ML project you worked on. What was your approach and what did you learn?", "topic": "Behavioral"},
-        ],
-    },
-}
+from collections import Counter, deque
+from email.utils import parsedate_to_datetime
+from typing import AsyncIterator, Dict, Optional, List, Tuple, Union
+import httpx
+from dedup_index import NearDuplicateIndex
+from eval_cache import EvalCache, eval_key
+from eval_batcher import EvalBatcher
+from llm_backends import create_backend
+from model_router import ModelRouter, RouteTarget
+from call_budget import CallBudget, SessionIds
+from prompt_budget import OutputLengths, count_tokens, fit
+from json_salvage import Salvaged, parse_array, parse_object
+import aptitude_checker
+from aptitude_checker import AptitudeVerdict
+from code_runner import CodeRunner, TestRun, valid_tests
+from answer_filter import AnswerFilter
+
+# Bump whenever an evaluation prompt changes — old cached scores stop matching
+EVAL_PROMPT_VERSION = "1"
+
+
+class _RateLimiter:
+    """
+    Process-wide token bucket + in-flight cap for HF calls.
+    rate        : sustained requests per second
+    burst       : tokens available at once (lets a session start fire all 4 sections)
+    max_in_flight : calls allowed to be waiting on the API at the same time
+    Low-priority callers (warm-up) only get a slot while no normal caller is
+    waiting, and never hold more than half the slots.
+
+    The in-flight cap is adaptive (AIMD): +1 per cap-worth of successful calls
+    up to max_in_flight, halved on 429/5xx/timeout. A Retry-After pauses the bucket.
+    """
+
+    def __init__(self, rate: float, burst: int, max_in_flight: int):
+        self.rate = max(rate, 0.01)
+        self.burst = max(burst, 1)
+        self.max_in_flight = max(max_in_flight, 1)
+        self.limit = float(self.max_in_flight)
+        self.tokens = float(self.burst)
+        self.in_flight = 0
+        self.waiting = 0
+        self.paused_until = 0.0
+        self._last_decrease = 0.0
+        self._updated = time.monotonic()
+        self._bucket_lock = asyncio.Lock()
+        self._slots = asyncio.Condition()
+
+    def _has_slot(self, low_priority: bool) -> bool:
+        cap = max(1, int(self.limit))
+        if low_priority:
+            return self.waiting == 0 and self.in_flight < max(1, cap // 2)
+        return self.in_flight < cap
+
+    def on_success(self):
+        self.limit = min(float(self.max_in_flight), self.limit + 1 / self.limit)
+
+    def on_overload(self, retry_after: float = 0.0):
+        now = time.monotonic()
+        # Calls already in flight fail together — count them as one congestion signal
+        if now - self._last_decrease >= 1.0:
+            self.limit = max(1.0, self.limit / 2)
+            self._last_decrease = now
+            print(f"⚠️ LLM overloaded — in-flight limit now {int(self.limit)}")
+        if retry_after > 0:
+            self.paused_until = max(self.paused_until, now + retry_after)
+
+    async def acquire(self, low_priority: Union[bool, "Lane"] = False):
+        lane = low_priority if isinstance(low_priority, Lane) else Lane(low_priority)
+        lane.queued_in = self
+        if not lane.low:
+            self.waiting += 1
+        try:
+            async with self._slots:
+                await self._slots.wait_for(lambda: self._has_slot(lane.low))
+                self.in_flight += 1
+            try:
+                await self._take_token()
+            except BaseException:
+                await self.release()
+                raise
+        finally:
+            lane.queued_in = None
+            if not lane.low:
+                self.waiting -= 1
+
+    async def release(self):
+        async with self._slots:
+            self.in_flight -= 1
+            self._slots.notify_all()
+
+    async def _take_token(self):
+        # One waiter refills at a time so tokens are handed out in arrival order
+        async with self._bucket_lock:
+            pause = self.paused_until - time.monotonic()
+            if pause > 0:
+                await asyncio.sleep(pause)
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class Lane:
+    """
+    Priority of one call on its way through the limiter. Shared by everyone
+    coalesced onto the call: a live caller joining a warm-up call promotes it,
+    so it never queues behind the warm-up's low-priority slot rules. Background
+    work can pass its own Lane to generate() and promote it when a live caller
+    starts waiting on the result (QuestionPool.draw on a warm-up refill).
+    """
+
+    def __init__(self, low: bool):
+        self.low = low
+        self.queued_in: Optional[_RateLimiter] = None
+        # Flights this lane's caller joined instead of sending its own call
+        self.joined: List["Lane"] = []
+
+    async def promote(self):
+        if not self.low:
+            return
+        self.low = False
+        for flight in self.joined:
+            await flight.promote()
+        limiter = self.queued_in
+        if limiter is not None:
+            # Now counted as a normal waiter — acquire() uncounts it on the way out
+            limiter.waiting += 1
+            async with limiter._slots:
+                limiter._slots.notify_all()
+
+
+class _CircuitBreaker:
+    """
+    Tracks the last `window` call outcomes. A failure is a 429/5xx, any other 4xx,
+    a timeout or transport error, or a call slower than `slow_after` seconds;
+    401/402/403 (bad key, credits out) open the circuit straight away. Once at least
+    `min_calls` are recorded and the failure share reaches `error_rate`, the
+    circuit opens: calls return None immediately and callers use their local
+    fallbacks. After `cooldown` one half-open probe goes through — success
+    closes the circuit, failure reopens it.
+    """
+
+    def __init__(self, window: int, min_calls: int, error_rate: float, slow_after: float, cooldown: float):
+        self.outcomes: deque = deque(maxlen=max(window, 1))
+        self.min_calls = max(min_calls, 1)
+        self.error_rate = error_rate
+        self.slow_after = slow_after
+        self.cooldown = cooldown
+        self.state = "closed"
+        self.opened_until = 0.0
+        self._probing = False
+        self.trips = 0
+        self.rejected = 0
+
+    @property
+    def is_open(self) -> bool:
+        return self.state == "open" and time.monotonic() < self.opened_until
+
+    @property
+    def rejecting(self) -> bool:
+        """allow() would fail a call fast right now — open, or half-open with the probe out."""
+        return self.is_open or (self.state == "half_open" and self._probing)
+
+    def allow(self) -> Optional[str]:
+        """"call", "probe", or None when the call must fail fast."""
+        if self.state == "closed":
+            return "call"
+        if self.state == "open" and time.monotonic() >= self.opened_until:
+            self.state = "half_open"
+        if self.state == "half_open" and not self._probing:
+            self._probing = True
+            return "probe"
+        self.rejected += 1
+        return None
+
+    def record(self, ok: bool, latency: float):
+        healthy = ok and latency <= self.slow_after
+        if self.state == "half_open":
+            self._probing = False
+            if healthy:
+                self.state = "closed"
+                self.outcomes.clear()
+                print("✔ LLM circuit closed — API recovered")
+            else:
+                self.open_for(self.cooldown)
+            return
+        if self.state == "open":
+            return  # stragglers from before the trip
+        self.outcomes.append(healthy)
+        failures = self.outcomes.count(False)
+        if len(self.outcomes) >= self.min_calls and failures / len(self.outcomes) >= self.error_rate:
+            self.open_for(self.cooldown)
+
+    def settle_probe(self):
+        # Probe cancelled before it produced an outcome — let the next call probe
+        self._probing = False
+
+    def open_for(self, seconds: float):
+        if self.state != "open":
+            self.trips += 1
+            print(f"⚠️ LLM circuit open for {seconds:.0f}s — using local fallbacks")
+        self.state = "open"
+        self.opened_until = max(self.opened_until, time.monotonic() + seconds)
+        self.outcomes.clear()
+
+    def stats(self) -> Dict:
+        return {
+            "state": "open" if self.is_open else ("closed" if self.state == "closed" else "half_open"),
+            "recent_failure_rate": round(self.outcomes.count(False) / len(self.outcomes), 3) if self.outcomes else 0.0,
+            "trips": self.trips,
+            "rejected_calls": self.rejected,
+        }
+
+
+class _WireClock(asyncio.Event):
+    """Set when a request leaves the limiter queue; `at` is that moment."""
+
+    at: Optional[float] = None
+
+    def mark(self):
+        self.at = time.monotonic()
+        self.set()
+
+
+def _retry_after(response: Optional[httpx.Response]) -> float:
+    """Retry-After in seconds (delta-seconds or HTTP-date form); 0 if absent."""
+    value = response.headers.get("Retry-After") if response is not None else None
+    if not value:
+        return 0.0
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return 0.0
 
 
 class QwenClient:
     def __init__(self):
-        self.api_key = os.getenv("HF_API_KEY")
-        if not self.api_key:
-            raise ValueError("HF_API_KEY environment variable not set")
+        max_in_flight = int(os.getenv("BEE_LLM_MAX_IN_FLIGHT", "8"))
 
-        self.model = "Qwen/Qwen2.5-7B-Instruct"
-        self.client = InferenceClient(token=self.api_key)
-        print(f"✔ Qwen client ready | model: {self.model}")
+        # Shared by every session — replaces the old fixed sleeps between calls
+        self.limiter = _RateLimiter(
+            rate=float(os.getenv("BEE_LLM_RPS", "2")),
+            burst=int(os.getenv("BEE_LLM_BURST", "4")),
+            max_in_flight=max_in_flight,
+        )
+
+        # Persistent keep-alive pool; sized so every in-flight slot gets a connection
+        pool_size = int(os.getenv("BEE_HTTP_POOL_SIZE", str(max_in_flight)))
+        self.timeout = float(os.getenv("BEE_LLM_TIMEOUT", "90"))
+        self.backend = create_backend(pool_size, self.timeout)
+        self.model = self.backend.model
+        # (call type, q_type, difficulty) -> ranked models; default = everything on self.backend
+        self.router = ModelRouter(self.backend, pool_size, self.timeout)
+        # One circuit per routed model: a failing small model mustn't take the default one down
+        self._breaker_config = dict(
+            window=int(os.getenv("BEE_BREAKER_WINDOW", "20")),
+            min_calls=int(os.getenv("BEE_BREAKER_MIN_CALLS", "5")),
+            error_rate=float(os.getenv("BEE_BREAKER_ERROR_RATE", "0.5")),
+            slow_after=float(os.getenv("BEE_BREAKER_SLOW_SECONDS", "45")),
+            cooldown=float(os.getenv("BEE_BREAKER_COOLDOWN", "30")),
+        )
+        self.breakers: Dict[str, _CircuitBreaker] = {}
+        self.breaker = self._breaker(self.router.targets["default"])
+        # Longer Retry-After than this opens the circuit instead of making callers wait
+        self.max_retry_wait = float(os.getenv("BEE_RETRY_AFTER_MAX_WAIT", "5"))
+        self.eval_cache = EvalCache()
+        self.eval_batcher = EvalBatcher(self)
+        self.budget = CallBudget()
+        # Prompt-side token budgets; completion-side max_tokens is learned per call type
+        self.answer_token_budget = int(os.getenv("BEE_ANSWER_TOKEN_BUDGET", "1200"))
+        self.context_token_budget = int(os.getenv("BEE_CONTEXT_TOKEN_BUDGET", "300"))
+        self.output_lengths = OutputLengths()
+        # call type -> what the tolerant JSON parser had to fix
+        self.salvage_stats: Dict[str, Counter] = {}
+        # Aptitude answers with a canonical answer are graded locally; the model
+        # is only asked about the working when BEE_APTITUDE_WORKING_LLM=1
+        self.aptitude_exact = os.getenv("BEE_APTITUDE_EXACT", "1") == "1"
+        self.aptitude_working_llm = os.getenv("BEE_APTITUDE_WORKING_LLM", "0") == "1"
+        self.aptitude_stats: Counter = Counter()
+        # Coding answers with hidden tests: correctness = pass rate, the model only scores style
+        self.code_runner = CodeRunner()
+        self.code_style_llm = os.getenv("BEE_CODE_STYLE_LLM", "1") == "1"
+        self.answer_filter = AnswerFilter()
+
+        # Hedging: a slow call of these types gets a duplicate after the pXX latency
+        self.hedge_types = {t.strip() for t in os.getenv("BEE_HEDGE_CALL_TYPES", "").split(",") if t.strip()}
+        self.hedge_percentile = float(os.getenv("BEE_HEDGE_PERCENTILE", "95"))
+        self.hedge_min_samples = int(os.getenv("BEE_HEDGE_MIN_SAMPLES", "20"))
+        self._latencies: Dict[str, deque] = {}
+        self.hedge_stats: Dict[str, Counter] = {}
+
+        # Single-flight: (call_type, route, prompt, temperature, max_tokens) -> the call already
+        # on the wire and its lane (promoted when a live caller joins a warm-up call)
+        self._in_flight: Dict[tuple, Tuple[asyncio.Task, Lane]] = {}
+        self.calls_sent: Counter = Counter()
+        self.calls_saved: Counter = Counter()
+        print(f"✔ Qwen client ready | backend: {self.backend.name} | model: {self.model} | pool={pool_size}")
+
+    async def aclose(self):
+        for backend in self.router.backends:
+            await backend.aclose()
 
     # ─────────────────────────── CORE ───────────────────────────
 
@@ -81,36 +336,378 @@ class QwenClient:
         prompt: str,
         max_tokens: int = 1024,
         temperature: float = 0.3,
+        low_priority: Union[bool, Lane] = False,
+        timeout: float = None,
+        call_type: str = "other",
+        session_id: SessionIds = None,
+        units: int = 1,
+        q_type: str = None,
+        difficulty: str = None,
+    ) -> Optional[str]:
+        """
+        Identical concurrent prompts share one API call — cohort starts with the
+        same skills and client retries of a submit cost a single request.
+        Returns None without calling the API once the session or global budget is spent,
+        or when (call_type, q_type, difficulty) is routed to the local fallback.
+        units: items the output scales with (questions, batched answers) — feeds OutputLengths.
+        session_id: a list for a batched call — charged in equal shares to each session.
+        low_priority: a Lane instead of a bool lets the caller promote the call later.
+        """
+        own = low_priority if isinstance(low_priority, Lane) else Lane(low_priority)
+        label, targets = self.router.route(call_type, q_type, difficulty)
+        # Models whose circuit would reject the call are dropped before anything is charged
+        open_circuits = [t for t in targets if not t.local and self._breaker(t).rejecting]
+        for t in open_circuits:
+            self._breaker(t).rejected += 1
+        targets = [t for t in targets if t not in open_circuits]
+        if not targets:
+            print(f"⚠️ LLM circuit open — skipping {call_type} call")
+            return None
+        if targets[0].local:
+            self.router.record(label, targets[0], call_type, None, 0.0)
+            print(f">_> Qwen call routed local | {call_type} ({label})")
+            return None
+
+        key = (call_type, label, prompt, temperature, max_tokens)
+        flight = self._in_flight.get(key)
+        if flight is not None:
+            task, lane = flight
+            if own.low:
+                own.joined.append(lane)
+            else:
+                await lane.promote()
+            self.calls_saved[call_type] += 1
+            print(f">_> Qwen call coalesced | {call_type}")
+        else:
+            if not self.budget.allow(session_id):
+                self.budget.reject(session_id)
+                print(f"⚠️ Call budget spent — skipping {call_type} call")
+                return None
+            self.calls_sent[call_type] += 1
+            self.budget.charge(session_id, call_type)
+            lane = own
+            task = asyncio.create_task(self._routed(
+                label, targets, prompt, max_tokens, temperature, lane, timeout, call_type, session_id, units,
+            ))
+            self._in_flight[key] = (task, lane)
+            task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        # Shielded: one caller giving up must not cancel the call for the others
+        return await asyncio.shield(task)
+
+    async def _routed(
+        self, label: str, targets: List[RouteTarget], prompt: str, max_tokens: int, temperature: float,
+        lane: "Lane", timeout: Optional[float], call_type: str, session_id: SessionIds, units: int,
     ) -> Optional[str]:
+        """Try the route's targets in order; all but the last are cut off at the latency budget."""
+        for i, target in enumerate(targets):
+            if target.local:
+                self.router.record(label, target, call_type, None, 0.0)
+                return None
+            if i and self._breaker(target).rejecting:
+                self._breaker(target).rejected += 1
+                continue
+            if i and not self.budget.allow(session_id):
+                return None
+            if i:
+                self.budget.charge(session_id, call_type)
+                print(f">_> Qwen route fallback | {call_type} -> {target.name}")
+            last = i == len(targets) - 1
+            full = timeout or self.timeout
+            attempt_timeout = self.router.attempt_timeout(call_type, full, last)
+            started = time.monotonic()
+            text = await self._call(
+                prompt, max_tokens, temperature, lane, attempt_timeout,
+                call_type, session_id, units, target, cutoff=attempt_timeout < full,
+            )
+            self.router.record(label, target, call_type, text, time.monotonic() - started)
+            if text is not None:
+                return text
+        return None
+
+    async def _call(
+        self, prompt: str, max_tokens: int, temperature: float, lane: "Lane", timeout: Optional[float],
+        call_type: str, session_id: SessionIds, units: int, target: RouteTarget, cutoff: bool = False,
+    ) -> Optional[str]:
+        """
+        One logical call. For BEE_HEDGE_CALL_TYPES: if the request hasn't answered
+        within the recent pXX latency, send a duplicate (through the limiter, so it
+        respects the global rate) and take whichever answers first.
+        """
+        args = (prompt, max_tokens, temperature, lane, timeout, call_type, session_id, units, target, cutoff)
+        delay = self._hedge_delay(call_type)
+        sent = _WireClock()
+        text = None
+        if delay is None:
+            try:
+                text = await self._attempt(*args, sent=sent)
+                return text
+            finally:
+                self._record_latency(call_type, sent, text, timeout)
+
+        stats = self.hedge_stats.setdefault(call_type, Counter())
+        stats["calls"] += 1
+        primary = asyncio.create_task(self._attempt(*args, sent=sent))
+        hedge = None
         try:
-            print(f">_> Qwen call | temp={temperature:.1f} | max_tokens={max_tokens}")
-            response = await asyncio.to_thread(
-                self.client.chat.completions.create,
-                model=self.model,
-                messages=[{"role": "user", "content": prompt}],
-                max_tokens=max_tokens,
-                temperature=temperature,
-                top_p=0.9,
+            # The hedge clock starts when the request is on the wire, not while it queues
+            waiter = asyncio.create_task(sent.wait())
+            await asyncio.wait({primary, waiter}, return_when=asyncio.FIRST_COMPLETED)
+            waiter.cancel()
+            if not primary.done():
+                await asyncio.wait({primary}, timeout=delay)
+            if primary.done() or not self.budget.allow(session_id):
+                text = await primary
+                return text
+
+            stats["hedged"] += 1
+            self.budget.charge(session_id, f"{call_type}_hedge")
+            print(f">_> Qwen hedge | {call_type} slower than {delay:.1f}s")
+            hedge = asyncio.create_task(self._attempt(*args))
+            pending = {primary, hedge}
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    text = task.result()
+                    if text is not None:
+                        stats["hedge_wins"] += task is hedge
+                        return text
+            return None
+        finally:
+            for task in (primary, hedge):
+                if task is not None and not task.done():
+                    task.cancel()
+            self._record_latency(call_type, sent, text, timeout)
+
+    def _record_latency(self, call_type: str, sent: "_WireClock", text: Optional[str], timeout: Optional[float]):
+        """
+        Latency of the whole logical call, from the first request hitting the wire:
+        a hedged call counts its slow primary too, so the pXX can't drift down
+        to the hedges' times. Fast failures say nothing about latency; timeouts do.
+        """
+        if sent.at is None:
+            return
+        elapsed = time.monotonic() - sent.at
+        if text is not None or elapsed >= 0.95 * (timeout or self.timeout):
+            self._latencies.setdefault(call_type, deque(maxlen=200)).append(elapsed)
+
+    def _hedge_delay(self, call_type: str) -> Optional[float]:
+        """pXX of recent logical-call latencies for this call type; None = don't hedge."""
+        samples = self._latencies.get(call_type)
+        if call_type not in self.hedge_types or not samples or len(samples) < self.hedge_min_samples:
+            return None
+        ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, int(self.hedge_percentile / 100 * len(ordered)))]
+
+    async def _attempt(
+        self, prompt: str, max_tokens: int, temperature: float, lane: "Lane", timeout: Optional[float],
+        call_type: str, session_id: SessionIds, units: int, target: RouteTarget,
+        cutoff: bool = False, sent: "_WireClock" = None,
+    ) -> Optional[str]:
+        """cutoff: `timeout` is the route's latency budget — running into it says nothing about the model's health."""
+        breaker = self._breaker(target)
+        ticket = breaker.allow()
+        if not ticket:
+            return None
+        try:
+            await self.limiter.acquire(lane)
+            started = time.monotonic()
+            if sent:
+                sent.mark()
+            response = None
+            try:
+                print(f">_> Qwen call | {target.name} | temp={temperature:.1f} | max_tokens={max_tokens}")
+                response = await target.backend.complete(
+                    prompt, max_tokens, temperature, timeout or self.timeout, model=target.model,
+                )
+            except Exception as e:
+                response = getattr(e, "response", None)
+                if not (cutoff and isinstance(e, httpx.TimeoutException)):
+                    self._observe(breaker, started, response, e)
+                raise
+            else:
+                self._observe(breaker, started, response)
+            finally:
+                await self.limiter.release()
+            text = target.backend.text(response)
+            body = response.json()
+            usage = body.get("usage") or {}
+            completion = usage.get("completion_tokens") or count_tokens(text)
+            self.budget.add_tokens(
+                session_id, call_type, usage.get("total_tokens") or count_tokens(prompt) + completion,
+            )
+            self.output_lengths.observe(
+                call_type, completion, units, truncated=body["choices"][0].get("finish_reason") == "length",
             )
-            text = response.choices[0].message.content.strip()
             print(f":) Qwen done | {len(text)} chars")
             return text
         except Exception as e:
             print(f":( Qwen error: {type(e).__name__}: {e}")
             return None
+        finally:
+            if ticket == "probe":
+                breaker.settle_probe()
+
+    def _breaker(self, target: RouteTarget) -> _CircuitBreaker:
+        if target.name not in self.breakers:
+            self.breakers[target.name] = _CircuitBreaker(**self._breaker_config)
+        return self.breakers[target.name]
+
+    def _unavailable(self, call_type: str, q_type: str = None, difficulty: str = None) -> bool:
+        """Every model on this call's route has an open circuit."""
+        _, targets = self.router.route(call_type, q_type, difficulty)
+        return all(self._breaker(t).rejecting for t in targets if not t.local)
+
+    def _observe(
+        self, breaker: _CircuitBreaker, started: float, response: Optional[httpx.Response], error: Exception = None,
+    ):
+        """Feed one call's outcome to the target's circuit breaker and the adaptive in-flight limit."""
+        status = response.status_code if response is not None else None
+        overloaded = status == 429 or (status or 0) >= 500 or isinstance(error, httpx.TimeoutException)
+        rejected = status is not None and 400 <= status < 500 and status != 429
+        failed = overloaded or rejected or (error is not None and status is None)
+        if status in (401, 402, 403):
+            # Revoked token or credits out: every call would fail the same way, so stop paying for them
+            print(f"⚠️ LLM API refused the call ({status}) — check HF_API_KEY and credits")
+            breaker.open_for(breaker.cooldown)
+        if overloaded:
+            retry_after = _retry_after(response)
+            if retry_after > self.max_retry_wait:
+                breaker.open_for(retry_after)
+            self.limiter.on_overload(min(retry_after, self.max_retry_wait))
+        elif not failed:
+            self.limiter.on_success()
+        breaker.record(not failed, time.monotonic() - started)
+
+    def _salvage(self, kind: str, result: Salvaged) -> Salvaged:
+        """Record (and log) what the tolerant parser repaired or dropped for one response."""
+        stats = self.salvage_stats.setdefault(kind, Counter())
+        stats["parsed"] += 1
+        if result.repairs or result.dropped:
+            stats["repaired"] += 1
+            stats["truncated"] += "truncated" in result.repairs
+            stats["dropped_items"] += result.dropped
+            kept = len(result.value) if isinstance(result.value, list) else int(result.value is not None)
+            print(f"🩹 Salvaged {kind} output | kept {kept}, dropped {result.dropped} | "
+                  f"{', '.join(dict.fromkeys(result.repairs))}")
+        return result
+
+    def hedging(self) -> Dict:
+        return {
+            "call_types": sorted(self.hedge_types),
+            "percentile": self.hedge_percentile,
+            "by_type": {
+                t: {
+                    "calls": c["calls"],
+                    "hedged": c["hedged"],
+                    "hedge_rate": round(c["hedged"] / c["calls"], 3) if c["calls"] else 0.0,
+                    "hedge_wins": c["hedge_wins"],
+                    "delay_s": round(self._hedge_delay(t) or 0, 2) or None,
+                }
+                for t, c in sorted(self.hedge_stats.items())
+            },
+        }
+
+    def health(self) -> Dict:
+        return {
+            **self.breaker.stats(),
+            "by_model": {name: b.stats() for name, b in sorted(self.breakers.items())},
+            "in_flight_limit": max(1, int(self.limiter.limit)),
+            "max_in_flight": self.limiter.max_in_flight,
+        }
+
+    def call_stats(self) -> Dict:
+        """Per call type: requests sent to the API vs. served by joining an identical in-flight call."""
+        return {
+            t: {"sent": self.calls_sent[t], "coalesced": self.calls_saved[t]}
+            for t in sorted(set(self.calls_sent) | set(self.calls_saved))
+        }
+
+    async def generate_stream(
+        self,
+        prompt: str,
+        max_tokens: int = 1024,
+        temperature: float = 0.3,
+        call_type: str = "stream",
+        session_id: str = None,
+        q_type: str = None,
+        difficulty: str = None,
+    ) -> AsyncIterator[str]:
+        """Same call as generate(), but yields text deltas as the model produces them (first routed model only)."""
+        label, targets = self.router.route(call_type, q_type, difficulty)
+        target = targets[0]
+        if target.local:
+            self.router.record(label, target, call_type, None, 0.0)
+            return
+        if not self.budget.allow(session_id):
+            self.budget.reject(session_id)
+            print(f"⚠️ Call budget spent — skipping {call_type} stream")
+            return
+        breaker = self._breaker(target)
+        ticket = breaker.allow()
+        if not ticket:
+            return
+        # Charged once the circuit lets it through — a fail-fast call costs nothing
+        self.calls_sent[call_type] += 1
+        self.budget.charge(session_id, call_type)
+        try:
+            await self.limiter.acquire()
+            started = time.monotonic()
+            response = None
+            try:
+                print(f">_> Qwen stream | {target.name} | temp={temperature:.1f} | max_tokens={max_tokens}")
+                chunks = []
+                usage, finish = {}, None
+                async with target.backend.stream(prompt, max_tokens, temperature, model=target.model) as response:
+                    async for line in response.aiter_lines():
+                        if not line.startswith("data:"):
+                            continue
+                        data = line[5:].strip()
+                        if data == "[DONE]":
+                            break
+                        payload = json.loads(data)
+                        # Servers that report usage send it on the last chunk, with no choices
+                        usage = payload.get("usage") or usage
+                        choices = payload.get("choices") or [{}]
+                        finish = choices[0].get("finish_reason") or finish
+                        delta = (choices[0].get("delta") or {}).get("content")
+                        if delta:
+                            chunks.append(delta)
+                            yield delta
+                self._observe(breaker, started, response)
+                text = "".join(chunks)
+                completion = usage.get("completion_tokens") or count_tokens(text)
+                self.budget.add_tokens(
+                    session_id, call_type, usage.get("total_tokens") or count_tokens(prompt) + completion,
+                )
+                self.output_lengths.observe(call_type, completion, truncated=finish == "length")
+                self.router.record(label, target, call_type, text, time.monotonic() - started)
+                print(f":) Qwen stream done | {len(text)} chars")
+            except Exception as e:
+                self._observe(breaker, started, response or getattr(e, "response", None), e)
+                self.router.record(label, target, call_type, None, time.monotonic() - started)
+                raise
+            finally:
+                await self.limiter.release()
+        except Exception as e:
+            print(f":( Qwen stream error: {type(e).__name__}: {e}")
+        finally:
+            if ticket == "probe":
+                breaker.settle_probe()
 
     # ─────────────────── SKILL EXTRACTION (1 call) ───────────────────────
 
-    async def extract_skills(self, resume_text: str) -> list:
+    async def extract_skills(self, resume_text: str, client: str = None) -> list:
         """
         Extract ONLY AI/ML technical skills from the skills section of resume.
         Targets specific section headers to avoid extracting irrelevant text.
+        No session exists yet, so the call is charged to `client` (the uploader's IP).
         """
         # Step 1: Extract only the skills section
         skills_section = self._extract_skills_section(resume_text)
         
         if not skills_section:
             skills_section = resume_text[:2000]
+        skills_section = fit(skills_section, 800)
         
         prompt = f"""Extract ONLY AI/ML technical skills from this skills section.
 Return a JSON array of skill strings only. NO job titles, NO soft skills, NO company names.
@@ -128,17 +725,22 @@ Skills Section:
 
 Return ONLY valid JSON like: ["skill1", "skill2"]"""
 
-        response = await self.generate(prompt, max_tokens=256, temperature=0.2)
+        if not self.budget.allow_client(client):
+            self.budget.reject(None)
+            print(f"⚠️ Resume call cap reached for {client} — using default skills")
+            return ["Machine Learning", "Python", "Deep Learning"]
+        self.budget.charge_client(client)
+        response = await self.generate(
+            prompt, max_tokens=self.output_lengths.max_tokens("resume", 256), temperature=0.2, call_type="resume",
+        )
         if not response:
             return ["Machine Learning", "Python", "Deep Learning"]
-        try:
-            start, end = response.find("["), response.rfind("]") + 1
-            skills = json.loads(response[start:end], strict=False)
-            # Clean up: remove duplicates, filter empty, max 15 skills
-            cleaned = [s.strip() for s in skills if s.strip()]
-            return list(dict.fromkeys(cleaned))[:15]  # Remove duplicates, keep order
-        except Exception:
+        skills = self._salvage("resume", parse_array(response)).value
+        # Clean up: remove duplicates, filter empty, max 15 skills
+        cleaned = [s.strip() for s in skills if isinstance(s, str) and s.strip()]
+        if not cleaned:
             return ["Machine Learning", "Python", "Deep Learning"]
+        return list(dict.fromkeys(cleaned))[:15]  # Remove duplicates, keep order
     
     def _extract_skills_section(self, text: str) -> Optional[str]:
         """
@@ -208,13 +810,19 @@ Return ONLY valid JSON like: ["skill1", "skill2"]"""
         q_type: str,
         difficulty_counts: List[tuple],
         existing_questions: List[Dict],
+        low_priority: Union[bool, Lane] = False,
+        dedup: NearDuplicateIndex = None,
+        session_id: str = None,
     ) -> List[Dict]:
         """
         ONE HF call per question type, up to 3 retry attempts on parse failure.
-        Returns [] on all failures — controller fills from _FALLBACKS.
+        Returns [] on all failures — controller fills from the QuestionBank.
+        low_priority=True for background warm-up — yields to live sessions.
+        dedup: shared near-duplicate index (session or pool); accepted questions are added to it.
         """
         skills_str = ", ".join(skills[:5])
-        existing_texts = [q["question"].lower()[:80] for q in existing_questions]
+        if dedup is None:
+            dedup = NearDuplicateIndex.from_texts(q["question"] for q in existing_questions)
         total = sum(c for _, c in difficulty_counts)
 
         spec_lines = []
@@ -229,6 +837,24 @@ Return ONLY valid JSON like: ["skill1", "skill2"]"""
             else f"\nSkills to focus on: {skills_str}"
         )
 
+        # Aptitude questions carry their canonical answer, coding questions hidden
+        # tests, so grading needs no call (or only a style call)
+        answer_field, answer_rule = "", ""
+        if q_type == "aptitude":
+            answer_field = ', "answer": "final answer, number + unit"'
+            answer_rule = (
+                "\n- answer: the single final numeric answer with its unit (e.g. \"16.67 m/s\"), worked out carefully"
+            )
+        elif q_type == "coding" and self.code_runner.enabled:
+            answer_field = (
+                ', "function": "name", "tests": [{"args": [...], "expected": ...}], "reference": "def name(...): ..."'
+            )
+            answer_rule = (
+                "\n- coding: name the Python function and its parameters in the question; give 3-5 tests "
+                "(args = JSON list of positional arguments, expected = JSON return value) and a short correct "
+                "reference solution. Omit function/tests/reference if there is no single checkable return value"
+            )
+
         prompt = f"""Generate exactly {total} unique {q_type} interview questions.{aptitude_note}
 
 Breakdown:
@@ -236,46 +862,64 @@ Breakdown:
 
 Return ONLY a JSON array (no extra text):
 [
-  {{"question": "...", "difficulty": "easy", "topic": "..."}},
+  {{"question": "...", "difficulty": "easy", "topic": "..."{answer_field}}},
   ...
 ]
 
 Rules:
 - All questions must be different from each other
 - Do NOT include code snippets in theory/aptitude/hr questions
-- topic should be a short label (2-4 words)"""
+- topic should be a short label (2-4 words){answer_rule}"""
 
+        max_tokens = self.output_lengths.max_tokens("generate", 1800, units=total)
+        difficulties = {diff for diff, _ in difficulty_counts}
+        difficulty = difficulties.pop() if len(difficulties) == 1 else "mixed"
         print(f"⏳ Generating {total} {q_type} questions")
         for attempt in range(3):
             response = await self.generate(
-                prompt, max_tokens=1800, temperature=0.6 + attempt * 0.1
+                prompt, max_tokens=max_tokens, temperature=0.6 + attempt * 0.1, units=total,
+                low_priority=low_priority, call_type="generate", session_id=session_id,
+                q_type=q_type, difficulty=difficulty,
             )
             if not response:
+                if self._unavailable("generate", q_type, difficulty) or not self.budget.allow(session_id):
+                    break  # outage or budget spent — don't queue two more attempts behind it
                 continue
             try:
-                start = response.find("[")
-                end = response.rfind("]") + 1
-                if start == -1 or end == 0:
-                    continue
-                data = json.loads(response[start:end], strict=False)
-                if not isinstance(data, list):
+                # Cut-off or messy arrays still yield every complete question
+                data = self._salvage("generate", parse_array(response)).value
+                if not data:
                     continue
 
+                # Staged separately so a rejected attempt doesn't poison the shared index
+                staged = NearDuplicateIndex(dedup.threshold)
                 filtered = []
                 for item in data:
-                    if not item.get("question"):
+                    if not isinstance(item, dict) or not item.get("question"):
+                        continue
+                    text = item["question"]
+                    if dedup.is_duplicate(text) or staged.is_duplicate(text):
                         continue
-                    q_lower = item["question"].lower()
-                    if not any(q_lower[:80] in ex or ex in q_lower[:80] for ex in existing_texts):
-                        filtered.append({
-                            "question": item["question"],
-                            "topic": item.get("topic", q_type.capitalize()),
-                            "difficulty": item.get("difficulty", "medium"),
-                        })
+                    staged.add(text)
+                    q = {
+                        "question": text,
+                        "topic": item.get("topic", q_type.capitalize()),
+                        "difficulty": item.get("difficulty", "medium"),
+                    }
+                    if q_type == "aptitude" and item.get("answer"):
+                        q["answer"] = str(item["answer"]).strip()
+                    tests = {"function": item.get("function"), "cases": item.get("tests")}
+                    if q_type == "coding" and valid_tests(tests) and isinstance(item.get("reference"), str):
+                        q["tests"], q["reference"] = tests, item["reference"]
+                    filtered.append(q)
 
                 if len(filtered) >= max(1, total - 1):
+                    filtered = filtered[:total]
+                    await asyncio.gather(*[self._vet_tests(q) for q in filtered if "tests" in q])
+                    for q in filtered:
+                        dedup.add(q["question"])
                     print(f"✅ {q_type}: {len(filtered)}/{total} from Qwen")
-                    return filtered[:total]
+                    return filtered
 
             except Exception as e:
                 print(f"⚠️ {q_type} parse error (attempt {attempt + 1}): {e}")
@@ -283,9 +927,19 @@ Rules:
         print(f"⚠️ {q_type}: Qwen failed — local fallbacks will be used")
         return []
 
+    async def _vet_tests(self, q: Dict):
+        """Keep only the generated test cases the model's own reference solution passes (min 2)."""
+        run = await self.code_runner.run(q.pop("reference"), q["tests"])
+        kept = [case for case, ok in zip(q["tests"]["cases"], run.outcomes if run else []) if ok]
+        if len(kept) >= 2:
+            q["tests"]["cases"] = kept
+        else:
+            print(f"⚠️ Dropped hidden tests for '{q['question'][:40]}' — reference failed them")
+            del q["tests"]
+
     # ──────────────────── REPHRASE (1 call) ──────────────────
 
-    async def rephrase_question(self, question: str, q_type: str) -> Optional[str]:
+    async def rephrase_question(self, question: str, q_type: str, session_id: str = None) -> Optional[str]:
         prompt = f"""Rephrase the following {q_type} interview question to make it clearer and easier to understand.
 Keep the same intent and difficulty. Do NOT make it easier — just clearer wording.
 
@@ -293,11 +947,39 @@ Original: {question}
 
 Return ONLY the rephrased question text, nothing else."""
 
-        response = await self.generate(prompt, max_tokens=200, temperature=0.4)
+        response = await self.generate(
+            prompt, max_tokens=self.output_lengths.max_tokens("rephrase", 200), temperature=0.4,
+            call_type="rephrase", session_id=session_id, q_type=q_type,
+        )
         if response:
             return response.strip('"\'').strip()
         return None
 
+    async def rephrase_variants(
+        self, question: str, q_type: str, count: int = 2, low_priority: bool = False, session_id: str = None,
+    ) -> List[str]:
+        """`count` distinct rephrasings in ONE call — used for background prefetch, charged to the serving session."""
+        prompt = f"""Rephrase the following {q_type} interview question {count} different ways to make it clearer and easier to understand.
+Keep the same intent and difficulty. Do NOT make it easier — just clearer wording.
+
+Original: {question}
+
+Return ONLY a JSON array of {count} strings, nothing else."""
+
+        response = await self.generate(
+            prompt, max_tokens=self.output_lengths.max_tokens("rephrase", 120 * count, units=count),
+            temperature=0.5, low_priority=low_priority, call_type="rephrase", units=count, q_type=q_type,
+            session_id=session_id,
+        )
+        if not response:
+            return []
+        items = self._salvage("rephrase", parse_array(response)).value
+        variants = [v.strip('"\'').strip() for v in items if isinstance(v, str) and v.strip()]
+        if not variants:
+            # Model ignored the format — one rephrasing per line is still usable
+            variants = [l.strip(' -*"\'0123456789.').strip() for l in response.splitlines() if l.strip()]
+        return [v for v in dict.fromkeys(variants) if v.lower() != question.lower()][:count]
+
     # ──────────────────── ANSWER EVALUATION (1-2 calls) ──────────────────
 
     async def evaluate_answer(
@@ -307,31 +989,298 @@ Return ONLY the rephrased question text, nothing else."""
         topic: str,
         q_type: str = "theory",
         previous_qa: List[Dict] = None,
+        session_id: str = None,
+        difficulty: str = None,
+        expected_answer: str = None,
+        hidden_tests: Dict = None,
     ) -> Optional[Dict]:
-        """1 call normally, 2 if first parse fails. Local checks are free."""
+        """
+        1 call normally, 2 if first parse fails. Local checks, cache hits and
+        aptitude answers checked against `expected_answer` are free; coding
+        answers run against `hidden_tests` cost at most 1 style call.
+        """
+        # Exact checks first: a terse correct answer ("6") must not be mistaken for junk
+        exact = self._check_aptitude(q_type, answer, expected_answer)
+        if exact:
+            if not (self.aptitude_working_llm and exact.working):
+                return exact.evaluation()
+            # Correctness is settled locally; the model only grades the working
+            graded = await self.evaluate_answer(question, answer, topic, q_type, previous_qa, session_id, difficulty)
+            return self._merge_exact(exact, graded)
+
+        if q_type == "coding" and hidden_tests:
+            tested = await self._evaluate_tested_code(question, answer, hidden_tests, session_id, difficulty)
+            if tested:
+                return tested
+
+        local = self._local_verdict(question, answer, previous_qa)
+        if local:
+            return local
+
+        key = eval_key(question, answer, q_type, EVAL_PROMPT_VERSION)
+        cached = self.eval_cache.get(key)
+        if cached:
+            return cached
+
+        if not self.budget.allow(session_id):
+            self.budget.reject(session_id)
+            return self._local_score_fallback(answer)
+
+        if self.eval_batcher.enabled:
+            return await self.eval_batcher.submit({
+                "question": question, "answer": answer, "topic": topic, "q_type": q_type,
+                "previous_qa": previous_qa, "cache_key": key, "session_id": session_id,
+                "difficulty": difficulty,
+            })
+        return await self.evaluate_single(question, answer, topic, q_type, previous_qa, key, session_id, difficulty)
+
+    async def evaluate_single(
+        self, question: str, answer: str, topic: str, q_type: str,
+        previous_qa: Optional[List[Dict]], cache_key: str, session_id: str = None, difficulty: str = None,
+    ) -> Dict:
+        prompt, temp = self._eval_prompt(question, answer, topic, q_type, previous_qa)
+        response = await self.generate(
+            prompt, max_tokens=self.output_lengths.max_tokens("eval", 400), temperature=temp,
+            call_type="eval", session_id=session_id, q_type=q_type, difficulty=difficulty,
+        )
+        return await self._finish_eval(question, answer, q_type, response, cache_key, session_id, difficulty)
 
-        # ── Free local checks — 0 API calls ──
-        if self._is_gibberish(answer):
-            return {
-                "correctness": 0,
-                "depth": 0,
-                "clarity": 0,
-                "feedback": "Invalid answer — gibberish or placeholder detected.",
+    async def evaluate_batch(self, items: List[Dict]) -> List[Optional[Dict]]:
+        """
+        Score several answers in ONE call. Returns one result per item, in order;
+        None where the response didn't contain a usable score for that item.
+        """
+        blocks = []
+        for i, item in enumerate(items, 1):
+            answer = fit(item["answer"], self.answer_token_budget // 2, code=item["q_type"] == "coding")
+            blocks.append(
+                f"[{i}] type: {item['q_type']} | topic: {item['topic']}\n"
+                f"Question: {item['question']}\n"
+                f"Answer: {answer}"
+            )
+        prompt = f"""You are a STRICT technical interviewer scoring {len(items)} independent interview answers.
+Score each answer on its own — never compare answers with each other.
+
+Score 0-5 for each dimension:
+- correctness: Is the answer factually correct? (coding: does the code solve the problem? aptitude: is the final answer correct?)
+- depth: Does it go beyond surface-level? (coding: edge cases, efficiency. aptitude: clear working/steps)
+- clarity: Is it clearly communicated?
+
+IMPORTANT RULES:
+- If only a comment or placeholder is written, score 0 for all
+- For aptitude, step-by-step working with math symbols is CORRECT; only mark correctness=0 if the final answer is clearly wrong or missing
+
+{chr(10).join(blocks)}
+
+Return ONLY a JSON array with one object per answer, in the same order:
+[{{"id": 1, "correctness": 0-5, "depth": 0-5, "clarity": 0-5, "feedback": "1 sentence stating what was right or wrong"}}]"""
+
+        temp = 0.15 if any(item["q_type"] == "aptitude" for item in items) else 0.3
+        q_types = {item["q_type"] for item in items}
+        difficulties = {item.get("difficulty") for item in items}
+        response = await self.generate(
+            prompt,
+            max_tokens=self.output_lengths.max_tokens("eval_batch", 100 + 120 * len(items), units=len(items)),
+            temperature=temp, call_type="eval_batch", units=len(items),
+            # One call, split evenly across the sessions whose answers it scores
+            session_id=[item.get("session_id") for item in items],
+            q_type=q_types.pop() if len(q_types) == 1 else "mixed",
+            difficulty=difficulties.pop() if len(difficulties) == 1 else "mixed",
+        )
+        results: List[Optional[Dict]] = [None] * len(items)
+        if not response:
+            return results
+        # A cut-off array still scores every answer whose object closed
+        data = self._salvage("eval_batch", parse_array(response)).value
+        for pos, entry in enumerate(data):
+            if not isinstance(entry, dict):
+                continue
+            try:
+                i = int(entry.get("id", pos + 1)) - 1
+            except (TypeError, ValueError):
+                i = pos
+            if not 0 <= i < len(items) or results[i] is not None:
+                continue
+            result = self._parse_eval_dict(entry)
+            if result is None:
+                continue
+            item = items[i]
+            if item["q_type"] == "aptitude":
+                result = self._validate_aptitude_eval(item["question"], item["answer"], result)
+            await self.eval_cache.put(item["cache_key"], result)
+            results[i] = result
+        print(f"✅ Batch eval | {sum(r is not None for r in results)}/{len(items)} scored in 1 call")
+        return results
+
+    async def evaluate_answer_stream(
+        self,
+        question: str,
+        answer: str,
+        topic: str,
+        q_type: str = "theory",
+        previous_qa: List[Dict] = None,
+        session_id: str = None,
+        difficulty: str = None,
+        expected_answer: str = None,
+        hidden_tests: Dict = None,
+    ) -> AsyncIterator[Tuple[str, object]]:
+        """
+        Streaming evaluate_answer(): yields ("token", text) while the model writes,
+        then exactly one ("result", evaluation dict). Same call budget.
+        """
+        exact = self._check_aptitude(q_type, answer, expected_answer)
+        if exact:
+            if not (self.aptitude_working_llm and exact.working):
+                yield "result", exact.evaluation()
+                return
+            async for kind, payload in self.evaluate_answer_stream(
+                question, answer, topic, q_type, previous_qa, session_id, difficulty,
+            ):
+                yield kind, self._merge_exact(exact, payload) if kind == "result" else payload
+            return
+
+        if q_type == "coding" and hidden_tests:
+            tested = await self._evaluate_tested_code(question, answer, hidden_tests, session_id, difficulty)
+            if tested:
+                yield "result", tested
+                return
+
+        local = self._local_verdict(question, answer, previous_qa)
+        if local:
+            yield "result", local
+            return
+
+        key = eval_key(question, answer, q_type, EVAL_PROMPT_VERSION)
+        cached = self.eval_cache.get(key)
+        if cached:
+            yield "result", cached
+            return
+        if not self.budget.allow(session_id):
+            self.budget.reject(session_id)
+            yield "result", self._local_score_fallback(answer)
+            return
+
+        prompt, temp = self._eval_prompt(question, answer, topic, q_type, previous_qa)
+        chunks = []
+        async for delta in self.generate_stream(
+            prompt, max_tokens=self.output_lengths.max_tokens("eval", 400), temperature=temp,
+            call_type="eval", session_id=session_id, q_type=q_type, difficulty=difficulty,
+        ):
+            chunks.append(delta)
+            yield "token", delta
+        yield "result", await self._finish_eval(
+            question, answer, q_type, "".join(chunks) or None, key, session_id, difficulty,
+        )
+
+    def _local_verdict(self, question: str, answer: str, previous_qa: Optional[List[Dict]]) -> Optional[Dict]:
+        # ── Free local check — 0 API calls: gibberish, "I don't know", pasted question, repeats, boilerplate ──
+        earlier = [qa["a"] for qa in previous_qa or [] if qa.get("a")]
+        verdict = self.answer_filter.check(question, answer, earlier)
+        return verdict.evaluation() if verdict else None
+
+    def _check_aptitude(self, q_type: str, answer: str, expected_answer: Optional[str]) -> Optional[AptitudeVerdict]:
+        if q_type != "aptitude" or not expected_answer or not self.aptitude_exact:
+            return None
+        verdict = aptitude_checker.check(expected_answer, answer)
+        if verdict is None:
+            self.aptitude_stats["unparsed"] += 1
+            return None
+        self.aptitude_stats["correct" if verdict.correct else "wrong"] += 1
+        self.aptitude_stats["working_llm"] += self.aptitude_working_llm and verdict.working
+        print(f"🧮 Aptitude checked locally | {verdict.found} vs {verdict.expected} | "
+              f"{'correct' if verdict.correct else 'wrong'}")
+        return verdict
+
+    def _merge_exact(self, exact: AptitudeVerdict, graded: Dict) -> Dict:
+        """Model's depth/clarity for the working, local verdict for the final answer."""
+        verdict = exact.evaluation()
+        return {**graded, "correctness": verdict["correctness"], "feedback": f"{verdict['feedback']} {graded['feedback']}"}
+
+    def aptitude_check_stats(self) -> Dict:
+        checked = self.aptitude_stats["correct"] + self.aptitude_stats["wrong"]
+        return {
+            "enabled": self.aptitude_exact,
+            "checked": checked,
+            "correct": self.aptitude_stats["correct"],
+            "wrong": self.aptitude_stats["wrong"],
+            "unparsed": self.aptitude_stats["unparsed"],
+            "sent_to_llm_for_working": self.aptitude_stats["working_llm"],
+        }
+
+    async def _evaluate_tested_code(
+        self, question: str, answer: str, hidden_tests: Dict, session_id: str = None, difficulty: str = None,
+    ) -> Optional[Dict]:
+        """Correctness from the hidden-test pass rate; depth/clarity from one style call. None = not runnable."""
+        key = eval_key(question, answer, "coding_tested", EVAL_PROMPT_VERSION)
+        cached = self.eval_cache.get(key)
+        if cached:
+            return cached
+        run = await self.code_runner.run(answer, hidden_tests)
+        if run is None:
+            return None
+
+        correctness = int(5 * run.pass_rate + 0.5)
+        style = None
+        if self.code_style_llm and run.status == "ok" and self.budget.allow(session_id):
+            style = await self._code_style(question, answer, run, session_id, difficulty)
+        if style is None:
+            style = {
+                "depth": min(correctness, 3),
+                "clarity": 3 if run.status == "ok" else 1,
+                "feedback": "",
             }
+        result = {
+            "correctness": correctness,
+            "depth": style["depth"],
+            "clarity": style["clarity"],
+            "feedback": f"{run.summary()} {style['feedback']}".strip(),
+        }
+        # Model style scores are cached like any eval; the heuristic only when the model isn't wanted
+        if style["feedback"] or not self.code_style_llm:
+            await self.eval_cache.put(key, result)
+        return result
+
+    async def _code_style(
+        self, question: str, answer: str, run: TestRun, session_id: str = None, difficulty: str = None,
+    ) -> Optional[Dict]:
+        prompt = f"""You are reviewing the STYLE of a coding interview submission.
+Correctness was already measured by hidden tests: {run.summary()}
+
+Question: {question}
+Submitted Code:
+{fit(answer, self.answer_token_budget, code=True)}
 
-        if self._is_no_answer(answer):
+Score 0-5 each:
+- depth: Quality of implementation (edge cases, efficiency, sensible data structures)?
+- clarity: Readability (naming, structure, comments where needed)?
+
+Return ONLY JSON:
+{{"depth": 0-5, "clarity": 0-5, "feedback": "1 sentence on style or efficiency"}}"""
+
+        response = await self.generate(
+            prompt, max_tokens=self.output_lengths.max_tokens("code_style", 150), temperature=0.2,
+            call_type="code_style", session_id=session_id, q_type="coding", difficulty=difficulty,
+        )
+        data = self._salvage("code_style", parse_object(response)).value if response else None
+        try:
             return {
-                "correctness": 0,
-                "depth": 0,
-                "clarity": 0,
-                "feedback": "No answer provided — candidate indicated they do not know.",
+                "depth": max(0, min(5, int(data["depth"]))),
+                "clarity": max(0, min(5, int(data["clarity"]))),
+                "feedback": str(data.get("feedback", "")).strip() or "Style reviewed.",
             }
+        except (TypeError, KeyError, ValueError):
+            return None
 
+    def _eval_prompt(
+        self, question: str, answer: str, topic: str, q_type: str, previous_qa: Optional[List[Dict]],
+    ) -> Tuple[str, float]:
         context = ""
         if previous_qa:
-            context = "\n".join(
-                f"Q: {qa['q']}\nA: {qa['a'][:200]}..." for qa in previous_qa[-3:]
-            )
+            per_answer = self.context_token_budget // 3
+            context = fit("\n".join(
+                f"Q: {qa['q']}\nA: {fit(qa['a'], per_answer)}" for qa in previous_qa[-3:]
+            ), self.context_token_budget)
+        answer = fit(answer, self.answer_token_budget, code=q_type == "coding")
 
         if q_type == "coding":
             prompt = self._build_code_eval_prompt(question, answer, topic, context)
@@ -340,18 +1289,31 @@ Return ONLY the rephrased question text, nothing else."""
         else:
             prompt = self._build_theory_eval_prompt(question, answer, topic, context)
 
-        # Attempt 1: full prompt
         # SOLUTION 5: Use lower temperature (0.15) for aptitude to prevent hallucinations
         # Regular 0.3 for theory/coding (needs more creativity)
         temp = 0.15 if q_type == "aptitude" else 0.3
-        response = await self.generate(prompt, max_tokens=400, temperature=temp)
+        return prompt, temp
+
+    async def _finish_eval(
+        self, question: str, answer: str, q_type: str, response: Optional[str], cache_key: str,
+        session_id: str = None, difficulty: str = None,
+    ) -> Dict:
+        """
+        Parse attempt 1; on failure run attempt 2, then the local heuristic.
+        Only real model scores are cached — the heuristic is a failure mode.
+        """
         result = self._parse_eval_response(response)
         if result:
             # SOLUTION 5: Apply post-validation rules to catch LLM errors
             if q_type == "aptitude":
                 result = self._validate_aptitude_eval(question, answer, result)
+            await self.eval_cache.put(cache_key, result)
             return result
 
+        if self._unavailable("eval_retry", q_type, difficulty) or not self.budget.allow(session_id):
+            print("⚠️ LLM unavailable (circuit open or budget spent) — using local heuristic")
+            return self._local_score_fallback(answer)
+
         # Attempt 2: stripped-down prompt
         print("⚠️ Eval parse failed — retrying with simplified prompt")
         fallback_prompt = f"""Score this answer from 0-5 each for correctness, depth, clarity.
@@ -362,9 +1324,13 @@ Answer: {answer[:300]}
 Return ONLY this JSON with no extra text:
 {{"correctness": 0, "depth": 0, "clarity": 0, "feedback": "brief reason"}}"""
 
-        response2 = await self.generate(fallback_prompt, max_tokens=150, temperature=0.2)
+        response2 = await self.generate(
+            fallback_prompt, max_tokens=self.output_lengths.max_tokens("eval_retry", 150), temperature=0.2,
+            call_type="eval_retry", session_id=session_id, q_type=q_type, difficulty=difficulty,
+        )
         result2 = self._parse_eval_response(response2)
         if result2:
+            await self.eval_cache.put(cache_key, result2)
             return result2
 
         # Local heuristic fallback — 0 extra calls
@@ -383,13 +1349,17 @@ Return ONLY this JSON with no extra text:
     def _parse_eval_response(self, response: Optional[str]) -> Optional[Dict]:
         if not response:
             return None
+        salvaged = self._salvage("eval", parse_object(response))
+        data = salvaged.value
+        if data is None:
+            return None
+        # A cut-off feedback sentence is fine; a cut-off score is not worth guessing
+        if not salvaged.complete and not all(k in data for k in ("correctness", "depth", "clarity")):
+            return None
+        return self._parse_eval_dict(data)
+
+    def _parse_eval_dict(self, data: Dict) -> Optional[Dict]:
         try:
-            cleaned = response.replace("\u2019", "'").replace("\u2018", "'")
-            start = cleaned.find("{")
-            end = cleaned.rfind("}") + 1
-            if start == -1 or end == 0:
-                return None
-            data = json.loads(cleaned[start:end], strict=False)
             c  = max(0, min(5, int(data.get("correctness", 0))))
             d  = max(0, min(5, int(data.get("depth", 0))))
             cl = max(0, min(5, int(data.get("clarity", 0))))
@@ -480,85 +1450,6 @@ Return ONLY JSON:
 
     # ──────────────────── HELPERS ──────────────────
 
-    def _is_no_answer(self, text: str) -> bool:
-        """
-        Detect explicit "I don't know" answers.
-        Only match if the answer is SHORT and EXPLICITLY says they don't know.
-        Don't match if answer contains actual content + "maybe I don't know" as aside.
-        """
-        t = text.strip().lower()
-        
-        # If answer is very long, it's not a pure "I don't know" — it's actual content
-        if len(t) > 80:
-            return False
-        
-        # Must have very few words (max 10 words) to be a pure "I don't know"
-        word_count = len(t.split())
-        if word_count > 10:
-            return False
-        
-        # Exact patterns that explicitly say they don't know
-        exact_patterns = [
-            "don't know", "dont know", "do not know",
-            "no idea", "no clue", "not sure", "i give up",
-            "can't answer", "cannot answer", "cant answer",
-            "don't understand", "dont understand",
-            "skip", "pass", "idk", "n/a", "na",
-            "no solution",
-        ]
-        
-        # For short answers, check if it's MOSTLY about not knowing
-        # Allow patterns like "maybe i dont know" or "i have no idea" 
-        # but only if answer is very short and explicit
-        for pattern in exact_patterns:
-            if t == pattern or (word_count <= 5 and pattern in t):
-                return True
-        
-        return False
-
-    def _is_gibberish(self, text: str) -> bool:
-        """
-        Detect pure gibberish (999999, #####, etc).
-        Don't flag actual short answers with real words.
-        """
-        text = text.strip().lower()
-        
-        # Empty or too short
-        if len(text) < 10:
-            return False  # Could be valid short answer
-        
-        # Check if it's PURE repetition (999999, #####, hhhhh, etc)
-        # These are obvious placeholder gibberish
-        unique_chars = set(text.replace(" ", "").replace("\n", ""))
-        if len(unique_chars) <= 3:  # Only 1-3 unique characters (like 9, #, h)
-            # But allow real words: "aaa" is gibberish, "the" is not
-            if text.isalnum() or not any(c.isalpha() for c in text):
-                # No letters or only numbers/symbols = gibberish
-                return True
-        
-        # Must have actual words (not just punctuation)
-        word_count = len(text.split())
-        if word_count < 3:
-            return False  # Allow short valid answers
-        
-        # Check if most characters are alphanumeric (should be for real text)
-        alpha_count = sum(c.isalnum() or c.isspace() for c in text)
-        if alpha_count / len(text) < 0.7:
-            return True  # Too many symbols
-        
-        # Check consonant-vowel ratio (real text has balanced vowels)
-        alpha_chars = [c for c in text if c.isalpha()]
-        if alpha_chars:
-            vowels = sum(1 for c in alpha_chars if c in "aeiou")
-            # Real words must have SOME vowels
-            if vowels == 0:
-                return True
-            consonant_ratio = (len(alpha_chars) - vowels) / len(alpha_chars)
-            if consonant_ratio > 0.85:
-                return True  # Too few vowels
-        
-        return False
-
     def _validate_aptitude_eval(self, question: str, answer: str, evaluation: Dict) -> Dict:
         """
         SOLUTION 5 HYBRID: Post-validation rules for aptitude evaluations.
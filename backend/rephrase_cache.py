@@ -0,0 +1,87 @@
+"""
+Rephrase cache + speculative prefetch
+As soon as a question is served, its rephrasings are generated in the
+background (low limiter priority) and cached by (q_type, question text),
+so /api/rephrase normally answers instantly — and pool/bank questions are
+only ever rephrased once per process.
+"""
+
+import os
+import asyncio
+from collections import OrderedDict
+from typing import Dict, List
+
+
+def _key(question: str, q_type: str) -> tuple:
+    return q_type, " ".join(question.lower().split())
+
+
+class RephraseCache:
+    def __init__(self, qwen_client, variants: int = 2):
+        self.qwen_client = qwen_client
+        self.variants = variants
+        self.max_entries = int(os.getenv("BEE_REPHRASE_CACHE_SIZE", "2000"))
+        self._entries: "OrderedDict[tuple, List[str]]" = OrderedDict()
+        self._inflight: Dict[tuple, asyncio.Task] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, question: str, q_type: str) -> List[str]:
+        key = _key(question, q_type)
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            return self._entries[key]
+        return []
+
+    def add(self, question: str, q_type: str, variants: List[str]):
+        key = _key(question, q_type)
+        current = self._entries.setdefault(key, [])
+        current.extend(v for v in variants if v not in current)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def prefetch(self, question: str, q_type: str, session_id: str = None):
+        """Fire-and-forget; no-op if already cached or in flight. The call is charged to `session_id`."""
+        key = _key(question, q_type)
+        if len(self.get(question, q_type)) >= self.variants or key in self._inflight:
+            return
+        task = asyncio.create_task(self._fetch(question, q_type, session_id))
+        self._inflight[key] = task
+        task.add_done_callback(lambda _: self._inflight.pop(key, None))
+
+    async def _fetch(self, question: str, q_type: str, session_id: str = None):
+        try:
+            variants = await self.qwen_client.rephrase_variants(
+                question, q_type, self.variants, low_priority=True, session_id=session_id,
+            )
+        except Exception as e:
+            print(f"⚠️ Rephrase prefetch failed: {type(e).__name__}: {e}")
+            return
+        if variants:
+            self.add(question, q_type, variants)
+
+    async def variant(self, question: str, q_type: str, index: int):
+        """
+        The index-th rephrasing: cached, else wait for an in-flight prefetch,
+        else None (caller falls back to a live call).
+        """
+        variants = self.get(question, q_type)
+        if len(variants) <= index:
+            task = self._inflight.get(_key(question, q_type))
+            if task:
+                await asyncio.shield(task)
+                variants = self.get(question, q_type)
+        if len(variants) > index:
+            self.hits += 1
+            return variants[index]
+        self.misses += 1
+        return None
+
+    def stats(self) -> Dict:
+        return {
+            "entries": len(self._entries),
+            "in_flight": len(self._inflight),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
@@ -0,0 +1,185 @@
+"""
+Compiled skill-matching index — built once, sub-linear per lookup
+Every known skill and alias maps to a canonical skill ID ("ml", "ML" and
+"Machine Learning" are all "machine learning"). A lookup tries, in order:
+  1. exact     : hash of normalised aliases                  O(1)
+  2. contains  : Aho-Corasick over all aliases (>= 3 chars),  O(len(input))
+                 matched on word boundaries — "python developer" -> python
+  3. fuzzy     : trigram postings narrow the candidates, then a bounded
+                 Damerau (OSA) distance — "pytroch" -> pytorch
+  4. partial   : input inside a longer alias ("tensor" -> tensorflow), via
+                 the same trigram postings
+Aliases of 1-2 characters (r, c, go) only ever match exactly.
+"""
+
+import re
+from collections import Counter, deque
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+_SPACE_RE = re.compile(r"\s+")
+
+
+def normalize(text: str) -> str:
+    return _SPACE_RE.sub(" ", text.strip().lower())
+
+
+def _trigrams(text: str) -> List[str]:
+    padded = f"  {text} "
+    return [padded[i:i + 3] for i in range(len(padded) - 2)]
+
+
+def _osa_distance(a: str, b: str, limit: int) -> int:
+    """
+    Optimal string alignment distance (adjacent swaps cost 1), computed only
+    in the diagonal band |i - j| <= limit; limit + 1 once it is exceeded.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    over = limit + 1
+    prev2: List[int] = []
+    prev = [j if j <= limit else over for j in range(len(b) + 1)]
+    for i in range(1, len(a) + 1):
+        cur = [i if i <= limit else over] + [over] * len(b)
+        row_min = cur[0]
+        for j in range(max(1, i - limit), min(len(b), i + limit) + 1):
+            best = prev[j - 1] + (a[i - 1] != b[j - 1])
+            if prev[j] + 1 < best:
+                best = prev[j] + 1
+            if cur[j - 1] + 1 < best:
+                best = cur[j - 1] + 1
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1] and prev2[j - 2] + 1 < best:
+                best = prev2[j - 2] + 1
+            cur[j] = best if best < over else over
+            if best < row_min:
+                row_min = best
+        if row_min > limit:
+            return over
+        prev2, prev = prev, cur
+    return prev[-1]
+
+
+class _AhoCorasick:
+    """Multi-pattern substring matcher: one pass over the text finds every alias in it."""
+
+    def __init__(self, patterns: Iterable[str]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[str]] = [[]]
+        for pattern in patterns:
+            node = 0
+            for ch in pattern:
+                if ch not in self._goto[node]:
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                    self._goto[node][ch] = len(self._goto) - 1
+                node = self._goto[node][ch]
+            self._out[node].append(pattern)
+
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(ch, 0)
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+
+    def find(self, text: str) -> List[Tuple[int, str]]:
+        """(start index, pattern) for every occurrence."""
+        hits = []
+        node = 0
+        for i, ch in enumerate(text):
+            while node and ch not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(ch, 0)
+            for pattern in self._out[node]:
+                hits.append((i - len(pattern) + 1, pattern))
+        return hits
+
+
+@dataclass
+class SkillMatch:
+    canonical: str   # canonical skill ID
+    kind: str        # exact | contains | fuzzy | partial
+
+
+class SkillIndex:
+    def __init__(self, skills: Iterable[str], aliases: Dict[str, Iterable[str]] = None):
+        # alias -> canonical ID
+        self.canonical: Dict[str, str] = {}
+        for skill in skills:
+            self.canonical.setdefault(normalize(skill), normalize(skill))
+        for canonical, names in (aliases or {}).items():
+            canonical = normalize(canonical)
+            for name in [canonical, *names]:
+                self.canonical[normalize(name)] = canonical
+
+        long_aliases = [a for a in self.canonical if len(a) >= 3]
+        self._matcher = _AhoCorasick(long_aliases)
+        self._postings: Dict[str, Set[str]] = {}
+        for alias in long_aliases:
+            for gram in set(_trigrams(alias)):
+                self._postings.setdefault(gram, set()).add(alias)
+
+    @staticmethod
+    def _max_edits(text: str) -> int:
+        # "lstm"/"bert" must be typed exactly; longer names tolerate 1-2 slips
+        return 0 if len(text) <= 4 else 1 if len(text) <= 8 else 2
+
+    def match(self, text: str) -> Optional[SkillMatch]:
+        query = normalize(text)
+        if not query:
+            return None
+        if query in self.canonical:
+            return SkillMatch(self.canonical[query], "exact")
+        if len(query) <= 2:
+            return None
+
+        contained = self._contains(query)
+        if contained:
+            return SkillMatch(self.canonical[contained], "contains")
+
+        grams = _trigrams(query)
+        shared: Counter = Counter()
+        for gram in set(grams):
+            for alias in self._postings.get(gram, ()):
+                shared[alias] += 1
+
+        limit = self._max_edits(query)
+        if limit:
+            # q-gram lemma: one edit (or adjacent swap) destroys at most 4 padded trigrams
+            need = max(1, len(grams) - 4 * limit)
+            best = None
+            for alias, count in shared.items():
+                if count < need or abs(len(alias) - len(query)) > limit:
+                    continue
+                distance = _osa_distance(query, alias, limit)
+                if distance <= limit and (best is None or distance < best[0]):
+                    best = (distance, alias)
+            if best:
+                return SkillMatch(self.canonical[best[1]], "fuzzy")
+
+        if len(query) >= 4:
+            # Every trigram of the query inside one alias = the query is (very likely) a substring of it
+            inner = [g for g in grams if g.strip() == g]
+            partial = [a for a, n in shared.items() if n >= len(inner) and query in a]
+            if partial:
+                return SkillMatch(self.canonical[min(partial, key=len)], "partial")
+        return None
+
+    def _contains(self, query: str) -> Optional[str]:
+        """Longest alias that appears in `query` as whole words."""
+        best = None
+        for start, alias in self._matcher.find(query):
+            end = start + len(alias)
+            if start > 0 and query[start - 1].isalnum():
+                continue
+            if end < len(query) and query[end].isalnum():
+                continue
+            if best is None or len(alias) > len(best):
+                best = alias
+        return best
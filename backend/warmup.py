@@ -0,0 +1,135 @@
+"""
+Startup warm-up — fills the question pool before the first candidates arrive
+Skill sets come from recent_skills.json (demand recorded by the last run)
+followed by the popular_skills.json manifest. Runs as a background task at
+low limiter priority, so the server accepts requests the whole time.
+"""
+
+import os
+import json
+import asyncio
+from pathlib import Path
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from local_utils import validate_skills_local
+from question_pool import canonical_skills
+
+_HERE = Path(__file__).parent
+
+
+class WarmupRunner:
+    def __init__(self, controller):
+        self.controller = controller
+        self.enabled = os.getenv("BEE_WARMUP", "1") == "1"
+        self.max_sets = int(os.getenv("BEE_WARMUP_MAX_SETS", "8"))
+        self.manifest_path = Path(os.getenv("BEE_WARMUP_MANIFEST", _HERE / "popular_skills.json"))
+        self.recent_path = Path(os.getenv("BEE_RECENT_SKILLS_FILE", _HERE / "recent_skills.json"))
+
+        self.status = "idle"
+        self.skill_sets: List[List[str]] = []
+        self.total = 0
+        self.done = 0
+        self.failed = 0
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        self._task: Optional[asyncio.Task] = None
+
+    # ─────────────────────────── SOURCES ───────────────────────────
+
+    def _read_json(self, path: Path) -> list:
+        if not path.exists():
+            return []
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+            return data if isinstance(data, list) else []
+        except Exception as e:
+            print(f"⚠️ Could not read {path.name}: {e}")
+            return []
+
+    def load_skill_sets(self) -> List[List[str]]:
+        """Recent demand first (most common first), then the static manifest. Deduped, validated."""
+        recent = sorted(self._read_json(self.recent_path), key=lambda r: -r.get("count", 0))
+        candidates = [r.get("skills", []) for r in recent] + self._read_json(self.manifest_path)
+
+        seen = set()
+        skill_sets = []
+        for skills in candidates:
+            valid, _ = validate_skills_local([str(s) for s in skills])
+            canon = canonical_skills(valid)
+            if not canon or canon in seen:
+                continue
+            seen.add(canon)
+            skill_sets.append(list(canon))
+            if len(skill_sets) >= self.max_sets:
+                break
+        return skill_sets
+
+    def save_recent(self):
+        """Merge this run's session demand into recent_skills.json for the next startup."""
+        counts = {
+            canonical_skills(r.get("skills", [])): r.get("count", 0)
+            for r in self._read_json(self.recent_path)
+        }
+        for canon, n in self.controller.question_pool.demand.items():
+            counts[canon] = counts.get(canon, 0) + n
+        top = sorted(counts.items(), key=lambda kv: -kv[1])[:50]
+        try:
+            self.recent_path.write_text(
+                json.dumps([{"skills": list(c), "count": n} for c, n in top if c], indent=2),
+                encoding="utf-8",
+            )
+        except Exception as e:
+            print(f"⚠️ Could not save {self.recent_path.name}: {e}")
+
+    # ─────────────────────────── RUN ───────────────────────────
+
+    def start(self):
+        if not self.enabled:
+            self.status = "disabled"
+            return
+        self._task = asyncio.create_task(self.run())
+
+    async def run(self):
+        pool = self.controller.question_pool
+        distribution = self.controller.question_distribution
+        self.skill_sets = self.load_skill_sets()
+        self.total = len(self.skill_sets) * len(distribution)
+        self.status = "running"
+        self.started_at = datetime.now()
+        print(f"🔥 Warm-up started | {len(self.skill_sets)} skill sets")
+
+        for skills in self.skill_sets:
+            tasks = [
+                pool.schedule_refill(skills, q_type, difficulty_counts, low_priority=True)
+                for q_type, difficulty_counts in distribution
+            ]
+            for task in tasks:
+                # None = bucket already full, nothing to do
+                if task is not None and not await asyncio.shield(task):
+                    self.failed += 1
+                self.done += 1
+
+        self.status = "done"
+        self.finished_at = datetime.now()
+        print(f"🔥 Warm-up done | {self.done - self.failed}/{self.total} sections pooled")
+
+    async def stop(self):
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self.save_recent()
+
+    def progress(self) -> Dict:
+        return {
+            "status": self.status,
+            "skill_sets": len(self.skill_sets),
+            "sections_total": self.total,
+            "sections_done": self.done,
+            "sections_failed": self.failed,
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+        }
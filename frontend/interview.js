@@ -245,16 +245,34 @@ async function submitAnswer() {
   }
 
   try {
-    const res = await fetch(`${API}/api/submit-answer`, {
+    // Streamed: feedback renders as the model writes it, next question on `done`
+    const res = await fetch(`${API}/api/submit-answer/stream`, {
       method: 'POST',
       headers: { 'Content-Type': 'application/json' },
       body: JSON.stringify({ session_id: sessionId, answer }),
     });
-    const data = await res.json();
+
+    let data = null;
+    let failure = null;
+    if (res.ok) {
+      let raw = '';
+      await readEvents(res, (event, payload) => {
+        if (event === 'token') {
+          raw += payload.text;
+          showStreamedFeedback(extractFeedback(raw));
+        } else if (event === 'done') {
+          data = payload;
+        } else if (event === 'error') {
+          failure = payload;
+        }
+      });
+    } else {
+      failure = await res.json();
+    }
     hideLoading();
 
-    if (!res.ok) {
-      console.error('Submit error:', data);
+    if (!data) {
+      console.error('Submit error:', failure);
       isSubmitting = false;
       document.getElementById('submitBtn').disabled = false;
       document.getElementById('codeSubmitBtn').disabled = false;
@@ -289,6 +307,42 @@ async function submitAnswer() {
   }
 }
 
+// ── Server-sent events over fetch (EventSource can't POST) ──
+async function readEvents(res, onEvent) {
+  const reader = res.body.getReader();
+  const decoder = new TextDecoder();
+  let buf = '';
+  while (true) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buf += decoder.decode(value, { stream: true });
+    let sep;
+    while ((sep = buf.indexOf('\n\n')) !== -1) {
+      const block = buf.slice(0, sep);
+      buf = buf.slice(sep + 2);
+      let event = 'message', payload = '';
+      block.split('\n').forEach(line => {
+        if (line.startsWith('event:')) event = line.slice(6).trim();
+        else if (line.startsWith('data:')) payload += line.slice(5).trim();
+      });
+      if (payload) onEvent(event, JSON.parse(payload));
+    }
+  }
+}
+
+// Pull the (possibly unfinished) feedback string out of the partial JSON
+function extractFeedback(raw) {
+  const m = raw.match(/"feedback"\s*:\s*"((?:[^"\\]|\\.)*)/);
+  return m ? m[1].replace(/\\"/g, '"').replace(/\\n/g, ' ') : '';
+}
+
+function showStreamedFeedback(text) {
+  const el = document.getElementById('loadingFeedback');
+  if (!el || !text) return;
+  el.textContent = text;
+  el.style.display = 'block';
+}
+
 // ── Rephrase ──
 async function rephraseQuestion() {
   const rephraseBtn = document.getElementById('rephraseBtn');
@@ -344,6 +398,9 @@ function hideBanner(id) {
 // ── Loading ──
 function showLoading(text) {
   document.getElementById('loadingText').textContent = text || 'Loading...';
+  const fb = document.getElementById('loadingFeedback');
+  fb.textContent = '';
+  fb.style.display = 'none';
   document.getElementById('loadOverlay').style.display = 'flex';
 }
 function hideLoading() {
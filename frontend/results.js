@@ -118,12 +118,17 @@ function animateScore(pct) {
   ring.style.strokeDashoffset = offset;
 }
 
-async function restartInterview() {
+// fresh=false reuses this session's questions (instant, no LLM calls)
+async function restartInterview(fresh = false) {
   const sessionId = window._sessionId;
   if (!sessionId) { window.location.href = 'index.html'; return; }
 
   try {
-    const res = await fetch(`${API}/api/restart/${sessionId}`, { method: 'POST' });
+    const res = await fetch(`${API}/api/restart/${sessionId}`, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify({ fresh_sections: fresh ? ['theory', 'aptitude', 'coding', 'hr'] : [] }),
+    });
     const data = await res.json();
     if (!res.ok) { window.location.href = 'index.html'; return; }
     sessionStorage.setItem('bee_session_id', data.session_id);